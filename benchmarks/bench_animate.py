@@ -0,0 +1,61 @@
+"""Benchmark animation figure export: plotly frame objects against frames assembled from trajectory array.
+
+Usage: python -m benchmarks.bench_animate [n_trace]
+"""
+import sys, time, json
+import numpy as np
+import plotly.graph_objects as go
+
+from src.solver import TaskClassicalGravitation
+
+def animate_plotly(vector: np.ndarray, n_trace: int, layout: dict = {}) -> dict:
+    """Reference animation figure built by plotly frame objects."""
+    n_frame = vector.shape[0]
+    vector_min = np.min(vector, (0, 1))
+    vector_max = np.max(vector, (0, 1))
+    index = np.arange(vector.shape[1])
+    match vector.shape[2]:
+        case 2:
+            data = [go.Scatter(x = [vector[0, i, 0]], y = [vector[0, i, 1]], mode = 'markers', name = str(i + 1))
+                for i in index]
+            frames = [go.Frame(data = [go.Scatter(x = vector[nf-n_trace:nf, i, 0], y = vector[nf-n_trace:nf, i, 1], mode = 'lines')
+                    if nf > n_trace else go.Scatter(x = vector[0:nf, i, 0], y = vector[0:nf, i, 1], mode = 'lines')
+                    for i in index]) for nf in np.arange(n_frame)]
+            layout_axis = dict(xaxis = dict(range = [vector_min[0], vector_max[0]], autorange = False),
+                yaxis = dict(range = [vector_min[1], vector_min[1]], scaleanchor = 'x', scaleratio = 1, autorange = False))
+        case 3:
+            data = [go.Scatter3d(x = [vector[0, i, 0]], y = [vector[0, i, 1]], z = [vector[0, i, 2]], mode = 'markers', name = str(i + 1))
+                for i in index]
+            frames = [go.Frame(data = [go.Scatter3d(x = vector[nf-n_trace:nf, i, 0], y = vector[nf-n_trace:nf, i, 1], z = vector[nf-n_trace:nf, i, 2], mode = 'lines')
+                    if nf > n_trace else go.Scatter3d(x = vector[0:nf, i, 0], y = vector[0:nf, i, 1], z = vector[0:nf, i, 2], mode = 'lines')
+                    for i in index]) for nf in np.arange(n_frame)]
+            layout_axis = dict(scene = dict(xaxis = dict(range = [vector_min[0], vector_max[0]], autorange = False),
+                yaxis = dict(range = [vector_min[1], vector_min[1]], autorange = False),
+                zaxis = dict(range = [vector_min[2], vector_min[2]], autorange = False),  aspectmode = 'cube'))
+    button_animate = dict(label = 'Play', method = 'animate',
+        args = [None, dict(frame = dict(duration = 0, redraw = False), transition = dict(duration = 0), mode = 'immediate')])
+    layout = dict(updatemenus = [dict(type = 'buttons', buttons = [button_animate])],
+        hovermode = 'closest') | layout_axis | layout
+    return json.loads(go.Figure(data = data, layout = layout, frames = frames).to_json())
+
+def measure(function, *args) -> tuple:
+    """Execution time and result of function."""
+    time_start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - time_start, result
+
+def main(n_trace: int = 50) -> None:
+    rng = np.random.default_rng(0)
+    print(f'n_trace = {n_trace}')
+    print(f'{"dim":>4} {"frames":>7} {"bodies":>7} {"plotly, s":>10} {"direct, s":>10} {"speedup":>8} {"equal":>6}')
+    for dimension in (2, 3):
+        for n_frame in (100, 400):
+            for order in (3, 10):
+                vector = np.cumsum(rng.normal(size = (n_frame, order, dimension)), axis = 0)
+                time_plotly, reference = measure(animate_plotly, vector, n_trace)
+                time_direct, figure = measure(TaskClassicalGravitation.animate, vector, n_trace)
+                print(f'{dimension:>4} {n_frame:>7} {order:>7} {time_plotly:>10.3f} {time_direct:>10.3f} '
+                    f'{time_plotly / time_direct:>8.1f} {str(figure == reference):>6}')
+
+if __name__ == '__main__':
+    main(*[int(value) for value in sys.argv[1:]])
@@ -0,0 +1,42 @@
+"""Benchmark per-task database overhead: engine created per task against process-wide pooled engine.
+
+Usage: python -m benchmarks.bench_database [tasks]
+Database is specified by SQLALCHEMY_DATABASE_URI environment variable (or .env file).
+"""
+import os, sys, time, dotenv
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src import database, solver
+
+def query(session) -> None:
+    """Typical lookup of task record."""
+    session.query(solver.ModelTaskClassicalGravitation).filter_by(id = 'benchmark').first()
+    session.commit()
+
+def per_task(uri: str) -> None:
+    """Engine and session factory created per task as before pooling."""
+    engine = create_engine(uri)
+    Session = sessionmaker(engine)
+    with Session() as session:
+        query(session)
+
+def pooled(uri: str) -> None:
+    """Session of process-wide engine."""
+    with database.session(uri) as session:
+        query(session)
+
+def main(tasks: int = 200) -> None:
+    dotenv.load_dotenv()
+    uri = os.environ['SQLALCHEMY_DATABASE_URI']
+    database.init_worker(uri, database.options())
+    print(f'{"mode":>10} {"per task, ms":>13}')
+    for name, function in (('per-task', per_task), ('pooled', pooled)):
+        function(uri)
+        time_start = time.perf_counter()
+        for _ in range(tasks):
+            function(uri)
+        print(f'{name:>10} {1e3 * (time.perf_counter() - time_start) / tasks:>13.2f}')
+
+if __name__ == '__main__':
+    main(*[int(value) for value in sys.argv[1:]])
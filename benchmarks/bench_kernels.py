@@ -0,0 +1,45 @@
+"""Benchmark scaling of force kernels with count of bodies.
+
+Usage: python -m benchmarks.bench_kernels [max_order]
+"""
+import sys, time
+import numpy as np
+from src import kernels
+
+def measure(kernel, r: np.ndarray, repeat: int = 3) -> float:
+    """Return best wall time of kernel evaluation."""
+    kernel(r)
+    timings = []
+    for _ in range(repeat):
+        time_start = time.perf_counter()
+        kernel(r)
+        timings.append(time.perf_counter() - time_start)
+    return min(timings)
+
+def main(max_order: int = 5000) -> None:
+    print(f'{"dim":>3} {"order":>6} {"kernel":>14} {"time, s":>10} {"rms error":>10}')
+    for dimension in (2, 3):
+        for order in (100, 300, 1000, 3000, 10000, 30000):
+            if order > max_order:
+                break
+            rng = np.random.default_rng(order)
+            r = rng.normal(size = (order, dimension))
+            r[:order // 3] *= 0.05
+            m = rng.uniform(0.5, 2, order)
+            # direct summation allocates O(order^2) buffers
+            reference = None
+            if order <= 5000:
+                for backend in kernels.backends:
+                    kernel = kernels.build_kernel(m, 1.0, order, dimension, backend = backend)
+                    print(f'{dimension:>3} {order:>6} {backend:>14} {measure(kernel, r):>10.4f} {0:>10.1e}')
+                reference = kernel(r).copy()
+            for theta in (0.3, 0.5, 0.8):
+                kernel = kernels.build_kernel(m, 1.0, order, dimension, engine = 'tree', theta = theta)
+                error = np.nan
+                if reference is not None:
+                    error = np.linalg.norm(kernel(r) - reference, axis = 1) / np.linalg.norm(reference, axis = 1)
+                    error = np.sqrt(np.mean(error**2))
+                print(f'{dimension:>3} {order:>6} {f"tree({theta})":>14} {measure(kernel, r):>10.4f} {error:>10.1e}')
+
+if __name__ == '__main__':
+    main(*[int(value) for value in sys.argv[1:]])
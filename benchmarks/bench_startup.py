@@ -0,0 +1,51 @@
+"""Benchmark startup: import time of application package and time to the first result of pool worker
+started cold against worker warmed up by initializer.
+
+Usage: python -m benchmarks.bench_startup [repeat]
+"""
+import sys, time, subprocess, statistics, multiprocessing
+import numpy as np
+
+# import of package only, and import followed by use of lazily imported figure, integration and kernel stack
+imports = dict(lazy = 'import src',
+    eager = 'import src; from src import solver; solver.go.Figure; solver.kernels.KernelDirect; solver.integrators.integrate.odeint')
+
+def import_time(statement: str) -> float:
+    """Measure import time at fresh interpreter."""
+    code = f'import time; time_start = time.perf_counter(); {statement}; print(time.perf_counter() - time_start)'
+    return float(subprocess.run([sys.executable, '-c', code], capture_output = True, text = True, check = True).stdout.split()[-1])
+
+def ready() -> None:
+    pass
+
+def first_result() -> int:
+    """Solve and render small problem as the first task of worker."""
+    from src import solver
+    order = 5
+    rng = np.random.default_rng(0)
+    r0, dr0, mesh = rng.normal(size = (order, 2)), 0.1 * rng.normal(size = (order, 2)), np.linspace(0, 1, 101)
+    kernel = solver.kernels.build_kernel(list(np.ones(order)), 1, order, 2, backend = 'numba')
+    r, dr = solver.integrators.build_integrator('leapfrog')(kernel, r0, dr0, mesh, substeps = 4)
+    return len(solver.TaskClassicalGravitation.export(dict(t = mesh, r = r, dr = dr), None, None)['plots'])
+
+def time_to_first_result(warm: bool) -> tuple:
+    """Measure time to ready worker and time of the first task submitted to ready worker."""
+    from src import solver
+    time_start = time.perf_counter()
+    with multiprocessing.Pool(1, initializer = solver.init_worker, initargs = (None, None, None, None, warm)) as pool:
+        pool.apply(ready)
+        time_ready = time.perf_counter()
+        pool.apply(first_result)
+        return time_ready - time_start, time.perf_counter() - time_ready
+
+def main(repeat: int = 5) -> None:
+    print(f'{"import":>10} {"median, ms":>11}')
+    for name, statement in imports.items():
+        print(f'{name:>10} {1e3 * statistics.median(import_time(statement) for _ in range(repeat)):>11.1f}')
+    print(f'{"worker":>10} {"ready, ms":>11} {"first result, ms":>17}')
+    for warm in (False, True):
+        ready_time, first_time = time_to_first_result(warm)
+        print(f'{"warm" if warm else "cold":>10} {1e3 * ready_time:>11.1f} {1e3 * first_time:>17.1f}')
+
+if __name__ == '__main__':
+    main(*[int(value) for value in sys.argv[1:]])
@@ -0,0 +1,74 @@
+"""Benchmark write/read time and stored size of trajectories: ARRAY(Float) columns against binary chunks.
+
+Usage: python -m benchmarks.bench_storage [steps] [order]
+Database is specified by SQLALCHEMY_DATABASE_URI environment variable (or .env file).
+"""
+import os, sys, time, dotenv
+import numpy as np
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import sessionmaker
+
+from src import solver
+
+def trajectory(steps: int, order: int, dimension: int = 3) -> dict:
+    """Create smooth random trajectory of bodies."""
+    rng = np.random.default_rng(0)
+    t = np.linspace(0, 100, steps)
+    r = np.cumsum(rng.normal(scale = 1e-2, size = (steps, order, dimension)), axis = 0)
+    dr = np.gradient(r, t, axis = 0)
+    problem = dict(g = 1, dimension = dimension, order = order, m = np.ones(order), r0 = r[0], dr0 = dr[0], mesh = t)
+    return dict(id = 'benchmark', problem = problem, solution = dict(r = r, dr = dr))
+
+def size(session, id: str) -> int:
+    """Stored size of trajectory columns of record and its chunks in bytes."""
+    length = func.pg_column_size if session.bind.dialect.name == 'postgresql' else func.length
+    total = 0
+    for model in (solver.ModelTaskClassicalGravitation, solver.ModelTaskClassicalGravitationChunk):
+        column = sum(func.coalesce(length(getattr(model, key)), 0) for key in ('t', 'r', 'dr'))
+        total += session.query(func.coalesce(func.sum(column), 0)).filter(model.id == id).scalar()
+    return int(total)
+
+def main(steps: int = 10000, order: int = 20) -> None:
+    dotenv.load_dotenv()
+    engine = create_engine(os.environ['SQLALCHEMY_DATABASE_URI'])
+    solver.Base.metadata.create_all(engine)
+    Session = sessionmaker(engine)
+    data = trajectory(steps, order)
+    task = solver.TaskClassicalGravitation(id = data['id'])
+    print(f'steps = {steps}, order = {order}, raw float64 size = {2 * data["solution"]["r"].nbytes / 2**20:.1f} MiB')
+    print(f'{"format":>18} {"write, s":>9} {"read, s":>9} {"size, MiB":>10}')
+
+    # legacy array columns
+    with Session() as session:
+        session.query(solver.ModelTaskClassicalGravitationChunk).filter_by(id = task.id).delete()
+        time_start = time.perf_counter()
+        session.merge(solver.ModelTaskClassicalGravitation(id = task.id, m = data['problem']['m'], t = data['problem']['mesh'], 
+            r = data['solution']['r'], dr = data['solution']['dr']))
+        session.commit()
+        time_write = time.perf_counter() - time_start
+    with Session() as session:
+        time_start = time.perf_counter()
+        task.load(session)
+        time_read = time.perf_counter() - time_start
+        print(f'{"ARRAY(Float)":>18} {time_write:>9.3f} {time_read:>9.3f} {size(session, task.id) / 2**20:>10.2f}')
+
+    # binary chunks
+    for dtype in ('float64', 'float32'):
+        for compression in solver.storage.codecs:
+            task._storage = dict(dtype = dtype, compression = compression, chunk = 1000)
+            time_start = time.perf_counter()
+            task.store(data)
+            time_write = time.perf_counter() - time_start
+            with Session() as session:
+                time_start = time.perf_counter()
+                task.load(session)
+                time_read = time.perf_counter() - time_start
+                print(f'{dtype + "+" + compression:>18} {time_write:>9.3f} {time_read:>9.3f} {size(session, task.id) / 2**20:>10.2f}')
+
+    with Session() as session:
+        session.query(solver.ModelTaskClassicalGravitation).filter_by(id = task.id).delete()
+        session.query(solver.ModelTaskClassicalGravitationChunk).filter_by(id = task.id).delete()
+        session.commit()
+
+if __name__ == '__main__':
+    main(*[int(value) for value in sys.argv[1:]])
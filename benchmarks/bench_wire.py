@@ -0,0 +1,34 @@
+"""Benchmark payload size and serialization time of postprocessed task: plotly JSON figures against binary wire format.
+
+Usage: python -m benchmarks.bench_wire
+"""
+import time, json, zlib
+import numpy as np
+
+from src.solver import TaskClassicalGravitation
+
+def measure(function, *args) -> tuple:
+    """Execution time and result of function."""
+    time_start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - time_start, result
+
+def main() -> None:
+    rng = np.random.default_rng(0)
+    print(f'{"steps":>7} {"bodies":>7} {"json, s":>8} {"json, MiB":>10} {"gzip, MiB":>10} '
+        f'{"binary, s":>10} {"f8, MiB":>8} {"f4, MiB":>8} {"ratio":>7}')
+    for steps in (2500, 10000):
+        for order in (3, 10):
+            t = np.linspace(0, 100, steps)
+            r = np.cumsum(rng.normal(scale = 1e-2, size = (steps, order, 3)), axis = 0)
+            solution = dict(t = t, r = r, dr = np.gradient(r, t, axis = 0))
+            # figures are serialized once more by postprocess route
+            time_json, payload_json = measure(lambda: json.dumps(TaskClassicalGravitation.export(solution, 'sid', 'id')).encode())
+            time_binary, payload_binary = measure(TaskClassicalGravitation.export_binary, solution, 'sid', 'id')
+            payload_f4 = TaskClassicalGravitation.export_binary(solution, 'sid', 'id', '<f4')
+            print(f'{steps:>7} {order:>7} {time_json:>8.3f} {len(payload_json) / 2**20:>10.2f} '
+                f'{len(zlib.compress(payload_json, 6)) / 2**20:>10.2f} {time_binary:>10.4f} '
+                f'{len(payload_binary) / 2**20:>8.3f} {len(payload_f4) / 2**20:>8.3f} {len(payload_json) / len(payload_binary):>7.0f}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""Benchmark persistence throughput of many small solved tasks: per-task ORM merge, per-task upsert
+and write-behind batches of writer.
+
+Usage: python -m benchmarks.bench_writer [tasks] [samples]
+Database is specified by SQLALCHEMY_DATABASE_URI environment variable (or .env file), sqlite URI is supported.
+"""
+import os, sys, time, threading, dotenv
+import numpy as np
+
+from src import database, solver, writer
+
+def results(tasks: int, samples: int) -> list:
+    """Solved results of small tasks."""
+    rng = np.random.default_rng(0)
+    t = np.linspace(0, 1, samples)
+    items = []
+    for index in range(tasks):
+        r = rng.normal(size = (samples, 3, 2))
+        problem = dict(g = 1, dimension = 2, order = 3, m = [1, 1, 2], r0 = r[0], dr0 = r[0], mesh = t, solver = {})
+        items.append(dict(sid = None, id = f'bench-writer-{index}', problem = problem, solution = dict(r = r, dr = r, status = True)))
+    return items
+
+def merge(uri: str, items: list) -> None:
+    """Task record merged by ORM session and chunks replaced per task as before write-behind."""
+    for item in items:
+        task = solver.TaskClassicalGravitation(id = item['id'])
+        row, chunks = task.records(item)
+        with database.session(uri) as session:
+            session.merge(solver.ModelTaskClassicalGravitation(**row))
+            session.query(solver.ModelTaskClassicalGravitationChunk).filter_by(id = item['id']).delete()
+            session.add_all(task.chunks(item['id'], item['problem']['mesh'], item['solution']['r'], item['solution']['dr']))
+            session.commit()
+
+def upsert(uri: str, items: list) -> None:
+    """Synchronous upsert per task."""
+    for item in items:
+        solver.TaskClassicalGravitation(id = item['id']).store(item)
+
+def batched(uri: str, items: list) -> None:
+    """Write-behind batches of writer thread."""
+    store = writer.Writer(uri)
+    thread = threading.Thread(target = store.run)
+    thread.start()
+    [store.put(item) for item in items]
+    store.wait()
+    store.close()
+    thread.join()
+
+def main(tasks: int = 500, samples: int = 101) -> None:
+    dotenv.load_dotenv()
+    uri = os.environ['SQLALCHEMY_DATABASE_URI']
+    solver.Base.metadata.create_all(database.get_engine(uri))
+    print(f'{database.get_engine(uri).dialect.name}: {tasks} tasks of {samples} samples')
+    print(f'{"mode":>10} {"tasks/s":>9} {"per task, ms":>13}')
+    for name, function in (('merge', merge), ('upsert', upsert), ('batched', batched)):
+        items = results(tasks, samples)
+        time_start = time.perf_counter()
+        function(uri, items)
+        elapsed = time.perf_counter() - time_start
+        print(f'{name:>10} {tasks / elapsed:>9.1f} {1e3 * elapsed / tasks:>13.2f}')
+
+if __name__ == '__main__':
+    main(*[int(value) for value in sys.argv[1:]])
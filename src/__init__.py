@@ -10,7 +10,6 @@ from flask_socketio import SocketIO
 from flask_session import Session
 import os, json, dotenv
 
-from sqlalchemy import create_engine
 
 # create flask instance with indication a path of static files (scr/static)
 app = Flask(__name__, static_url_path = '/static')    
@@ -26,18 +25,20 @@ socketio = SocketIO(app, logger = True)
 sess = Session()
 
 # import handlers
-from src import account, views, models, sockets, solver
+from src import account, views, models, sockets, solver, database, scheduler
 
 def init_app():
     """Initialize application."""
-    # create task manager instance
-    app.task_manager = solver.TaskManager(4, socketio)
-    
     # load environment variables
     dotenv.load_dotenv()
     config = dotenv.dotenv_values()
     app.config.from_mapping(config)
     
+    # create task manager instance, workers share process-wide database engine and are warmed up unless disabled
+    limits = scheduler.options(app.config)
+    app.task_manager = solver.TaskManager(limits['pool_size'], socketio, os.environ['SQLALCHEMY_DATABASE_URI'], 
+        database.options(app.config), app.config, limits['warm'])
+    
     # initiate login manager
     login_manager.init_app(app)
     
@@ -47,8 +48,10 @@ def init_app():
         db.create_all()
         
     # initialize models of tasks
-    engine = create_engine(os.environ['SQLALCHEMY_DATABASE_URI'])
+    engine = database.get_engine(os.environ['SQLALCHEMY_DATABASE_URI'])
     solver.Base.metadata.create_all(engine)
+    from src import migrations
+    migrations.upgrade(engine)
         
     # initialte bcrypt
     bcrypt.init_app(app)
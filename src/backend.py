@@ -0,0 +1,208 @@
+"""This module provides distributed execution backend of pool jobs over Redis queue.
+
+Web process enqueues pickled job units to list `<prefix>:jobs`, standalone workers started by
+`worker.py` on any node pop and solve them and push results and progress events to reply list of
+the web process, which are passed to scheduler callbacks and emitted to client sockets. Payloads of
+results are sent by value, since shared memory and files of worker are not reachable from other
+nodes. Cancellation flags of jobs are kept by hash of the web process and polled by workers.
+Backend is configured by application config or environment variables:
+    EXECUTION_BACKEND: pool (in-process pool, default) or redis
+    REDIS_URL: URL of Redis server, memory://<name> selects in-process stand-in of server
+    REDIS_PREFIX: prefix of keys of queue
+"""
+import os, pickle, threading, time, uuid
+from collections import deque
+
+from src import database, shared
+
+def options(config: dict = os.environ) -> dict:
+    """Get options of execution backend from application config or environment variables."""
+    return dict(backend = config.get('EXECUTION_BACKEND', 'pool'),
+        url = config.get('REDIS_URL', 'redis://localhost:6379/0'),
+        prefix = config.get('REDIS_PREFIX', 'slv_phs_tsk_web'))
+
+class MemoryRedis():
+    """In-process stand-in of Redis server providing list and hash commands used by backend."""
+    def __init__(self) -> None:
+        self._lists = {}
+        self._hashes = {}
+        self._condition = threading.Condition()
+
+    def rpush(self, key: str, *values) -> int:
+        with self._condition:
+            self._lists.setdefault(key, deque()).extend(values)
+            self._condition.notify_all()
+            return len(self._lists[key])
+
+    def blpop(self, keys: list, timeout: float = 0) -> tuple | None:
+        deadline = time.time() + timeout if timeout else None
+        with self._condition:
+            while True:
+                for key in keys:
+                    if self._lists.get(key):
+                        return key, self._lists[key].popleft()
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._condition.wait(remaining)
+
+    def llen(self, key: str) -> int:
+        with self._condition:
+            return len(self._lists.get(key, ()))
+
+    def hset(self, key: str, field, value) -> None:
+        with self._condition:
+            self._hashes.setdefault(key, {})[str(field)] = str(value).encode()
+
+    def hget(self, key: str, field) -> bytes | None:
+        with self._condition:
+            return self._hashes.get(key, {}).get(str(field), None)
+
+    def hdel(self, key: str, field) -> None:
+        with self._condition:
+            self._hashes.get(key, {}).pop(str(field), None)
+
+    def delete(self, key: str) -> None:
+        with self._condition:
+            self._lists.pop(key, None)
+            self._hashes.pop(key, None)
+
+# in-process servers by URL
+_servers = {}
+
+def connect(url: str):
+    """Connect to Redis server by URL."""
+    if url.startswith('memory://'):
+        return _servers.setdefault(url, MemoryRedis())
+    import redis
+    return redis.Redis.from_url(url)
+
+class RemoteFlags():
+    """Cancellation flags of jobs kept by Redis hash, reads are cached during polling interval."""
+    def __init__(self, client, key: str, interval: float = 0) -> None:
+        self.client = client
+        self.key = key
+        self.interval = interval
+        self._cache = {}
+
+    def __getitem__(self, token: int) -> int:
+        value, checked = self._cache.get(token, (0, 0))
+        if time.time() - checked >= self.interval:
+            value = int(self.client.hget(self.key, token) or 0)
+            self._cache[token] = (value, time.time())
+        return value
+
+    def __setitem__(self, token: int, value: int) -> None:
+        if value:
+            self.client.hset(self.key, token, 1)
+        else:
+            self.client.hdel(self.key, token)
+
+class RemoteQueue():
+    """Queue of progress events of worker pushed to reply list of web process."""
+    def __init__(self, client, key: str) -> None:
+        self.client = client
+        self.key = key
+
+    def put(self, item: tuple) -> None:
+        self.client.rpush(self.key, pickle.dumps(('event', item)))
+
+class RemotePool():
+    """Pool interface of scheduler applying jobs at remote workers."""
+    def __init__(self, client, prefix: str, queue) -> None:
+        self.client = client
+        self.prefix = prefix
+        # events of workers are emitted by watcher of task manager queue
+        self.queue = queue
+        self.instance = uuid.uuid4().hex
+        self.reply = f'{prefix}:reply:{self.instance}'
+        self.flags = RemoteFlags(client, f'{prefix}:flags:{self.instance}')
+        self._callbacks = {}
+        self._closed = False
+
+    def apply_async(self, function, callback = None, error_callback = None) -> str:
+        """Enqueue bound method of job unit."""
+        token = uuid.uuid4().hex
+        self._callbacks[token] = (callback, error_callback)
+        self.client.rpush(f'{self.prefix}:jobs', pickle.dumps(dict(token = token, unit = function.__self__,
+            method = function.__name__, reply = self.reply, flags = self.flags.key)))
+        return token
+
+    def watch(self) -> None:
+        """Pass results and events of workers to callbacks and task manager queue."""
+        while not self._closed:
+            item = self.client.blpop([self.reply], timeout = 1)
+            if item is None:
+                continue
+            message = pickle.loads(item[1])
+            if message is None:
+                break
+            if message[0] == 'event':
+                self.queue.put(message[1])
+                continue
+            _, token, result, error = message
+            callback, error_callback = self._callbacks.pop(token, (None, None))
+            try:
+                if error is not None:
+                    if error_callback is not None:
+                        error_callback(RuntimeError(error))
+                    continue
+                # payloads are moved to shared memory and files of web process
+                [shared.offload(item) for item in (result if type(result) is list else [result]) if type(item) is dict]
+                if callback is not None:
+                    callback(result)
+            except Exception as error:
+                print(error)
+
+    def close(self) -> None:
+        """Stop watching replies."""
+        self._closed = True
+        self.client.rpush(self.reply, pickle.dumps(None))
+
+    def join(self) -> None:
+        pass
+
+class Worker():
+    """Standalone worker solving jobs of Redis queue."""
+    def __init__(self, client, prefix: str, uri: str = None, pool_options: dict = None, interval: float = 0.5,
+            warm: bool = False) -> None:
+        self.client = client
+        self.prefix = prefix
+        self.uri = uri
+        self.pool_options = pool_options
+        self.warm = warm
+        # polling interval of cancellation flags
+        self.interval = interval
+        self.stop = threading.Event()
+        self.count = 0
+
+    def run(self) -> None:
+        """Solve jobs until worker is stopped."""
+        from src import solver
+        if self.uri:
+            database.init_worker(self.uri, self.pool_options)
+        if self.warm:
+            solver.warm_up()
+        while not self.stop.is_set():
+            item = self.client.blpop([f'{self.prefix}:jobs'], timeout = 1)
+            if item is not None:
+                self.execute(solver, pickle.loads(item[1]))
+
+    def execute(self, solver, message: dict) -> None:
+        """Solve job and push its result to reply list."""
+        solver.init_worker(RemoteQueue(self.client, message['reply']),
+            RemoteFlags(self.client, message['flags'], self.interval))
+        try:
+            result = getattr(message['unit'], message['method'])()
+            # results are sent by value
+            [shared.inline(item) for item in (result if type(result) is list else [result]) if type(item) is dict]
+            reply = ('result', message['token'], result, None)
+        except Exception as error:
+            print(error)
+            reply = ('result', message['token'], None, str(error))
+        self.client.rpush(message['reply'], pickle.dumps(reply))
+        self.count += 1
+
+def serve(url: str, prefix: str, uri: str = None, pool_options: dict = None) -> None:
+    """Run worker process."""
+    Worker(connect(url), prefix, uri, pool_options, warm = True).run()
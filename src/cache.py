@@ -0,0 +1,100 @@
+"""This module provides content-addressed cache of solved classical gravitation problems.
+
+Problem is addressed by canonical hash of its parameters (order, dimension, g, m, r0, dr0, mesh) and
+solver settings, so the same problem submitted again under any task identifier is served by copying
+stored solution instead of solving. Digest is stored along with task record, cache maps digest to
+identifier of solved task and is bounded by size and TTL with eviction policy:
+    lru: least recently used entry is evicted
+    lfu: least frequently used entry is evicted
+    fifo: the oldest entry is evicted
+Limits are configured by environment variables SOLUTION_CACHE_SIZE, SOLUTION_CACHE_TTL (s, 0 disables
+expiration) and SOLUTION_CACHE_POLICY.
+"""
+import os, json, hashlib, time, threading
+import numpy as np
+from collections import OrderedDict
+
+policies = ('lru', 'lfu', 'fifo')
+
+def options() -> dict:
+    """Get limits of solution cache from environment variables."""
+    return dict(size = int(os.environ.get('SOLUTION_CACHE_SIZE', 1024)),
+        ttl = float(os.environ.get('SOLUTION_CACHE_TTL', 0)),
+        policy = os.environ.get('SOLUTION_CACHE_POLICY', 'lru'))
+
+def digest(problem: dict) -> str | None:
+    """Canonical hash of problem, None if problem is not cacheable."""
+    settings = problem.get('solver', {})
+    # streamed solution is reported while it is produced
+    if settings.get('stream', 0):
+        return None
+    sha = hashlib.sha256()
+    sha.update(json.dumps(dict(order = int(problem['order']), dimension = int(problem['dimension']),
+        g = float(problem['g']), solver = {key: value for key, value in settings.items() if key != 'stream'}),
+        sort_keys = True).encode())
+    for key in ('m', 'r0', 'dr0', 'mesh'):
+        value = np.ascontiguousarray(problem[key], dtype = '<f8')
+        sha.update(key.encode() + np.array(value.shape, dtype = '<i8').tobytes() + value.tobytes())
+    return sha.hexdigest()
+
+class SolutionCache():
+    """Map of problem digest to identifier of solved task bounded by size and TTL."""
+    def __init__(self, size: int = None, ttl: float = None, policy: str = None) -> None:
+        limits = options()
+        self.size = limits['size'] if size is None else size
+        self.ttl = limits['ttl'] if ttl is None else ttl
+        self.policy = limits['policy'] if policy is None else policy
+        if self.policy not in policies:
+            raise ValueError(f'unknown eviction policy: {self.policy}')
+        # entries by digest: identifier of task, time of insertion, count of uses
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = dict(hits = 0, misses = 0, shared = 0, evictions = 0, invalidations = 0)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> str | None:
+        """Get identifier of task solved for problem digest."""
+        with self._lock:
+            entry = self._entries.get(key, None)
+            if entry is None:
+                return None
+            if self.ttl > 0 and time.time() - entry['time'] > self.ttl:
+                del self._entries[key]
+                self.counters['evictions'] += 1
+                return None
+            entry['uses'] += 1
+            if self.policy == 'lru':
+                self._entries.move_to_end(key)
+            return entry['id']
+
+    def put(self, key: str, id: str) -> None:
+        """Insert identifier of task solved for problem digest."""
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = dict(id = id, time = time.time(), uses = 0)
+            while len(self._entries) > self.size:
+                if self.policy == 'lfu':
+                    # inserted entry is not evicted
+                    victim = min((item for item in self._entries if item != key), key = lambda item: self._entries[item]['uses'])
+                else:
+                    victim = next(iter(self._entries))
+                del self._entries[victim]
+                self.counters['evictions'] += 1
+
+    def invalidate(self, key: str) -> None:
+        """Drop entry whose stored solution is no longer available."""
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self.counters['invalidations'] += 1
+
+    def count(self, counter: str) -> None:
+        """Increment counter of cache."""
+        with self._lock:
+            self.counters[counter] += 1
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        with self._lock:
+            self._entries.clear()
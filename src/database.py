@@ -0,0 +1,47 @@
+"""This module provides process-wide SQLAlchemy engines and session factories of task tables.
+
+Engine with its connection pool is created once per process and database URI and is shared
+by all tasks executed in the process. Pool workers create their engine by `init_worker`
+initializer, so connections are never inherited across fork.
+"""
+import os
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# engines and session factories of current process by database URI
+_engines = {}
+_sessions = {}
+# options of connection pool of current process
+_options = {}
+
+def options(config: dict = os.environ) -> dict:
+    """Get options of connection pool from application config or environment variables."""
+    return dict(pool_size = int(config.get('DB_POOL_SIZE', 2)),
+        max_overflow = int(config.get('DB_MAX_OVERFLOW', 2)),
+        pool_recycle = int(config.get('DB_POOL_RECYCLE', 1800)),
+        pool_pre_ping = True)
+
+def init_worker(uri: str, pool_options: dict = None) -> None:
+    """Initializer of pool worker process: create engine of process."""
+    # drop engines inherited from parent process without closing parent connections
+    for engine in _engines.values():
+        engine.dispose(close = False)
+    _engines.clear()
+    _sessions.clear()
+    _options.clear()
+    _options.update(pool_options or {})
+    get_engine(uri)
+
+def get_engine(uri: str):
+    """Get engine of current process, engine is created at first request."""
+    if uri not in _engines:
+        # sqlite pools do not support sizing
+        kwargs = {} if uri.startswith('sqlite') else _options or options()
+        _engines[uri] = create_engine(uri, **kwargs)
+        _sessions[uri] = sessionmaker(_engines[uri])
+    return _engines[uri]
+
+def session(uri: str):
+    """Open session bound to engine of current process."""
+    get_engine(uri)
+    return _sessions[uri]()
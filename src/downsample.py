@@ -0,0 +1,59 @@
+"""This module provides error-bounded adaptive downsampling of trajectories to be displayed.
+
+Samples are selected by Douglas-Peucker refinement generalized to 2D/3D curves of all bodies at
+once: starting from the first and last samples, each segment between selected samples is split
+at the sample of maximal deviation from the chord, deviation of sample is the maximal distance
+over bodies and vectors (positions, velocities) scaled by extent of vector. Refinement stops when
+deviation of every segment is within tolerance or point budget is reached, so sharp turns of
+close encounters are kept while smooth arcs are represented by a few samples. All segments are
+refined together and samples of segments within tolerance are not revisited.
+"""
+import numpy as np
+
+def deviation(vector: np.ndarray, index: np.ndarray, left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    """Distance of samples from chords of their segments, maximal over bodies, shape = (index,)."""
+    p, a, b = vector[index], vector[left], vector[right]
+    ab = b - a
+    ap = p - a
+    length = np.sum(ab**2, axis = -1, keepdims = True)
+    # projection onto chord, degenerate chord measures distance to its point
+    s = np.clip(np.divide(np.sum(ap * ab, axis = -1, keepdims = True), length, out = np.zeros_like(length), where = length > 0), 0, 1)
+    return np.linalg.norm(ap - s * ab, axis = -1).max(axis = -1)
+
+def select(vectors: list, max_points: int = None, tolerance: float = None) -> np.ndarray:
+    """Select indices of time samples of vectors of shape (time, order, dimension) to be kept.
+
+    tolerance: maximal deviation relative to extent of vector, None refines up to point budget
+    max_points: point budget, None keeps all samples deviating more than tolerance
+    """
+    n = vectors[0].shape[0]
+    budget = n if max_points is None else max(int(max_points), 2)
+    if n <= 2 or (tolerance is None and n <= budget):
+        return np.arange(n)
+    threshold = 0 if tolerance is None else tolerance
+    vectors = [vector / (np.ptp(vector, axis = (0, 1)).max() or 1) for vector in vectors]
+    keep = np.array([0, n - 1])
+    # samples of segments which are not within tolerance yet
+    active = np.ones(n, dtype = bool)
+    active[keep] = False
+    while keep.size < budget:
+        index = np.flatnonzero(active)
+        if index.size == 0:
+            break
+        segment = np.searchsorted(keep, index) - 1
+        left, right = keep[segment], keep[segment + 1]
+        error = np.max([deviation(vector, index, left, right) for vector in vectors], axis = 0)
+        # sample of maximal deviation of each segment
+        order = np.lexsort((-error, segment))
+        first = order[np.r_[True, segment[order][1:] != segment[order][:-1]]]
+        split = first[error[first] > threshold]
+        # segments within tolerance are finished
+        done = segment[first[error[first] <= threshold]]
+        active[index[np.isin(segment, done)]] = False
+        if split.size == 0:
+            break
+        if keep.size + split.size > budget:
+            split = split[np.argsort(-error[split])[:budget - keep.size]]
+        keep = np.union1d(keep, index[split])
+        active[index[split]] = False
+    return keep
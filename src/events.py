@@ -0,0 +1,234 @@
+"""This module provides detection of events during integration of classical gravitation task.
+
+Close approach of bodies makes the `1/d³` term of force kernel stiff, so adaptive integrator shrinks its
+step and fixed step integrator loses accuracy, and trajectory after such approach is rarely meaningful.
+Events are configured by `events` of solver settings:
+    collision: dict(radius, policy), bodies closer than radius collide, checked at each force evaluation
+    escape: dict(distance, policy), body farther than distance from center of mass escapes, checked at mesh points
+    energy: dict(threshold, policy), relative error of total energy exceeds threshold, checked at mesh points
+    softening: Plummer softening length applied by `soften` policy
+    budget: maximal count of force evaluations of task, integration is stopped when it is exhausted
+Policy of event is one of:
+    stop: integration is stopped, solution is truncated at the last mesh point before event
+    merge: the closest pair of bodies is merged conserving mass and momentum, merged bodies share trajectory
+    soften: force kernel is replaced by Plummer softened kernel, collisions are not detected further
+Mesh is integrated by segments, time of event detected inside segment is located by bisection.
+"""
+import numpy as np
+
+policies = dict(collision = ('stop', 'merge', 'soften'), escape = ('stop',), energy = ('stop', 'merge', 'soften'))
+# measure of each event
+measures = dict(collision = 'radius', escape = 'distance', energy = 'threshold')
+# count of mesh intervals integrated per segment, steps of bisection locating event inside interval
+segment = 64
+steps = 32
+
+def settings(data: dict) -> dict:
+    """Validate event settings of solver, empty if no event is configured."""
+    events = {}
+    for name, measure in measures.items():
+        item = data.get(name, None)
+        if not item or not item.get(measure, 0):
+            continue
+        policy = item.get('policy', 'stop')
+        if policy not in policies[name]:
+            raise ValueError(f'unknown policy of {name} event: {policy}')
+        events[name] = {measure: float(item[measure]), 'policy': policy}
+    if any(item['policy'] == 'soften' for item in events.values()):
+        if float(data.get('softening', 0)) <= 0:
+            raise ValueError('softening length is required by soften policy')
+        events['softening'] = float(data['softening'])
+    if int(data.get('budget', 0)) > 0:
+        events['budget'] = int(data['budget'])
+    return events
+
+def energy(r: np.ndarray, dr: np.ndarray, m: np.ndarray, g: float, softening: float = 0) -> float:
+    """Total energy of bodies."""
+    index_i, index_j = np.triu_indices(m.size, k = 1)
+    d = np.sqrt(np.sum((r[index_j] - r[index_i])**2, axis = -1) + softening**2)
+    return 0.5 * np.sum(m * np.sum(dr**2, axis = -1)) - g * np.sum(m[index_i] * m[index_j] / d)
+
+class EventDetected(Exception):
+    """Event detected during integration."""
+    def __init__(self, reason: str, bodies: tuple = ()) -> None:
+        super().__init__(reason)
+        self.reason = reason
+        self.bodies = bodies
+
+class Monitor():
+    """Integration of task by segments detecting events and applying their policies.
+    Merged bodies are removed from integrated system, each body is mapped to row of integrated state by `index`.
+    """
+    def __init__(self, events: dict, build, m: list, g: float) -> None:
+        self.events = events
+        # force kernel of masses and softening length
+        self.build = build
+        self.m = np.asarray(m, dtype = float)
+        self.g = g
+        self.index = np.arange(self.m.size)
+        self.softening = 0
+        self.radius = events.get('collision', {}).get('radius', 0)
+        self.budget = events.get('budget', 0)
+        self.calls = 0
+        self.log = []
+        self._rebuild()
+
+    def _rebuild(self) -> None:
+        self.kernel = self.build(list(self.m), self.softening)
+        self.index_i, self.index_j = np.triu_indices(self.m.size, k = 1)
+
+    def acceleration(self, r: np.ndarray) -> np.ndarray:
+        """Force kernel counting evaluations and detecting collisions."""
+        self.calls += 1
+        if self.budget and self.calls > self.budget:
+            raise EventDetected('budget')
+        if self.radius and self.index_i.size:
+            d2 = np.sum((r[self.index_j] - r[self.index_i])**2, axis = -1)
+            pair = np.argmin(d2)
+            if d2[pair] < self.radius**2:
+                raise EventDetected('collision', (self.index_i[pair], self.index_j[pair]))
+        return self.kernel(r)
+
+    def integrate(self, integrate, r0: np.ndarray, dr0: np.ndarray, mesh: np.ndarray, **settings) -> tuple:
+        """Integrate by integrator function over mesh, solution is truncated if integration is stopped by event."""
+        mesh = np.asarray(mesh, dtype = float)
+        r_out = np.empty((mesh.size,) + r0.shape)
+        dr_out = np.empty((mesh.size,) + r0.shape)
+        t, r, dr = mesh[0], np.asarray(r0, dtype = float), np.asarray(dr0, dtype = float)
+        r_out[0], dr_out[0] = r, dr
+        reference = self.energy(r, dr)
+        # state at time t is known, mesh points before index are filled
+        index = 1
+        while index < mesh.size:
+            end = min(index + segment, mesh.size)
+            times = np.concatenate(([t], mesh[index:end]))
+            try:
+                r_segment, dr_segment = integrate(self.acceleration, r, dr, times, **settings)
+            except EventDetected as event:
+                if event.reason == 'budget':
+                    self.report(event, t)
+                    break
+                t, r, dr, index, found, time = self.locate(integrate, t, r, dr, mesh, index, end, r_out, dr_out, settings)
+                if found is None:
+                    continue
+                if found.reason == 'budget':
+                    self.report(found, t)
+                    break
+                if not self.apply(found, time, r, dr):
+                    break
+                r, dr = self.reduce(r, dr, found)
+                reference = self.energy(r, dr)
+                continue
+            # check events of mesh points
+            event, offset = self.check(r_segment[1:], dr_segment[1:], reference)
+            count = r_segment.shape[0] - 1 if event is None else offset + 1
+            r_out[index:index + count] = r_segment[1:count + 1][:, self.index]
+            dr_out[index:index + count] = dr_segment[1:count + 1][:, self.index]
+            index += count
+            t, r, dr = mesh[index - 1], r_segment[count], dr_segment[count]
+            if event is not None:
+                if not self.apply(event, t, r, dr):
+                    break
+                r, dr = self.reduce(r, dr, event)
+                reference = self.energy(r, dr)
+        return r_out[:index], dr_out[:index]
+
+    def locate(self, integrate, t: float, r: np.ndarray, dr: np.ndarray, mesh: np.ndarray, index: int, end: int,
+        r_out: np.ndarray, dr_out: np.ndarray, settings: dict) -> tuple:
+        """Integrate segment by mesh intervals and bisect interval of event, return state before event, index of the next
+        mesh point, event and its time."""
+        detected = None
+        while index < end and detected is None:
+            try:
+                r_next, dr_next = integrate(self.acceleration, r, dr, np.array([t, mesh[index]]), **settings)
+            except EventDetected as event:
+                detected = event
+                continue
+            t, r, dr = mesh[index], r_next[-1], dr_next[-1]
+            r_out[index], dr_out[index] = r[self.index], dr[self.index]
+            index += 1
+        # event is not reproduced by intervals of segment or budget is exhausted
+        if detected is None or detected.reason == 'budget':
+            return t, r, dr, index, detected, t
+        # bisect interval [t, t1] where state at t is known and event is detected before t1
+        t1 = mesh[index]
+        for _ in range(steps):
+            middle = 0.5 * (t + t1)
+            try:
+                r_next, dr_next = integrate(self.acceleration, r, dr, np.array([t, middle]), **settings)
+            except EventDetected as event:
+                if event.reason == 'budget':
+                    return t, r, dr, index, event, t
+                t1, detected = middle, event
+                continue
+            t, r, dr = middle, r_next[-1], dr_next[-1]
+        return t, r, dr, index, detected, t1
+
+    def check(self, r: np.ndarray, dr: np.ndarray, reference: float) -> tuple:
+        """Find the first mesh point of escape or energy error, return event and offset of mesh point."""
+        first = (None, r.shape[0])
+        if 'escape' in self.events:
+            m = self.m[:, np.newaxis]
+            center = np.sum(r * m, axis = 1, keepdims = True) / np.sum(m)
+            escaped = np.linalg.norm(r - center, axis = -1) > self.events['escape']['distance']
+            points = np.flatnonzero(np.any(escaped, axis = 1))
+            if points.size:
+                first = (EventDetected('escape', tuple(np.flatnonzero(escaped[points[0]]))), points[0])
+        if 'energy' in self.events:
+            threshold = self.events['energy']['threshold'] * max(abs(reference), np.finfo(float).tiny)
+            for offset in range(first[1]):
+                if abs(self.energy(r[offset], dr[offset]) - reference) > threshold:
+                    first = (EventDetected('energy', self.closest(r[offset])), offset)
+                    break
+        return first
+
+    def energy(self, r: np.ndarray, dr: np.ndarray) -> float:
+        return energy(r, dr, self.m, self.g, self.softening) if 'energy' in self.events else 0
+
+    def closest(self, r: np.ndarray) -> tuple:
+        """Closest pair of bodies of integrated state."""
+        if not self.index_i.size:
+            return ()
+        pair = np.argmin(np.sum((r[self.index_j] - r[self.index_i])**2, axis = -1))
+        return (self.index_i[pair], self.index_j[pair])
+
+    def policy(self, reason: str) -> str:
+        """Policy of event, exhausted budget stops integration."""
+        return self.events[reason]['policy'] if reason in policies else 'stop'
+
+    def report(self, event: EventDetected, t: float) -> dict:
+        """Record event with bodies numbered by task."""
+        policy = self.policy(event.reason)
+        bodies = sorted(int(body) for row in event.bodies for body in np.flatnonzero(self.index == row))
+        self.log.append(dict(reason = event.reason, t = float(t), bodies = bodies, policy = policy))
+        return self.log[-1]
+
+    def apply(self, event: EventDetected, t: float, r: np.ndarray, dr: np.ndarray) -> bool:
+        """Record event and apply its policy, return False if integration is stopped."""
+        policy = self.report(event, t)['policy']
+        match policy:
+            case 'stop':
+                return False
+            case 'merge':
+                # single body is left
+                return len(event.bodies) == 2
+            case 'soften':
+                self.softening = self.events['softening']
+                self.radius = 0
+                self._rebuild()
+        return True
+
+    def reduce(self, r: np.ndarray, dr: np.ndarray, event: EventDetected) -> tuple:
+        """Merge pair of bodies of merge policy into their center of mass, return reduced state."""
+        if self.policy(event.reason) != 'merge':
+            return r, dr
+        i, j = sorted(event.bodies)
+        m = self.m[i] + self.m[j]
+        r, dr = r.copy(), dr.copy()
+        r[i] = (self.m[i] * r[i] + self.m[j] * r[j]) / m
+        dr[i] = (self.m[i] * dr[i] + self.m[j] * dr[j]) / m
+        self.m[i] = m
+        self.m = np.delete(self.m, j)
+        self.index = np.where(self.index == j, i, self.index - (self.index > j))
+        self._rebuild()
+        return np.delete(r, j, axis = 0), np.delete(dr, j, axis = 0)
@@ -0,0 +1,23 @@
+"""This module provides lazy import of heavy modules.
+
+Module imported by `lazy` is registered at `sys.modules` at once, but it is executed at the first access
+to its attribute, so web process and tests do not pay import cost of scipy, numba and plotly until
+a task is solved or rendered. Pool workers import them by warm-up of initializer.
+"""
+import sys, importlib.util
+
+def lazy(name: str):
+    """Import module on the first access to its attribute."""
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f'no module named {name}', name = name)
+    spec.loader = importlib.util.LazyLoader(spec.loader)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    parent, _, child = name.rpartition('.')
+    if parent:
+        setattr(sys.modules[parent], child, module)
+    return module
@@ -0,0 +1,143 @@
+"""This module provides integrators of the cauchy problem of classical gravitation task.
+Each integrator accepts acceleration function `ddr = acceleration(r)`, initial positions and velocities
+of shape (..., order, dimension) and time mesh, and returns positions and velocities
+of shape (time, ..., order, dimension) sampled at mesh points.
+"""
+import numpy as np
+
+from src import imports
+
+integrate = imports.lazy('scipy.integrate')
+
+def lsoda(acceleration, r0: np.ndarray, dr0: np.ndarray, mesh: np.ndarray,
+    rtol: float = None, atol: float = None, **kwargs) -> tuple:
+    """Integrate by means scipy odeint (LSODA) on stacked state vector [r, dr]."""
+    shape = r0.shape
+    n = r0.size
+    def system_equations(argument: np.ndarray, t: float) -> np.ndarray:
+        vector = np.empty(2 * n)
+        vector[:n] = argument[n:]
+        vector[n:] = acceleration(argument[:n].reshape(shape)).ravel()
+        return vector
+    solution = integrate.odeint(system_equations, np.concatenate((r0.ravel(), dr0.ravel())), mesh, rtol = rtol, atol = atol)
+    return solution[:, :n].reshape((-1,) + shape), solution[:, n:].reshape((-1,) + shape)
+
+def _steps(mesh: np.ndarray, substeps: int):
+    """Iterate over mesh intervals yielding index of interval end and step size."""
+    for index in range(1, mesh.size):
+        yield index, (mesh[index] - mesh[index - 1]) / substeps
+
+def _allocate(r0: np.ndarray, mesh: np.ndarray) -> tuple:
+    """Allocate solution arrays."""
+    r = np.empty((mesh.size,) + r0.shape)
+    dr = np.empty((mesh.size,) + r0.shape)
+    return r, dr
+
+def leapfrog(acceleration, r0: np.ndarray, dr0: np.ndarray, mesh: np.ndarray, substeps: int = 1, **kwargs) -> tuple:
+    """Integrate by means second order symplectic leapfrog (kick-drift-kick velocity Verlet) with fixed step."""
+    r_out, dr_out = _allocate(r0, mesh)
+    r, dr = r0.astype(float), dr0.astype(float)
+    r_out[0], dr_out[0] = r, dr
+    ddr = acceleration(r).copy()
+    for index, h in _steps(mesh, substeps):
+        for _ in range(substeps):
+            dr += 0.5 * h * ddr
+            r += h * dr
+            np.copyto(ddr, acceleration(r))
+            dr += 0.5 * h * ddr
+        r_out[index], dr_out[index] = r, dr
+    return r_out, dr_out
+
+# coefficients of fourth order Yoshida composition
+_w1 = 1 / (2 - 2**(1 / 3))
+_w0 = -2**(1 / 3) * _w1
+_yoshida_c = (_w1 / 2, (_w0 + _w1) / 2, (_w0 + _w1) / 2, _w1 / 2)
+_yoshida_d = (_w1, _w0, _w1)
+
+def yoshida4(acceleration, r0: np.ndarray, dr0: np.ndarray, mesh: np.ndarray, substeps: int = 1, **kwargs) -> tuple:
+    """Integrate by means fourth order symplectic Yoshida composition with fixed step."""
+    r_out, dr_out = _allocate(r0, mesh)
+    r, dr = r0.astype(float), dr0.astype(float)
+    r_out[0], dr_out[0] = r, dr
+    for index, h in _steps(mesh, substeps):
+        for _ in range(substeps):
+            for c, d in zip(_yoshida_c, _yoshida_d):
+                r += c * h * dr
+                dr += d * h * acceleration(r)
+            r += _yoshida_c[-1] * h * dr
+        r_out[index], dr_out[index] = r, dr
+    return r_out, dr_out
+
+# Butcher tableau of Dormand-Prince 5(4) method
+_dopri_a = [[], [1 / 5], [3 / 40, 9 / 40], [44 / 45, -56 / 15, 32 / 9],
+    [19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729],
+    [9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656]]
+_dopri_b = np.array([35 / 384, 0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84, 0])
+_dopri_e = np.array([-71 / 57600, 0, 71 / 16695, -71 / 1920, 17253 / 339200, -22 / 525, 1 / 40])
+# coefficients of fourth order dense output (Shampine)
+_dopri_p = np.array([
+    [1, -8048581381 / 2820520608, 8663915743 / 2820520608, -12715105075 / 11282082432],
+    [0, 0, 0, 0],
+    [0, 131558114200 / 32700410799, -68118460800 / 10900136933, 87487479700 / 32700410799],
+    [0, -1754552775 / 470086768, 14199869525 / 1410260304, -10690763975 / 1880347072],
+    [0, 127303824393 / 49829197408, -318862633887 / 49829197408, 701980252875 / 199316789632],
+    [0, -282668133 / 205662961, 2019193451 / 616988883, -1453857185 / 822651844],
+    [0, 40617522 / 29380423, -110615467 / 29380423, 69997945 / 29380423]])
+
+def dopri5(acceleration, r0: np.ndarray, dr0: np.ndarray, mesh: np.ndarray,
+    rtol: float = 1e-8, atol: float = 1e-10, max_step: float = np.inf, **kwargs) -> tuple:
+    """Integrate by means adaptive Dormand-Prince 5(4) Runge-Kutta method with dense output at mesh points.
+    State is kept as stacked array [r, dr] of shape (2, ..., order, dimension).
+    """
+    rtol = 1e-8 if rtol is None else rtol
+    atol = 1e-10 if atol is None else atol
+    r_out, dr_out = _allocate(r0, mesh)
+    y = np.stack((r0, dr0)).astype(float)
+    r_out[0], dr_out[0] = y
+    def derivative(y: np.ndarray) -> np.ndarray:
+        return np.stack((y[1], acceleration(y[0])))
+    k = np.empty((7,) + y.shape)
+    k[0] = derivative(y)
+    # select initial step
+    scale = atol + rtol * np.abs(y)
+    d0, d1 = np.sqrt(np.mean((y / scale)**2)), np.sqrt(np.mean((k[0] / scale)**2))
+    h = 1e-6 if d0 < 1e-5 or d1 < 1e-5 else 0.01 * d0 / d1
+    h = min(h, max_step, mesh[-1] - mesh[0])
+    t = mesh[0]
+    index = 1
+    while index < mesh.size:
+        # adjust the last step to end of mesh
+        last = t + h >= mesh[-1]
+        if last:
+            h = mesh[-1] - t
+        t_new = mesh[-1] if last else t + h
+        # evaluate stages
+        for stage in range(1, 6):
+            k[stage] = derivative(y + h * np.tensordot(_dopri_a[stage], k[:stage], axes = 1))
+        y_new = y + h * np.tensordot(_dopri_b, k, axes = 1)
+        k[6] = derivative(y_new)
+        # estimate local error
+        scale = atol + rtol * np.maximum(np.abs(y), np.abs(y_new))
+        error = np.sqrt(np.mean((h * np.tensordot(_dopri_e, k, axes = 1) / scale)**2))
+        if error <= 1:
+            # fill mesh points covered by the step with dense output
+            while index < mesh.size and mesh[index] <= t_new:
+                theta = (mesh[index] - t) / h
+                q = np.tensordot(_dopri_p @ (theta ** np.arange(1, 5)), k, axes = 1)
+                r_out[index], dr_out[index] = y + h * q
+                index += 1
+            t = t_new
+            y = y_new
+            k[0] = k[6]
+        factor = 10 if error == 0 else min(10, max(0.2, 0.9 * error**-0.2))
+        h = min(h * (factor if error <= 1 else min(1, factor)), max_step)
+    return r_out, dr_out
+
+# registry of available integrators
+integrators = dict(odeint = lsoda, leapfrog = leapfrog, verlet = leapfrog, yoshida4 = yoshida4, rk45 = dopri5)
+
+def build_integrator(name: str = 'odeint'):
+    """Get integrator function by name."""
+    if name not in integrators:
+        raise ValueError(f'unknown integrator: {name}')
+    return integrators[name]
@@ -0,0 +1,160 @@
+"""This module provides force kernels to evaluate the right-hand side of classical gravitation task."""
+import numpy as np
+from src import trees
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+class KernelDirect():
+    """Direct summation of pairwise accelerations by means numpy.
+    Mass vector, pair indices and work buffers are allocated once per problem, each pair
+    of bodies is evaluated once and applied to both bodies (Newton's third law).
+    Nonzero softening length eps replaces mutual distance d by Plummer softened distance (d² + eps²)^½.
+    """
+    def __init__(self, m: list, g: float, order: int, dimension: int, softening: float = 0) -> None:
+        self.m = np.asarray(m, dtype = float)
+        self.g = g
+        self.softening = float(softening)
+        self.order = order
+        self.dimension = dimension
+        # indices of unique pairs i < j
+        self.index_i, self.index_j = np.triu_indices(order, k = 1)
+        # flat indices of upper and lower triangle of pair matrix
+        self.index_ij = np.ravel_multi_index((self.index_i, self.index_j), (order, order))
+        self.index_ji = np.ravel_multi_index((self.index_j, self.index_i), (order, order))
+        # preallocate work buffers
+        n_pair = self.index_i.size
+        self._r_i = np.empty((n_pair, dimension)) # shape = (pair, dimension)
+        self._r_j = np.empty((n_pair, dimension)) # shape = (pair, dimension)
+        self._d_ij = np.empty(n_pair) # shape = (pair)
+        self._s_ij = np.zeros((order, order)) # shape = (order, order), zero diagonal
+        self._mr = np.empty((order, dimension)) # shape = (order, dimension)
+        self._sm = np.empty(order) # shape = (order)
+        self.ddr = np.empty((order, dimension)) # shape = (order, dimension)
+
+    def __call__(self, r: np.ndarray) -> np.ndarray:
+        """Calculate accelerations of bodies, returned array is a reused buffer."""
+        # calculate mutual coordinate difference of unique pairs
+        np.take(r, self.index_i, axis = 0, out = self._r_i)
+        np.take(r, self.index_j, axis = 0, out = self._r_j)
+        np.subtract(self._r_j, self._r_i, out = self._r_j)
+        # calculate inverse cubic mutual distance of unique pairs
+        np.einsum('ij,ij->i', self._r_j, self._r_j, out = self._d_ij)
+        if self.softening:
+            np.add(self._d_ij, self.softening**2, out = self._d_ij)
+        np.power(self._d_ij, -1.5, out = self._d_ij)
+        # fill symmetric matrix of inverse cubic mutual distance
+        np.put(self._s_ij, self.index_ij, self._d_ij)
+        np.put(self._s_ij, self.index_ji, self._d_ij)
+        # ddr_i = g * sum_j s_ij * m_j * (r_j - r_i)
+        np.multiply(r, self.m[:, np.newaxis], out = self._mr)
+        np.matmul(self._s_ij, self._mr, out = self.ddr)
+        np.matmul(self._s_ij, self.m, out = self._sm)
+        np.multiply(r, self._sm[:, np.newaxis], out = self._mr)
+        np.subtract(self.ddr, self._mr, out = self.ddr)
+        np.multiply(self.ddr, self.g, out = self.ddr)
+        return self.ddr
+
+if numba is not None:
+    @numba.njit(cache = True, fastmath = False)
+    def _direct_loop(r, m, g, eps2, ddr):
+        """Compiled pairwise loop applying each interaction to both bodies."""
+        order, dimension = r.shape
+        ddr[:, :] = 0.0
+        for i in range(order):
+            for j in range(i + 1, order):
+                d2 = eps2
+                for k in range(dimension):
+                    d2 += (r[j, k] - r[i, k])**2
+                s = d2**-1.5
+                for k in range(dimension):
+                    f = g * s * (r[j, k] - r[i, k])
+                    ddr[i, k] += m[j] * f
+                    ddr[j, k] -= m[i] * f
+        return ddr
+
+    class KernelDirectJit(KernelDirect):
+        """Direct summation of pairwise accelerations compiled by means numba."""
+        def __call__(self, r: np.ndarray) -> np.ndarray:
+            """Calculate accelerations of bodies, returned array is a reused buffer."""
+            return _direct_loop(np.ascontiguousarray(r), self.m, self.g, self.softening**2, self.ddr)
+
+class KernelEnsemble():
+    """Direct summation of pairwise accelerations over ensemble of problems of the same order and dimension.
+    Positions have shape (ensemble, order, dimension), masses (ensemble, order) and gravitational constants (ensemble).
+    """
+    def __init__(self, m: np.ndarray, g: np.ndarray, order: int, dimension: int) -> None:
+        self.m = np.asarray(m, dtype = float)
+        self.g = np.asarray(g, dtype = float)
+        self.order = order
+        self.dimension = dimension
+        n_ensemble = self.m.shape[0]
+        # indices of unique pairs i < j
+        self.index_i, self.index_j = np.triu_indices(order, k = 1)
+        # preallocate work buffers
+        n_pair = self.index_i.size
+        self._r_i = np.empty((n_ensemble, n_pair, dimension)) # shape = (ensemble, pair, dimension)
+        self._r_j = np.empty((n_ensemble, n_pair, dimension)) # shape = (ensemble, pair, dimension)
+        self._d_ij = np.empty((n_ensemble, n_pair)) # shape = (ensemble, pair)
+        self._s_ij = np.zeros((n_ensemble, order, order)) # shape = (ensemble, order, order), zero diagonal
+        self._mr = np.empty((n_ensemble, order, dimension)) # shape = (ensemble, order, dimension)
+        self._sm = np.empty((n_ensemble, order, 1)) # shape = (ensemble, order, 1)
+        self.ddr = np.empty((n_ensemble, order, dimension)) # shape = (ensemble, order, dimension)
+
+    def __call__(self, r: np.ndarray) -> np.ndarray:
+        """Calculate accelerations of bodies of all problems, returned array is a reused buffer."""
+        # calculate mutual coordinate difference of unique pairs
+        np.take(r, self.index_i, axis = 1, out = self._r_i)
+        np.take(r, self.index_j, axis = 1, out = self._r_j)
+        np.subtract(self._r_j, self._r_i, out = self._r_j)
+        # calculate inverse cubic mutual distance of unique pairs
+        np.einsum('kij,kij->ki', self._r_j, self._r_j, out = self._d_ij)
+        np.power(self._d_ij, -1.5, out = self._d_ij)
+        # fill symmetric matrices of inverse cubic mutual distance
+        self._s_ij[:, self.index_i, self.index_j] = self._d_ij
+        self._s_ij[:, self.index_j, self.index_i] = self._d_ij
+        # ddr_i = g * sum_j s_ij * m_j * (r_j - r_i)
+        np.multiply(r, self.m[:, :, np.newaxis], out = self._mr)
+        np.matmul(self._s_ij, self._mr, out = self.ddr)
+        np.matmul(self._s_ij, self.m[:, :, np.newaxis], out = self._sm)
+        np.multiply(r, self._sm, out = self._mr)
+        np.subtract(self.ddr, self._mr, out = self.ddr)
+        np.multiply(self.ddr, self.g[:, np.newaxis, np.newaxis], out = self.ddr)
+        return self.ddr
+
+class KernelTree():
+    """Approximate accelerations by means Barnes-Hut tree code with opening angle theta."""
+    def __init__(self, m: list, g: float, order: int, dimension: int, theta: float = 0.5, leaf_size: int = 8,
+        softening: float = 0) -> None:
+        self.m = np.asarray(m, dtype = float)
+        self.g = g
+        self.softening = float(softening)
+        self.order = order
+        self.dimension = dimension
+        self.theta = theta
+        self.leaf_size = leaf_size
+
+    def __call__(self, r: np.ndarray) -> np.ndarray:
+        """Calculate accelerations of bodies."""
+        tree = trees.Tree(r, self.m, self.leaf_size)
+        return tree.accelerate(r, self.m, self.g, self.theta, self.softening)
+
+# registry of available kernel backends
+backends = dict(numpy = KernelDirect)
+if numba is not None:
+    backends['numba'] = KernelDirectJit
+
+def build_kernel(m: list, g: float, order: int, dimension: int, backend: str = 'numpy', 
+    engine: str = 'direct', theta: float = 0.5, softening: float = 0, **kwargs) -> KernelDirect | KernelTree:
+    """Create force kernel of specified engine and backend, JIT backend falls back to numpy if numba is not installed."""
+    match engine:
+        case 'direct':
+            if backend == 'numba' and numba is None:
+                backend = 'numpy'
+            return backends[backend](m, g, order, dimension, softening)
+        case 'tree':
+            return KernelTree(m, g, order, dimension, theta, softening = softening)
+        case _:
+            raise ValueError(f'unknown force engine: {engine}')
@@ -0,0 +1,153 @@
+"""This module provides per-phase timing instrumentation of tasks and aggregate metrics in Prometheus text format.
+
+Worker records durations of phases of executed task (integration, evaluations of force kernel, storing,
+reading of database, reduction and rendering of each figure, offloading of payloads) and counters
+(evaluations of force kernel, bytes serialized) by recorder of current process. Recording is attached
+to `result['worker']` and aggregated by web process together with its own phases (queue wait, result
+store, socket emits) into histograms exposed by `/metrics` route. Task requested with `profile` flag
+is executed under cProfile and statistics are attached to `result['worker']['profile']`.
+"""
+import time, threading, cProfile, pstats, io
+from contextlib import contextmanager
+
+# prefix of metric names
+prefix = 'slv_phs_tsk'
+# upper bounds of histogram buckets, s
+buckets = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 60, float('inf'))
+
+class Recorder():
+    """Accumulated durations of phases and counters of task executed by current process."""
+    def __init__(self) -> None:
+        self.phases = {}
+        self.counters = {}
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0) + time.perf_counter() - start
+
+    def count(self, name: str, value: float = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def reset(self) -> dict:
+        """Get recording and start new one."""
+        recording = dict(phases = self.phases, counters = self.counters)
+        self.phases, self.counters = {}, {}
+        return recording
+
+# recorder of current process
+_recorder = Recorder()
+
+def phase(name: str):
+    """Context manager recording duration of phase of current task."""
+    return _recorder.phase(name)
+
+def count(name: str, value: float = 1) -> None:
+    """Increment counter of current task."""
+    _recorder.count(name, value)
+
+def reset() -> dict:
+    """Get recording of current task and start new one."""
+    return _recorder.reset()
+
+def instrument(acceleration):
+    """Wrap force kernel to count its evaluations and their duration."""
+    recorder = _recorder
+    def wrapper(r):
+        start = time.perf_counter()
+        try:
+            return acceleration(r)
+        finally:
+            recorder.phases['rhs'] = recorder.phases.get('rhs', 0) + time.perf_counter() - start
+            recorder.counters['rhs_calls'] = recorder.counters.get('rhs_calls', 0) + 1
+    return wrapper
+
+def profile(function, *args, **kwargs) -> tuple:
+    """Call function under cProfile, return result and statistics sorted by cumulative time."""
+    profiler = cProfile.Profile()
+    result = profiler.runcall(function, *args, **kwargs)
+    stream = io.StringIO()
+    pstats.Stats(profiler, stream = stream).sort_stats('cumulative').print_stats(40)
+    return result, stream.getvalue()
+
+class Histogram():
+    """Cumulative histogram of observed values."""
+    def __init__(self) -> None:
+        self.counts = [0] * len(buckets)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts = [count + (value <= bound) for count, bound in zip(self.counts, buckets)]
+        self.sum += value
+        self.count += 1
+
+def labels(items: dict) -> str:
+    return ','.join(f'{key}="{value}"' for key, value in sorted(items.items()))
+
+def block(labels: str) -> str:
+    return f'{{{labels}}}' if labels else ''
+
+class Registry():
+    """Aggregate histograms and counters of web process."""
+    def __init__(self) -> None:
+        self.histograms = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, value: float, **items) -> None:
+        """Add value to histogram."""
+        with self._lock:
+            self.histograms.setdefault((name, labels(items)), Histogram()).observe(value)
+
+    def increment(self, name: str, value: float = 1, **items) -> None:
+        """Increment counter."""
+        with self._lock:
+            key = (name, labels(items))
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    @contextmanager
+    def phase(self, name: str):
+        """Context manager observing duration of phase of web process."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe('phase_seconds', time.perf_counter() - start, phase = name)
+
+    def record(self, worker: dict, method: str) -> None:
+        """Aggregate recording of task attached by worker."""
+        if not worker:
+            return
+        self.observe('task_seconds', worker.get('time', 0), method = method)
+        [self.observe('phase_seconds', value, phase = name) for name, value in worker.get('phases', {}).items()]
+        [self.increment(f'{name}_total', value) for name, value in worker.get('counters', {}).items()]
+
+    def render(self, gauges: dict = {}) -> str:
+        """Render metrics in Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for name in sorted({name for name, _ in self.histograms}):
+                lines.append(f'# TYPE {prefix}_{name} histogram')
+                for (metric, items), histogram in sorted(self.histograms.items()):
+                    if metric != name:
+                        continue
+                    for bound, count in zip(buckets, histogram.counts):
+                        bound = '+Inf' if bound == float('inf') else bound
+                        bucket = ','.join(filter(None, [items, f'le="{bound}"']))
+                        lines.append(f'{prefix}_{name}_bucket{block(bucket)} {count}')
+                    lines.append(f'{prefix}_{name}_sum{block(items)} {histogram.sum}')
+                    lines.append(f'{prefix}_{name}_count{block(items)} {histogram.count}')
+            for name in sorted({name for name, _ in self.counters}):
+                lines.append(f'# TYPE {prefix}_{name} counter')
+                lines += [f'{prefix}_{name}{block(items)} {value}' for (metric, items), value in sorted(self.counters.items()) if metric == name]
+        for name, value in sorted(gauges.items()):
+            lines.append(f'# TYPE {prefix}_{name} gauge')
+            lines.append(f'{prefix}_{name} {value}')
+        return '\n'.join(lines) + '\n'
+
+# registry of web process
+registry = Registry()
@@ -0,0 +1,66 @@
+"""This module provides migration of task tables to binary trajectory storage.
+
+Schema upgrade is applied at application initialization. Legacy records holding trajectories
+in ARRAY(Float) columns remain readable and are converted to binary chunks by:
+    python -m src.migrations
+"""
+import os, dotenv
+import numpy as np
+from sqlalchemy import create_engine, inspect, text, ARRAY
+from sqlalchemy.orm import sessionmaker
+
+from src import solver
+
+def upgrade(engine) -> None:
+    """Add missing columns and indexes of task table and recreate chunk table of array columns as binary one."""
+    inspector = inspect(engine)
+    table = solver.ModelTaskClassicalGravitation.__table__
+    columns = {column['name'] for column in inspector.get_columns(table.name)}
+    with engine.begin() as connection:
+        for column in table.columns:
+            if column.name not in columns:
+                connection.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(engine.dialect)}'))
+        for index in table.indexes:
+            index.create(connection, checkfirst = True)
+    # chunk table of streamed results had array columns before binary storage
+    table = solver.ModelTaskClassicalGravitationChunk.__table__
+    columns = {column['name']: column['type'] for column in inspector.get_columns(table.name)}
+    if isinstance(columns.get('t'), ARRAY):
+        options = solver.storage.options()
+        with engine.begin() as connection:
+            rows = connection.execute(text(f'SELECT id, chunk, t, r, dr FROM {table.name}')).all()
+            records = [dict(id = id, chunk = chunk, t0 = float(t[0]), t1 = float(t[-1]), t = solver.storage.encode(np.array(t), **options),
+                r = solver.storage.encode(np.array(r), **options), dr = solver.storage.encode(np.array(dr), **options)) 
+                for id, chunk, t, r, dr in rows]
+            table.drop(connection)
+            table.create(connection)
+            if records:
+                connection.execute(table.insert(), records)
+
+def convert(engine, batch: int = 100) -> int:
+    """Convert legacy records of array columns to binary chunks, return count of converted records."""
+    Session = sessionmaker(engine)
+    count = 0
+    while True:
+        with Session() as session:
+            records = session.query(solver.ModelTaskClassicalGravitation).filter(
+                solver.ModelTaskClassicalGravitation.encoding.is_(None),
+                solver.ModelTaskClassicalGravitation.t.isnot(None)).limit(batch).all()
+            if not records:
+                return count
+            for record in records:
+                task = solver.TaskClassicalGravitation(id = record.id)
+                session.query(solver.ModelTaskClassicalGravitationChunk).filter_by(id = record.id).delete()
+                session.add_all(task.chunks(record.id, np.array(record.t), np.array(record.r), np.array(record.dr)))
+                record.t, record.r, record.dr = None, None, None
+                record.encoding = solver.storage.encoding(**task._storage)
+                record.chunk_size = task._storage['chunk']
+            session.commit()
+            count += len(records)
+
+if __name__ == '__main__':
+    dotenv.load_dotenv()
+    engine = create_engine(os.environ['SQLALCHEMY_DATABASE_URI'])
+    solver.Base.metadata.create_all(engine)
+    upgrade(engine)
+    print(f'converted records: {convert(engine)}')
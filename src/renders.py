@@ -0,0 +1,123 @@
+"""This module provides cache of rendered figures of postprocessed tasks.
+
+Figures are addressed by task identifier, version of stored solution and export parameters, so
+repeated views of the same output are served without postprocessing at pool. Rendered figures are
+kept by two LRU tiers: parsed figures in memory and JSON files on disk, size of each tier is limited
+by environment variables RENDER_CACHE_MEMORY and RENDER_CACHE_DISK (MB). Version of solution is
+changed when task is stored again, figures of other versions of task are dropped when new version
+is seen.
+"""
+import os, json, hashlib, shutil, threading
+from collections import OrderedDict
+
+from src import shared
+
+def options() -> dict:
+    """Get limits of render cache from environment variables."""
+    return dict(memory = int(float(os.environ.get('RENDER_CACHE_MEMORY', 64)) * 2**20),
+        disk = int(float(os.environ.get('RENDER_CACHE_DISK', 512)) * 2**20))
+
+def key(id: str, version: str, parameters: dict) -> str:
+    """Key of rendered figures."""
+    return hashlib.sha256(json.dumps(dict(id = id, version = version, parameters = parameters), sort_keys = True).encode()).hexdigest()
+
+class RenderedFigures():
+    """Reference to figures kept by render cache, figures are owned by cache."""
+    memory = False
+    nbytes = 0
+    def __init__(self, cache, key: str) -> None:
+        self.cache = cache
+        self.key = key
+
+    def load(self) -> dict:
+        """Read figures from render cache."""
+        figures = self.cache.get(self.key)
+        if figures is None:
+            raise KeyError(f'figures are evicted: {self.key}')
+        return figures
+
+    def release(self) -> None:
+        pass
+
+class RenderCache():
+    """Two-tier LRU cache of rendered figures."""
+    def __init__(self, memory: int = None, disk: int = None, directory: str = None) -> None:
+        limits = options()
+        self.memory = limits['memory'] if memory is None else memory
+        self.disk = limits['disk'] if disk is None else disk
+        self.directory = os.path.join(directory or shared.directory(), 'render')
+        # parsed figures by key with their size, files by key with task identifier and size
+        self._memory = OrderedDict()
+        self._disk = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = dict(memory_hits = 0, disk_hits = 0, misses = 0, evictions = 0, invalidations = 0)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._memory or key in self._disk
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, f'{key}.json')
+
+    def get(self, key: str) -> dict | None:
+        """Get figures by key, figures read from disk are promoted to memory."""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self._disk.move_to_end(key)
+                self.counters['memory_hits'] += 1
+                return self._memory[key][0]
+            if key not in self._disk:
+                self.counters['misses'] += 1
+                return None
+            self._disk.move_to_end(key)
+            self.counters['disk_hits'] += 1
+            nbytes = self._disk[key][1]
+        with open(self.path(key)) as file:
+            figures = json.load(file)
+        with self._lock:
+            if key in self._disk:
+                self._memory[key] = (figures, nbytes)
+                self._enforce()
+        return figures
+
+    def put(self, key: str, id: str, path: str) -> None:
+        """Insert figures dumped to JSON file, file is copied to disk tier."""
+        os.makedirs(self.directory, exist_ok = True)
+        shutil.copyfile(path, self.path(key))
+        with self._lock:
+            self._disk[key] = (id, os.path.getsize(self.path(key)))
+            self._enforce()
+
+    def invalidate(self, id: str, keep: str = None) -> None:
+        """Drop figures of task except figures of specified key."""
+        with self._lock:
+            [self._drop(item, 'invalidations') for item, value in list(self._disk.items()) if value[0] == id and item != keep]
+
+    def clear(self) -> None:
+        """Drop all figures."""
+        with self._lock:
+            [self._drop(item, 'evictions') for item in list(self._disk.keys())]
+
+    def usage(self) -> dict:
+        """Get bytes of figures kept by tiers."""
+        return dict(memory = sum(value[1] for value in self._memory.values()), disk = sum(value[1] for value in self._disk.values()))
+
+    def _drop(self, key: str, counter: str) -> None:
+        """Remove figures from both tiers."""
+        self._memory.pop(key, None)
+        self._disk.pop(key, None)
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
+        self.counters[counter] += 1
+
+    def _enforce(self) -> None:
+        """Apply size limits, least recently used figures are evicted first, the most recent are kept."""
+        usage = self.usage()
+        while usage['memory'] > self.memory and len(self._memory) > 1:
+            usage['memory'] -= self._memory.popitem(last = False)[1][1]
+        while usage['disk'] > self.disk and len(self._disk) > 1:
+            item = next(iter(self._disk))
+            usage['disk'] -= self._disk[item][1]
+            self._drop(item, 'evictions')
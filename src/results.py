@@ -0,0 +1,134 @@
+"""This module provides bounded store of task results kept by web process.
+
+Store holds metadata of results by client and task identifiers in LRU order. Trajectories held in
+shared memory are limited by memory budget: least recently used entries are spilled to npy files
+when budget is exceeded or when client disconnects, so reconnecting client can still fetch them.
+Entries not accessed during TTL are dropped together with their files, spilled and figure files
+are limited by disk budget. Limits are configured by environment variables:
+    RESULTS_MEMORY: memory budget of shared arrays, MB
+    RESULTS_DISK: disk budget of spilled arrays and figures, MB
+    RESULTS_TTL: time to live of entry since last access, s
+"""
+import os, threading, time
+from collections import OrderedDict
+
+from src import shared
+
+def options() -> dict:
+    """Get limits of result store from environment variables."""
+    return dict(memory = int(float(os.environ.get('RESULTS_MEMORY', 256)) * 2**20),
+        disk = int(float(os.environ.get('RESULTS_DISK', 1024)) * 2**20),
+        ttl = float(os.environ.get('RESULTS_TTL', 3600)))
+
+class ResultStore():
+    """Result store bounded by memory and disk budgets with LRU and TTL eviction."""
+    def __init__(self, memory: int = None, disk: int = None, ttl: float = None, directory: str = None) -> None:
+        limits = options()
+        self.memory = limits['memory'] if memory is None else memory
+        self.disk = limits['disk'] if disk is None else disk
+        self.ttl = limits['ttl'] if ttl is None else ttl
+        self.directory = os.path.join(directory or shared.directory(), 'spill')
+        # entries by (sid, id) in order of access, the last is the most recent
+        self._entries = OrderedDict()
+        self._access = {}
+        self._lock = threading.Lock()
+        self.counters = dict(spilled = 0, expired = 0, evicted = 0)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: tuple) -> bool:
+        return key in self._entries
+
+    def put(self, result: dict) -> None:
+        """Insert result, payloads of replaced result are released."""
+        key = (result['sid'], result['id'])
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            self._entries[key] = result
+            self._access[key] = time.time()
+            self._enforce()
+        if previous is not None and previous is not result:
+            shared.release(previous)
+
+    def attach(self, sid: str, id: str, name: str, value) -> None:
+        """Attach payload to result entry, replaced payload is released."""
+        key = (sid, id)
+        with self._lock:
+            entry = self._entries.pop(key, None) or dict(sid = sid, id = id)
+            previous, entry[name] = entry.get(name, None), value
+            self._entries[key] = entry
+            self._access[key] = time.time()
+            self._enforce()
+        if previous is not None and previous is not value:
+            previous.release()
+
+    def get(self, sid: str, id: str) -> dict:
+        """Get result entry and mark it as recently used, raise KeyError if entry is missed or expired."""
+        key = (sid, id)
+        with self._lock:
+            self._expire()
+            entry = self._entries[key]
+            self._entries.move_to_end(key)
+            self._access[key] = time.time()
+            return entry
+
+    def spill(self, sid: str) -> None:
+        """Move shared arrays of client results to disk."""
+        with self._lock:
+            [self._spill(entry) for key, entry in self._entries.items() if key[0] == sid]
+            self._enforce()
+
+    def clear(self) -> None:
+        """Drop all results and release their payloads."""
+        with self._lock:
+            entries = list(self._entries.values())
+            self._entries.clear()
+            self._access.clear()
+        [shared.release(entry) for entry in entries]
+
+    def usage(self) -> dict:
+        """Get bytes of payloads kept in shared memory and on disk."""
+        usage = dict(memory = 0, disk = 0)
+        for entry in self._entries.values():
+            for item in shared.references(entry):
+                usage['memory' if item.memory else 'disk'] += item.nbytes
+        return usage
+
+    def _spill(self, entry: dict) -> None:
+        """Move shared arrays of entry to disk."""
+        solution = entry.get('solution', {})
+        for key, value in solution.items():
+            if isinstance(value, shared.SharedArray):
+                solution[key] = value.spill(self.directory)
+                self.counters['spilled'] += 1
+
+    def _drop(self, key: tuple, counter: str) -> None:
+        """Remove entry and release its payloads."""
+        shared.release(self._entries.pop(key))
+        self._access.pop(key, None)
+        self.counters[counter] += 1
+
+    def _expire(self) -> None:
+        """Drop entries not accessed during TTL."""
+        deadline = time.time() - self.ttl
+        [self._drop(key, 'expired') for key in [key for key, value in self._access.items() if value < deadline]]
+
+    def _enforce(self) -> None:
+        """Apply TTL, memory and disk budgets, least recently used entries are spilled or dropped first."""
+        self._expire()
+        usage = self.usage()
+        for key, entry in self._entries.items():
+            if usage['memory'] <= self.memory:
+                break
+            moved = sum(item.nbytes for item in shared.references(entry) if item.memory)
+            if moved:
+                self._spill(entry)
+                usage['memory'] -= moved
+                usage['disk'] += moved
+        for key in list(self._entries.keys()):
+            # the most recent entry is kept
+            if usage['disk'] <= self.disk or len(self._entries) == 1:
+                break
+            usage['disk'] -= sum(item.nbytes for item in shared.references(self._entries[key]) if not item.memory)
+            self._drop(key, 'evicted')
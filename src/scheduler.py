@@ -0,0 +1,183 @@
+"""This module provides cost-aware fair scheduling of pool jobs of clients.
+
+Job is a unit executed at pool worker (task, ensemble of tasks or chunk of sweep) submitted by client
+socket. Cost of job is estimated by order² × mesh length of its problems. Jobs wait in backlog and are
+dispatched when pool worker is free: the job of the highest priority is started first, ties are broken
+in favour of client of the least cost of running jobs and then by submission order, count of running
+jobs of client is bounded by quota. Submission is rejected when backlog of client or total backlog
+is full or cost of job exceeds limit. Running job is cancelled or timed out cooperatively: flag of
+job token is set at shared array checked by force kernel at worker.
+Limits are configured by application config or environment variables:
+    POOL_SIZE: count of pool workers
+    POOL_WARMUP: warm up solver at start of pool workers, 0 disables warm-up
+    SCHEDULER_QUOTA: maximal count of running jobs of client, 0 allows client to occupy all workers
+    SCHEDULER_QUEUE: maximal count of waiting jobs of client
+    SCHEDULER_BACKLOG: maximal count of waiting jobs
+    SCHEDULER_MAX_COST: maximal cost of job, 0 disables limit
+    SCHEDULER_TIMEOUT: default time limit of job, s, 0 disables limit
+"""
+import os, time, itertools, threading, multiprocessing
+
+from src import metrics
+
+# count of job tokens, tokens are reused cyclically
+tokens = 4096
+
+def options(config: dict = os.environ) -> dict:
+    """Get limits of scheduler from application config or environment variables."""
+    return dict(pool_size = int(config.get('POOL_SIZE', 4)),
+        warm = str(config.get('POOL_WARMUP', 1)).lower() not in ('0', 'false'),
+        quota = int(config.get('SCHEDULER_QUOTA', 0)),
+        queue = int(config.get('SCHEDULER_QUEUE', 64)),
+        backlog = int(config.get('SCHEDULER_BACKLOG', 256)),
+        max_cost = float(config.get('SCHEDULER_MAX_COST', 0)),
+        timeout = float(config.get('SCHEDULER_TIMEOUT', 0)))
+
+def create_flags():
+    """Create array of cancellation flags shared with pool workers."""
+    return multiprocessing.RawArray('b', tokens)
+
+class Job():
+    """Unit of pool work of client."""
+    def __init__(self, unit, method: str, sid: str, ids: list, callback, abort = None, cost: float = 0, priority: int = 0,
+            timeout: float = None) -> None:
+        self.unit = unit
+        self.method = method
+        self.sid = sid
+        self.ids = ids
+        # callback of result of unit and callback of reason of job dropped without result
+        self.callback = callback
+        self.abort = abort
+        self.cost = cost
+        self.priority = priority
+        self.timeout = timeout
+        self.token = None
+        self.status = 'new'
+        self.submitted = time.time()
+
+class Scheduler():
+    """Scheduler of pool jobs with priorities, per client quotas, cancellation, timeouts and backpressure."""
+    def __init__(self, pool, pool_size: int, flags, notify, config: dict = os.environ) -> None:
+        limits = options(config)
+        self.pool = pool
+        self.pool_size = pool_size
+        self.flags = flags
+        # function to report state of job to client: notify(channel, sid, data)
+        self.notify = notify
+        self.quota = limits['quota'] or pool_size
+        self.queue = limits['queue']
+        self.backlog = limits['backlog']
+        self.max_cost = limits['max_cost']
+        self.timeout = limits['timeout']
+        self.pending = []
+        self.running = {}
+        self._sequence = itertools.count()
+        self._tokens = itertools.cycle(range(tokens))
+        self._lock = threading.RLock()
+        self.counters = dict(submitted = 0, rejected = 0, cancelled = 0, completed = 0)
+
+    def submit(self, job: Job) -> str:
+        """Submit job, return state of job: running, queued or rejected."""
+        with self._lock:
+            self.counters['submitted'] += 1
+            reason = None
+            if self.max_cost > 0 and job.cost > self.max_cost:
+                reason = f'cost of job {job.cost:.3g} exceeds limit {self.max_cost:.3g}'
+            elif len(self.pending) >= self.backlog:
+                reason = 'server is overloaded'
+            elif sum(item.sid == job.sid for item in self.pending) >= self.queue:
+                reason = 'queue of client is full'
+            if reason is not None:
+                job.status = 'rejected'
+                self.counters['rejected'] += 1
+                self.report('rejected', job, reason = reason)
+                self.drop(job, reason)
+                return job.status
+            job.sequence = next(self._sequence)
+            job.status = 'queued'
+            self.pending.append(job)
+            self.dispatch()
+            if job.status == 'queued':
+                self.report('queued', job, position = self.pending.index(job) + 1, cost = job.cost)
+            return job.status
+
+    def dispatch(self) -> None:
+        """Start waiting jobs while pool workers are free."""
+        with self._lock:
+            while self.pending and len(self.running) < self.pool_size:
+                load = {}
+                for item in self.running.values():
+                    count, cost = load.get(item.sid, (0, 0))
+                    load[item.sid] = (count + 1, cost + item.cost)
+                allowed = [item for item in self.pending if load.get(item.sid, (0, 0))[0] < self.quota]
+                if not allowed:
+                    break
+                job = min(allowed, key = lambda item: (-item.priority, load.get(item.sid, (0, 0))[1], item.sequence))
+                self.pending.remove(job)
+                self.start(job)
+
+    def start(self, job: Job) -> None:
+        """Apply job at pool."""
+        job.token = next(self._tokens)
+        self.flags[job.token] = 0
+        timeout = self.timeout if job.timeout is None else job.timeout
+        # members of ensemble are solved separately at fallback
+        for unit in [job.unit] + list(getattr(job.unit, 'tasks', [])):
+            unit._token = job.token
+            unit._deadline = time.time() + timeout if timeout and timeout > 0 else None
+        job.status = 'running'
+        metrics.registry.observe('queue_wait_seconds', time.time() - job.submitted, method = job.method)
+        self.running[job.token] = job
+        self.pool.apply_async(getattr(job.unit, job.method), callback = lambda result: self.finish(job, result),
+            error_callback = lambda error: self.finish(job, None, error))
+
+    def finish(self, job: Job, result, error: Exception = None) -> None:
+        """Complete job and start waiting jobs."""
+        with self._lock:
+            self.running.pop(job.token, None)
+            job.status = 'cancelled' if self.flags[job.token] else 'completed'
+            self.counters['completed'] += 1
+        try:
+            if error is not None:
+                print(error)
+                self.drop(job, str(error))
+            else:
+                job.callback(result)
+        finally:
+            self.dispatch()
+
+    def cancel(self, sid: str, ids: list) -> int:
+        """Cancel waiting and running jobs of client by task identifiers, return count of cancelled jobs."""
+        count = 0
+        with self._lock:
+            dropped = [item for item in self.pending if item.sid == sid and set(item.ids) & set(ids)]
+            for job in dropped:
+                self.pending.remove(job)
+                job.status = 'cancelled'
+                self.report('cancelled', job)
+                count += 1
+            for job in [item for item in self.running.values() if item.sid == sid and set(item.ids) & set(ids)]:
+                # worker interrupts job at the next evaluation of force kernel
+                self.flags[job.token] = 1
+                count += 1
+            self.counters['cancelled'] += count
+        [self.drop(job, 'cancelled') for job in dropped]
+        return count
+
+    def drop(self, job: Job, reason: str) -> None:
+        """Complete job dropped without result."""
+        if job.abort is not None:
+            try:
+                job.abort(reason)
+            except Exception as error:
+                print(error)
+
+    def report(self, channel: str, job: Job, **kwargs) -> None:
+        """Report state of job to client."""
+        [self.notify(channel, job.sid, dict(id = id, sid = job.sid, **kwargs)) for id in job.ids]
+
+    def state(self) -> dict:
+        """Get summary of scheduler state."""
+        with self._lock:
+            return dict(running = len(self.running), pending = len(self.pending),
+                cost = sum(job.cost for job in self.running.values()), **self.counters)
@@ -0,0 +1,143 @@
+"""This module provides passing of large worker results to web process without manager proxies.
+
+Worker replaces large payloads of result by small references before returning it from pool:
+trajectory arrays are copied to `multiprocessing.shared_memory` blocks and figures are dumped
+to JSON file. Web process keeps references in its result store, reads payloads on request,
+spills arrays to npy files when memory budget is exceeded and releases them when result is dropped.
+"""
+import json, os, tempfile, uuid
+import numpy as np
+from multiprocessing import shared_memory, resource_tracker
+
+# keys of figures offloaded to file
+figure_keys = ('plots', 'animations', 'tables')
+
+def directory() -> str:
+    """Get directory of offloaded figures from environment variable."""
+    return os.environ.get('RESULTS_DIR', os.path.join(tempfile.gettempdir(), 'slv_phs_tsk_web'))
+
+class SharedArray():
+    """Reference to array stored in shared memory block."""
+    memory = True
+    def __init__(self, array: np.ndarray) -> None:
+        self.shape = array.shape
+        self.dtype = array.dtype.str
+        block = shared_memory.SharedMemory(create = True, size = max(array.nbytes, 1))
+        np.ndarray(array.shape, dtype = array.dtype, buffer = block.buf)[...] = array
+        self.name = block.name
+        self.nbytes = array.nbytes
+        block.close()
+        # ownership of block is passed to process which loads or releases it
+        resource_tracker.unregister(block._name, 'shared_memory')
+
+    def load(self) -> np.ndarray:
+        """Copy array from shared memory block."""
+        block = shared_memory.SharedMemory(name = self.name)
+        try:
+            return np.ndarray(self.shape, dtype = self.dtype, buffer = block.buf).copy()
+        finally:
+            block.close()
+
+    def release(self) -> None:
+        """Free shared memory block."""
+        try:
+            block = shared_memory.SharedMemory(name = self.name)
+            block.close()
+            block.unlink()
+        except FileNotFoundError:
+            pass
+
+    def spill(self, directory: str):
+        """Move array from shared memory block to file."""
+        spilled = SpilledArray(self.load(), directory)
+        self.release()
+        return spilled
+
+class SpilledArray():
+    """Reference to array spilled to npy file."""
+    memory = False
+    def __init__(self, array: np.ndarray, directory: str) -> None:
+        os.makedirs(directory, exist_ok = True)
+        self.path = os.path.join(directory, f'{uuid.uuid4().hex}.npy')
+        np.save(self.path, array)
+        self.nbytes = array.nbytes
+
+    def load(self) -> np.ndarray:
+        """Read array from file."""
+        return np.load(self.path)
+
+    def release(self) -> None:
+        """Remove file of array."""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+class SharedFigures():
+    """Reference to figures dumped to JSON file."""
+    memory = False
+    def __init__(self, figures: dict, directory: str) -> None:
+        os.makedirs(directory, exist_ok = True)
+        self.path = os.path.join(directory, f'{uuid.uuid4().hex}.json')
+        with open(self.path, 'w') as file:
+            json.dump(figures, file)
+        self.nbytes = os.path.getsize(self.path)
+
+    def load(self) -> dict:
+        """Read figures from file."""
+        with open(self.path) as file:
+            return json.load(file)
+
+    def release(self) -> None:
+        """Remove file of figures."""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+def offload(result: dict) -> dict:
+    """Replace large payloads of worker result by references, called at worker process."""
+    solution = result.get('solution', {})
+    for key in ('r', 'dr'):
+        if isinstance(solution.get(key), np.ndarray) and solution[key].size:
+            solution[key] = SharedArray(solution[key])
+    if any(key in result for key in figure_keys):
+        result['figures'] = SharedFigures({key: result.pop(key) for key in figure_keys if key in result}, directory())
+    if result.get('persist', False):
+        # problem of solution stored by writer of web process
+        problem = result['problem'] = dict(result['problem'])
+        if isinstance(problem.get('mesh'), np.ndarray) and problem['mesh'].size:
+            problem['mesh'] = SharedArray(problem['mesh'])
+    else:
+        # problem is stored in database
+        result.pop('problem', None)
+    return result
+
+def references(result: dict) -> list:
+    """List references of result payloads."""
+    items = [value for value in result.get('solution', {}).values() if isinstance(value, (SharedArray, SpilledArray))]
+    if isinstance(result.get('figures'), SharedFigures):
+        items.append(result['figures'])
+    return items
+
+def release(result: dict) -> None:
+    """Free payloads referenced by result, called at web process."""
+    [item.release() for item in references(result)]
+
+def inline(result: dict) -> dict:
+    """Replace references of result by payloads to send result by value, called at remote worker."""
+    solution = result.get('solution', {})
+    for key in ('r', 'dr'):
+        if hasattr(solution.get(key), 'load'):
+            reference = solution[key]
+            solution[key] = reference.load()
+            reference.release()
+    if isinstance(result.get('figures'), SharedFigures):
+        reference = result.pop('figures')
+        result.update(reference.load())
+        reference.release()
+    if hasattr(result.get('problem', {}).get('mesh'), 'load'):
+        reference = result['problem']['mesh']
+        result['problem']['mesh'] = reference.load()
+        reference.release()
+    return result
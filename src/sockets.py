@@ -1,6 +1,6 @@
 """This module provides socketIO imlementation of server-client communication."""
 
-from src import app, socketio, solver
+from src import app, socketio, solver, sweep
 from flask import request
 
 @socketio.on('connect')
@@ -23,6 +23,8 @@ def ns_on_connect():
 @socketio.on('disconnect', namespace = '/solver')
 def ns_on_disconnect():
     currentSocketId = request.sid
+    # move results of client out of memory
+    app.task_manager.release_client(currentSocketId)
     print(f'client with id {currentSocketId} disconnect in namespace')
     
 @socketio.on('process', namespace = '/solver')
@@ -33,9 +35,34 @@ def ns_on_process(data: list):
         match task['type']['id']:
             case 'tsk_cgrv':
                 tasks.append(solver.TaskClassicalGravitation(problem = solver.TaskClassicalGravitation.build_problem(task['problem']), 
-                    sid = request.sid, id = task['id']))
+                    sid = request.sid, id = task['id'], priority = task.get('priority', None), timeout = task.get('timeout', None),
+                    profile = task.get('profile', None)))
     app.task_manager.process(tasks)
     
+@socketio.on('sweep', namespace = '/solver')
+def ns_on_sweep(data: dict):
+    """Start solver to process parameter sweep job."""
+    match data['type']['id']:
+        case 'tsk_cgrv':
+            app.task_manager.sweep(sweep.TaskSweepClassicalGravitation(data = data, sid = request.sid, id = data['id'],
+                priority = data.get('priority', None), timeout = data.get('timeout', None)))
+    
+@socketio.on('continue', namespace = '/solver')
+def ns_on_continue(data: list):
+    """Start solver to continue stored tasks from the last stored state, optionally extended by time range."""
+    tasks = []
+    for task in data:
+        match task['type']['id']:
+            case 'tsk_cgrv':
+                tasks.append(solver.TaskClassicalGravitation(sid = request.sid, id = task['id'], extend = task.get('extend', None),
+                    priority = task.get('priority', None), timeout = task.get('timeout', None), profile = task.get('profile', None)))
+    app.task_manager.resume(tasks)
+
+@socketio.on('cancel', namespace = '/solver')
+def ns_on_cancel(data: list):
+    """Cancel waiting and running tasks of client."""
+    app.task_manager.cancel(request.sid, [task['id'] for task in data])
+    
 @socketio.on('postprocess', namespace = '/solver')
 def ns_on_postprocess(data: list):
     """Start solver to postprocess tasks."""
@@ -43,5 +70,5 @@ def ns_on_postprocess(data: list):
     for task in data:
         match task['type']['id']:
             case 'tsk_cgrv':
-                tasks.append(solver.TaskClassicalGravitation(sid = request.sid, id = task['id']))
+                tasks.append(solver.TaskClassicalGravitation(sid = request.sid, id = task['id'], profile = task.get('profile', None)))
     app.task_manager.postprocess(tasks)
\ No newline at end of file
@@ -1,16 +1,22 @@
 "This module provides implementation of parallel execution solving tasks."
-import multiprocessing, time, json, os
+import multiprocessing, threading, atexit, time, json, os, uuid
 import numpy as np
-from scipy.integrate import odeint
-import plotly.graph_objects as go
 
-from sqlalchemy import create_engine, Column, String, Integer, Float, ARRAY
-from sqlalchemy.orm import sessionmaker, DeclarativeBase
+from sqlalchemy import Column, String, Integer, Float, ARRAY, JSON, LargeBinary, select, literal
+from sqlalchemy.orm import DeclarativeBase
 
-from src import app
+from src import app, database, storage, shared, results, wire, downsample, cache, renders, scheduler, backend, metrics, imports, writer, trajectories, events
+
+# figure, integration and force kernel stack is imported at first use or by warm-up of pool worker
+go = imports.lazy('plotly.graph_objects')
+kernels = imports.lazy('src.kernels')
+integrators = imports.lazy('src.integrators')
 
 class Base(DeclarativeBase): pass
 
+# arrays are kept by JSON at local SQLite database
+Array = ARRAY(Float).with_variant(JSON(), 'sqlite')
+
 class MetaTask(type):
     """To define default and specific methods of task class objects."""
     def __new__(cls, clsname, bases, attrs):       
@@ -39,18 +45,42 @@ class ModelTaskClassicalGravitation(Base):
     dim = Column(Integer) # task dimension
     num = Column(Integer) # count of bodies
     g = Column(Float) # gravitational constant
-    m = Column(ARRAY(Float)) # mass of bodies
-    r0 = Column(ARRAY(Float)) # initial positions
-    dr0 = Column(ARRAY(Float)) # initial velocities
-    t = Column(ARRAY(Float)) # time mesh
-    r = Column(ARRAY(Float)) # solution: r(t)
-    dr = Column(ARRAY(Float)) # solution: dr(t)
+    m = Column(Array) # mass of bodies
+    r0 = Column(Array) # initial positions
+    dr0 = Column(Array) # initial velocities
+    t = Column(Array) # time mesh, legacy record
+    r = Column(Array) # solution: r(t), legacy record
+    dr = Column(Array) # solution: dr(t), legacy record
+    encoding = Column(String) # encoding of binary solution chunks, null for legacy record
+    mesh = Column(LargeBinary) # target time mesh of binary encoded solution
+    settings = Column(String) # solver settings, JSON
+    chunk_size = Column(Integer) # count of time samples per chunk
+    digest = Column(String, index = True) # canonical hash of problem, null if solution is not reusable
+    version = Column(String) # version of stored solution, changed at each rewriting
+    events = Column(String) # events detected during integration, JSON
         
     def __init__(self, **kwargs):
         [setattr(self, key, value.tolist() if type(value) is np.ndarray else value) for key, value in kwargs.items()]
     def __repr__(self):
         return f'<{self.__tablename__} {self.id}>'
 
+class ModelTaskClassicalGravitationChunk(Base):
+    """Table to store time chunks of binary encoded results of classical gravitation task."""
+    __tablename__ = 'task_clsgrv_chunk'
+    id = Column(String, primary_key = True) # task identifier
+    chunk = Column(Integer, primary_key = True) # chunk number
+    t0 = Column(Float) # first time of chunk
+    t1 = Column(Float) # last time of chunk
+    t = Column(LargeBinary) # time mesh of chunk
+    r = Column(LargeBinary) # solution of chunk: r(t)
+    dr = Column(LargeBinary) # solution of chunk: dr(t)
+        
+    def __init__(self, options: dict = {}, **kwargs):
+        [setattr(self, key, storage.encode(value, **options) if type(value) is np.ndarray else 
+            value.item() if isinstance(value, np.generic) else value) for key, value in kwargs.items()]
+    def __repr__(self):
+        return f'<{self.__tablename__} {self.id}:{self.chunk}>'
+
 class NumpyEncoder(json.JSONEncoder):
     """Class to serialize ndarray object."""
     def default(self, obj):
@@ -58,35 +88,94 @@ class NumpyEncoder(json.JSONEncoder):
             return obj.tolist()
         return json.JSONEncoder.default(self, obj)
 
-def worker_watcher(mng_dkt, mng_lock):
-    """Parametrize decorator in order to watch parallelized worker state and store results at calculation of task."""
-    def decorator(function):
-        def wrapper(*args, **kwargs):
-            # execute of goal function
-            time_start = time.time()
-            result = function(*args, **kwargs)
-            time_end = time.time()
+# queue of events reported by workers and cancellation flags of jobs of current process, set by pool initializer
+_queue = None
+_flags = None
+
+def init_worker(queue, flags = None, uri: str = None, pool_options: dict = None, warm: bool = False) -> None:
+    """Initializer of pool worker process: keep event queue and cancellation flags, create database engine of process
+    and optionally warm up solver."""
+    global _queue, _flags
+    _queue = queue
+    _flags = flags
+    if uri:
+        database.init_worker(uri, pool_options)
+    if warm:
+        warm_up()
+
+def warm_up() -> float:
+    """Import figure, integration and force kernel stack, compile JIT kernel and render figures of tiny problem,
+    return duration of warm-up."""
+    time_start = time.time()
+    try:
+        r0, dr0, mesh = np.array([[-1, 0], [1, 0]], dtype = float), np.array([[0, -0.5], [0, 0.5]], dtype = float), np.linspace(0, 1, 5)
+        for backend, integrator in (('numpy', 'odeint'), ('numpy', 'leapfrog'), ('numba', 'leapfrog')):
+            r, dr = integrators.build_integrator(integrator)(kernels.build_kernel([1, 1], 1, 2, 2, backend = backend), r0, dr0, mesh)
+        TaskClassicalGravitation.export(dict(t = mesh, r = r, dr = dr), None, None)
+    except Exception as error:
+        print(error)
+    # warm-up is not recorded as phases of task
+    metrics.reset()
+    return time.time() - time_start
+
+class TaskInterrupted(Exception):
+    """Integration of task is cancelled or its time is out."""
+    pass
+
+def interruptible(acceleration, unit):
+    """Wrap force kernel to interrupt integration of job unit when job is cancelled or its time is out."""
+    token, deadline = getattr(unit, '_token', None), getattr(unit, '_deadline', None)
+    if token is None or _flags is None:
+        return acceleration
+    def wrapper(r):
+        if _flags[token]:
+            raise TaskInterrupted('cancelled')
+        if deadline is not None and time.time() > deadline:
+            raise TaskInterrupted('timeout')
+        return acceleration(r)
+    return wrapper
+
+def worker_watcher(function, profile: bool = False):
+    """Decorator in order to watch parallelized worker state and return results of task calculation,
+    large payloads of results are passed by shared memory and files, recording of phases is attached to worker state."""
+    def wrapper(*args, **kwargs):
+        # execute of goal function
+        time_start = time.time()
+        if profile:
+            result, statistics = metrics.profile(function, *args, **kwargs)
+        else:
+            result, statistics = function(*args, **kwargs), None
+        time_end = time.time()
+        # ensemble function returns list of results sharing the worker session
+        results = result if type(result) is list else [result]
+        for item in results:
             # store worker parameters
-            result['worker'] = dict(pid = multiprocessing.current_process().pid, 
+            item['worker'] = dict(pid = multiprocessing.current_process().pid, 
                 name = multiprocessing.current_process().name, 
-                time = time_end - time_start)
-            try:
-                # acquire lock
-                mng_lock.acquire()
-                mng_dkt[result['sid']] |= {result['id']: result}
-            finally:
-                # release lock
-                mng_lock.release()
-        return wrapper
-    return decorator
+                time = time_end - time_start, ensemble = len(results))
+            with metrics.phase('offload'):
+                shared.offload(item)
+            metrics.count('serialized_bytes', sum(reference.nbytes for reference in shared.references(item)))
+        recording = metrics.reset()
+        for item in results:
+            item['worker'].update(recording)
+            if statistics is not None:
+                item['worker']['profile'] = statistics
+        return result
+    return wrapper
 
 class TaskClassicalGravitation(metaclass = MetaTask):
     """Numerical solving the cauchy problem of classical gravitation."""
-    _valid_attr = ['problem', 'sid', 'id']
+    _valid_attr = ['problem', 'sid', 'id', 'extend', 'priority', 'timeout', 'profile']
+    # point budget and relative error tolerance of samples to be displayed, count of samples traced by animation frame
+    n_point = 400
+    tolerance = 1e-3
+    n_trace = 50
     def __init__(self, **kwargs) -> None:
         [setattr(self, key, kwargs.get(key, None)) for key in kwargs.keys() if key in self._valid_attr]
         self.status = False
         self._SQLALCHEMY_DATABASE_URI = os.environ['SQLALCHEMY_DATABASE_URI']
+        self._storage = storage.options()
 
     def solve(self) -> dict:
         """Solve task."""
@@ -94,115 +183,328 @@ class TaskClassicalGravitation(metaclass = MetaTask):
             # assemble parameters
             parameters = tuple(list(self.problem['m'])) + (self.problem['g'], self.problem['order'],
                 self.problem['dimension'])
-            solution = odeint(self.system_equations, self.problem['initial'], self.problem['mesh'], args = parameters)
-            # extract solution
-            shape = (-1, self.problem['order'], self.problem['dimension']) # shape = (time, order, dimension)
-            self.r = solution[:, ::2].reshape(shape)
-            self.dr = solution[:, 1::2].reshape(shape)
+            settings = self.problem.get('solver', {})
+            integrate = integrators.build_integrator(settings.get('integrator', 'odeint'))
+            r0, dr0 = np.asarray(self.problem['r0'], dtype = float), np.asarray(self.problem['dr0'], dtype = float)
+            # solution shape = (time, order, dimension)
+            with metrics.phase('integrate'):
+                if settings.get('events', None):
+                    # integration is checked for events, force kernel is rebuilt by merging and softening policies
+                    monitor = events.Monitor(settings['events'], lambda m, softening: interruptible(metrics.instrument(
+                        kernels.build_kernel(m, self.problem['g'], len(m), self.problem['dimension'], **(settings | 
+                        dict(softening = softening)))), self), self.problem['m'], self.problem['g'])
+                    self.r, self.dr = monitor.integrate(integrate, r0, dr0, self.problem['mesh'], **settings)
+                    self.events = monitor.log
+                else:
+                    self.r, self.dr = integrate(interruptible(metrics.instrument(self.kernel(parameters)), self), 
+                        r0, dr0, self.problem['mesh'], **settings)
             self.status = True
-        except Exception:
+        except Exception as error:
+            self.interrupted = str(error) if type(error) is TaskInterrupted else None
             self.r = np.array([])
             self.dr = np.array([])
             self.status = False
         finally:
-            # assemble results
-            result = dict(task_name = self.__class__.__name__, sid = self.sid, id = self.id,
-                solution = dict(r = self.r, dr = self.dr, status = self.status), 
-                problem = self.problem)
-            # store results into database
-            if self.status:
-                self.store(result)
-            return result
+            return self.collect()
+    
+    def solve_stream(self, queue = None, resume: bool = False) -> dict:
+        """Solve task integrating by time chunks, each chunk is stored as checkpoint as produced and reported by progress 
+        event if streaming is requested, resumed task continues from the last stored state appending chunks."""
+        try:
+            with database.session(self._SQLALCHEMY_DATABASE_URI) as session:
+                if resume:
+                    start, chunk, r, dr = self.restore(session)
+                else:
+                    # store task record without solution, chunks are appended to separate table
+                    self.store(dict(id = self.id, problem = self.problem, solution = dict(r = np.array([]), dr = np.array([]))))
+                    start, chunk = 0, 0
+                    r = np.asarray(self.problem['r0'], dtype = float)
+                    dr = np.asarray(self.problem['dr0'], dtype = float)
+                # assemble parameters
+                parameters = tuple(list(self.problem['m'])) + (self.problem['g'], self.problem['order'],
+                    self.problem['dimension'])
+                settings = self.problem.get('solver', {})
+                integrate = integrators.build_integrator(settings.get('integrator', 'odeint'))
+                kernel = interruptible(metrics.instrument(self.kernel(parameters)), self)
+                mesh = np.asarray(self.problem['mesh'])
+                stream = int(settings.get('stream', 0))
+                size = max(stream or int(settings.get('checkpoint', 0)) or self._storage['chunk'], 2)
+                for chunk, begin in enumerate(range(start, mesh.size, size), start = chunk):
+                    end = min(begin + size, mesh.size)
+                    # integrate segment from the last state, first point of continued segment is known
+                    offset = 0 if begin == 0 else 1
+                    with metrics.phase('integrate'):
+                        r_chunk, dr_chunk = integrate(kernel, r, dr, mesh[begin - offset:end], **settings)
+                    r_chunk, dr_chunk = r_chunk[offset:], dr_chunk[offset:]
+                    r, dr = r_chunk[-1], dr_chunk[-1]
+                    # store chunk
+                    with metrics.phase('store'):
+                        session.add(ModelTaskClassicalGravitationChunk(self._storage, id = self.id, chunk = chunk, 
+                            t0 = mesh[begin], t1 = mesh[end - 1], t = mesh[begin:end], r = r_chunk, dr = dr_chunk))
+                        session.commit()
+                    # report chunk
+                    if stream and queue is not None:
+                        queue.put(('progress', self.sid, dict(id = self.id, sid = self.sid, chunk = chunk,
+                            percent = 100 * end / mesh.size, t = mesh[begin:end].tolist(), r = r_chunk.tolist(), 
+                            dr = dr_chunk.tolist())))
+                # figures rendered from partial solution are outdated, solution of continued task is not reusable
+                session.query(ModelTaskClassicalGravitation).filter_by(id = self.id).update(dict(version = uuid.uuid4().hex,
+                    digest = None if resume else cache.digest(self.problem)))
+                session.commit()
+            self.status = True
+        except Exception as error:
+            # stored chunks are kept as checkpoints of interrupted task
+            self.interrupted = str(error) if type(error) is TaskInterrupted else None
+            print(error)
+            self.status = False
+        finally:
+            # trajectory is kept in database only
+            self.r = np.array([])
+            self.dr = np.array([])
+            return self.collect(store = False)
+    
+    def restore(self, session) -> tuple:
+        """Restore problem of stored task extended by `extend` time range [t1, num] and the last stored state,
+        return index of the next time sample, number of the next chunk and state."""
+        record = session.get(ModelTaskClassicalGravitation, self.id)
+        if record is None:
+            raise KeyError(f'task is not found: {self.id}')
+        if record.encoding is None:
+            # legacy record is rewritten by binary chunks
+            solution = self.load(session)
+            self.problem = dict(mesh = solution['t'], dimension = record.dim, order = record.num, m = list(record.m),
+                g = record.g, r0 = np.array(record.r0), dr0 = np.array(record.dr0), solver = {})
+            self.store(dict(id = self.id, problem = self.problem, solution = solution))
+            session.expire_all()
+            record = session.get(ModelTaskClassicalGravitation, self.id)
+        model = ModelTaskClassicalGravitationChunk
+        last = session.query(model).filter_by(id = self.id).order_by(model.chunk.desc()).first()
+        # target mesh of record stored before checkpoints is assembled from chunks
+        mesh = storage.decode(record.mesh) if record.mesh is not None else np.concatenate(
+            [storage.decode(chunk.t) for chunk in session.query(model.t).filter_by(id = self.id).order_by(model.chunk)])
+        if getattr(self, 'extend', None):
+            t1, num = self.extend['t']
+            mesh = np.concatenate((mesh, np.linspace(mesh[-1], t1, num = int(num))[1:]))
+        self.problem = dict(mesh = mesh, dimension = record.dim, order = record.num, m = list(record.m), g = record.g,
+            r0 = np.array(record.r0), dr0 = np.array(record.dr0), solver = json.loads(record.settings) if record.settings else {})
+        record.mesh = storage.encode(mesh, **self._storage)
+        session.commit()
+        if last is None:
+            return 0, 0, np.asarray(self.problem['r0'], dtype = float), np.asarray(self.problem['dr0'], dtype = float)
+        t = storage.decode(last.t)
+        return (int(np.searchsorted(mesh, t[-1])) + 1, last.chunk + 1, storage.decode(last.r)[-1].astype(float), 
+            storage.decode(last.dr)[-1].astype(float))
+    
+    def collect(self, store: bool = True) -> dict:
+        """Assemble results of solved task and store them into database."""
+        problem = self.problem
+        if self.status and getattr(self, 'events', None) and self.r.shape[0] < len(problem['mesh']):
+            # solution stopped by event is stored by truncated mesh under digest of submitted problem
+            problem = problem | dict(mesh = np.asarray(problem['mesh'])[:self.r.shape[0]], digest = cache.digest(problem))
+        result = dict(task_name = self.__class__.__name__, sid = self.sid, id = self.id,
+            solution = dict(r = self.r, dr = self.dr, status = self.status), problem = problem, 
+            interrupted = getattr(self, 'interrupted', None), events = getattr(self, 'events', None))
+        # store results into database, deferred task is stored by writer of task manager
+        if self.status and store:
+            if getattr(self, 'deferred', False):
+                result['persist'] = True
+            else:
+                with metrics.phase('store'):
+                    self.store(result)
+        return result
     
-    def process(self, mng_dkt, mng_lock):
+    def process(self) -> dict:
         """Solve task at parallelized worker session."""
-        worker_watcher(mng_dkt, mng_lock)(self.solve)()
+        settings = self.problem.get('solver', {})
+        profile = bool(getattr(self, 'profile', None))
+        if settings.get('stream', 0) or settings.get('checkpoint', 0):
+            return worker_watcher(self.solve_stream, profile)(_queue)
+        return worker_watcher(self.solve, profile)()
+    
+    def resume(self) -> dict:
+        """Continue stored task from the last stored state at parallelized worker session."""
+        return worker_watcher(self.solve_stream, bool(getattr(self, 'profile', None)))(_queue, True)
         
-    def postprocess(self, mng_dkt, mng_lock):
+    def postprocess(self) -> dict:
         """Solve task at parallelized worker session."""
         # extract data
         try:
-            # acquire lock
-            # mng_lock.acquire()
-            # solution = mng_dkt[self.sid][self.id]['solution'].copy()
-            # solution['t'] = mng_dkt[self.sid][self.id]['problem']['mesh'].copy()
-  
             # extract record from database
-            engine = create_engine(self._SQLALCHEMY_DATABASE_URI)
-            Session = sessionmaker(engine)
-            with Session() as session:
-                task = session.query(ModelTaskClassicalGravitation).filter_by(id = self.id).first()
-                solution = {key: np.array(value) if type(value) is list else value for key, value in task.__dict__.items()}
+            with metrics.phase('load'), database.session(self._SQLALCHEMY_DATABASE_URI) as session:
+                solution = self.read(session)
                 solution['status'] = True
                 session.commit()
         except Exception as error:
             app.logger.error(error)
             # empty record by SID or/and ID
             solution = dict(status = False)
-        finally:
-            pass
-            # release lock
-            # mng_lock.release()
-            if solution['status']:
-                worker_watcher(mng_dkt, mng_lock)(self.export)(solution, self.sid, self.id)
+        if solution['status']:
+            result = worker_watcher(self.export, bool(getattr(self, 'profile', None)))(solution, self.sid, self.id)
+            # version of rendered solution addresses figures in render cache
+            result['version'] = solution.get('version', None)
+            return result
+        metrics.reset()
+        return dict(sid = self.sid, id = self.id, worker = None)
 
     def system_equations(self, argument: np.ndarray, t: float, *parameters) -> np.ndarray:
         """Assemble the cauchy problem."""
-        # extract gravitational constant
-        g = parameters[-3]
         # extract order of task
         order = parameters[-2]
         # extract dimensional count of task
         dimension = parameters[-1]
-
-        # extract mass vector
-        m = parameters[:-3]
-        # extract vector of unknown variables
-        r = np.reshape(argument[::2], (-1, dimension))
-        # extract first derivatives vector of unknown variables
-        dr = argument[1::2]
+        # extract force kernel of problem
+        kernel = self.kernel(parameters)
         
-        # calculate matrix of mutual coordinate difference
-        r_ij = r.reshape((1, order, dimension)) - r.reshape((order, 1, dimension)) # shape = (order, order, dimension)
-        # fill diagonal elements nan to exclude influence of self-term
-        [np.fill_diagonal(r_ij[:, :, i], np.nan) for i in np.arange(r_ij.shape[2])]
-        # calculate matrix of mutual distance
-        d_ij = np.sqrt(np.nansum(r_ij**2, axis = 2)) # shape = (order, order)
-        # fill diagonal elements nan to exclude influence of self-term
-        np.fill_diagonal(d_ij, np.nan)
-        d_ij = np.repeat(d_ij, dimension, axis = 1).reshape((order, order, dimension)) # shape = (order, order, dimension)
-        # calculate matrix of mutual mass
-        m_ij = np.repeat(m, order * dimension, axis = 0).reshape((order, order, dimension)) # shape = (order, order, dimension)  
-        # transpose mass matrix
-        m_ij = np.moveaxis(m_ij, 0, 1) # shape = (order, order, dimension)  
+        # extract vector of unknown variables
+        r = np.reshape(argument[::2], (order, dimension))
         # calculate matrix of second derivatives
-        ddr = np.nansum(g * m_ij * r_ij / d_ij**3, axis = 1) # shape = (order, dimension)
+        ddr = kernel(r) # shape = (order, dimension)
 
         # fill left-side vertor of cauchy problem
-        vector = np.zeros(2 * order * dimension)
-        vector[0::2] = dr
-        vector[1::2] = ddr.flatten()
-        return vector       
+        vector = np.empty(2 * order * dimension)
+        vector[0::2] = argument[1::2]
+        vector[1::2] = ddr.ravel()
+        return vector
+    
+    def cost(self) -> float:
+        """Estimate cost of solving task by order² × mesh length, cost of stored task is unknown before restoring."""
+        if not getattr(self, 'problem', None):
+            return 0
+        return float(self.problem['order'])**2 * len(self.problem['mesh'])
+
+    def kernel(self, parameters: tuple) -> 'kernels.KernelDirect | kernels.KernelTree':
+        """Get force kernel of problem parameters, kernel is created once and reused between calls."""
+        if getattr(self, '_kernel', None) is None or self._kernel_parameters != parameters:
+            settings = (self.problem or {}).get('solver', {})
+            self._kernel = kernels.build_kernel(parameters[:-3], parameters[-3], parameters[-2], parameters[-1], **settings)
+            self._kernel_parameters = parameters
+        return self._kernel
         
+    def load(self, session) -> dict:
+        """Read record and solution of task from database."""
+        task = session.query(ModelTaskClassicalGravitation).filter_by(id = self.id).first()
+        solution = {key: np.array(value) if type(value) is list else value for key, value in task.__dict__.items()}
+        if task.encoding is not None:
+            # assemble solution from binary chunks
+            chunks = session.query(ModelTaskClassicalGravitationChunk).filter_by(id = self.id).order_by(
+                ModelTaskClassicalGravitationChunk.chunk).all()
+            for key in ('t', 'r', 'dr'):
+                solution[key] = np.concatenate([storage.decode(getattr(chunk, key)) for chunk in chunks]) if chunks else np.array([])
+        return solution
+    
+    def read(self, session) -> dict:
+        """Read solution of task from local trajectory cache as memory-mapped arrays, solution is read from database
+        and cached on miss."""
+        cache = trajectories.default()
+        version = session.query(ModelTaskClassicalGravitation.version).filter_by(id = self.id).scalar()
+        solution = cache.get(self.id, version) if version is not None else None
+        if solution is not None:
+            return solution | dict(version = version)
+        solution = self.load(session)
+        if version is not None and solution['t'].size:
+            cache.put(self.id, version, solution['t'], solution['r'], solution['dr'])
+        return solution
+
+    def query(self, session, t0: float = None, t1: float = None, bodies: list = None, max_points: int = None) -> dict:
+        """Read time window [t0, t1] of solution for subset of bodies, cached solution is sliced without copying,
+        otherwise only chunks overlapping window are read, samples are reduced by adaptive downsampling to point budget."""
+        t0 = -np.inf if t0 is None else float(t0)
+        t1 = np.inf if t1 is None else float(t1)
+        task = session.query(ModelTaskClassicalGravitation.encoding, ModelTaskClassicalGravitation.version).filter_by(id = self.id).first()
+        if task is None:
+            raise KeyError(f'task is not found: {self.id}')
+        cached = trajectories.default().get(self.id, task.version) if task.version is not None else None
+        if cached is not None:
+            solution = cached
+        elif task.encoding is None:
+            # legacy record holds the whole solution
+            solution = self.load(session)
+        else:
+            model = ModelTaskClassicalGravitationChunk
+            chunks = session.query(model.t, model.r, model.dr).filter(model.id == self.id, model.t1 >= t0, 
+                model.t0 <= t1).order_by(model.chunk).all()
+            solution = {key: np.concatenate([storage.decode(chunk[index]) for chunk in chunks]) if chunks else np.array([])
+                for index, key in enumerate(('t', 'r', 'dr'))}
+        t = np.asarray(solution['t'])
+        window = slice(np.searchsorted(t, t0, side = 'left'), np.searchsorted(t, t1, side = 'right'))
+        t = t[window]
+        if t.size == 0:
+            return dict(id = self.id, t = t, r = np.empty((0, 0, 0)), dr = np.empty((0, 0, 0)), bodies = [])
+        bodies = list(range(solution['r'].shape[1])) if bodies is None else [int(body) for body in bodies]
+        r = solution['r'][window][:, bodies]
+        dr = solution['dr'][window][:, bodies]
+        index = downsample.select([r, dr], max_points)
+        return dict(id = self.id, t = t[index], r = r[index], dr = dr[index], bodies = bodies)
+    
     def store(self, data: dict) -> None:
         """Insert processed task results to specific table."""
         try:
-            # create task model
-            task = ModelTaskClassicalGravitation(id = data['id'], g = data['problem']['g'],
-                dim = data['problem']['dimension'], num = data['problem']['order'], 
-                m = data['problem']['m'], r0 = data['problem']['r0'], dr0 = data['problem']['dr0'], 
-                t = data['problem']['mesh'], r = data['solution']['r'], 
-                dr = data['solution']['dr'])
-            # store record
-            engine = create_engine(self._SQLALCHEMY_DATABASE_URI)
-            Session = sessionmaker(engine)
-            with Session() as session:
-                query = session.query(ModelTaskClassicalGravitation).filter_by(id = data['id']).first()                
-                session.add(task) if query is None else session.update(task)
-                session.commit()
+            # overwrite existing record by upsert, legacy array columns are cleared
+            record = self.records(data)
+            with database.get_engine(self._SQLALCHEMY_DATABASE_URI).begin() as connection:
+                writer.write(connection, [record])
+            writer.cache(record, data)
         except Exception as error:
             print(error)
+    
+    def records(self, data: dict) -> tuple:
+        """Assemble row of task table and rows of chunk table of processed task, solution is stored by binary time chunks."""
+        task = ModelTaskClassicalGravitation(id = data['id'], g = data['problem']['g'],
+            dim = data['problem']['dimension'], num = data['problem']['order'], 
+            m = data['problem']['m'], r0 = data['problem']['r0'], dr0 = data['problem']['dr0'], 
+            t = None, r = None, dr = None, encoding = storage.encoding(**self._storage), chunk_size = self._storage['chunk'],
+            digest = (data['problem'].get('digest', None) or cache.digest(data['problem'])) if data['solution']['r'].size else None, version = uuid.uuid4().hex,
+            mesh = storage.encode(np.asarray(data['problem']['mesh']), **self._storage), 
+            settings = json.dumps(data['problem'].get('solver', {})), events = json.dumps(data['events']) if data.get('events', None) else None)
+        chunks = self.chunks(data['id'], np.asarray(data['problem']['mesh']), data['solution']['r'], data['solution']['dr'])
+        row = lambda model: {column.name: getattr(model, column.name, None) for column in model.__table__.columns}
+        return row(task), [row(chunk) for chunk in chunks]
+    
+    def copy(self, session, source: str, digest: str) -> bool:
+        """Copy stored solution of source task of the same problem digest, return False if it is not available."""
+        record = session.get(ModelTaskClassicalGravitation, source)
+        if record is None or record.digest is None or record.digest != digest:
+            return False
+        if source != self.id:
+            columns = ModelTaskClassicalGravitation.__table__.columns
+            session.merge(ModelTaskClassicalGravitation(**{column.name: getattr(record, column.name) for column in columns} | 
+                dict(id = self.id, version = uuid.uuid4().hex)))
+            # chunks are copied at database side
+            chunk = ModelTaskClassicalGravitationChunk.__table__
+            session.execute(chunk.delete().where(chunk.c.id == self.id))
+            names = [column.name for column in chunk.columns if column.name != 'id']
+            session.execute(chunk.insert().from_select(['id'] + names, 
+                select(literal(self.id), *[chunk.c[name] for name in names]).where(chunk.c.id == source)))
+            session.commit()
+        elif record.version is None:
+            # record stored before versioning
+            record.version = uuid.uuid4().hex
+            session.commit()
+        return True
+    
+    @staticmethod
+    def find(session, digest: str) -> str | None:
+        """Find identifier of stored task of problem digest."""
+        record = session.query(ModelTaskClassicalGravitation.id).filter_by(digest = digest).first()
+        return None if record is None else record.id
+    
+    def chunks(self, id: str, t: np.ndarray, r: np.ndarray, dr: np.ndarray) -> list:
+        """Split solution into binary chunks along time."""
+        size = self._storage['chunk'] if self._storage['chunk'] > 0 else max(t.size, 1)
+        return [ModelTaskClassicalGravitationChunk(self._storage, id = id, chunk = chunk, t0 = t[start], 
+            t1 = t[min(start + size, t.size) - 1], t = t[start:start + size], r = r[start:start + size], 
+            dr = dr[start:start + size]) for chunk, start in enumerate(range(0, r.shape[0], size))]
       
+    @staticmethod
+    def signature(problem: dict) -> tuple | None:
+        """Key of problems which can be integrated together in ensemble, None if problem is not batchable."""
+        settings = problem.get('solver', {})
+        if (settings.get('engine', 'direct') != 'direct' or settings.get('stream', 0) or settings.get('checkpoint', 0)
+            or settings.get('events', None)):
+            return None
+        return (problem['order'], problem['dimension'], np.asarray(problem['mesh']).tobytes(),
+            tuple(sorted((key, value) for key, value in settings.items() if key != 'backend')))
+    
     @staticmethod
     def build_problem(data: dict) -> dict:
         """Assemble problem of classical gravitation."""
@@ -215,8 +517,18 @@ class TaskClassicalGravitation(metaclass = MetaTask):
         initial = np.array([[body['r'], body['dr']] for body in data['initial']])
         initial = np.moveaxis(initial, (0, 1, 2), (0, 2, 1)).flatten()
         g = data['physics']['g']
+        # assemble solver settings
+        settings = data.get('solver', {})
+        solver = dict(backend = settings.get('backend', 'numpy'), engine = settings.get('engine', 'direct'),
+            theta = float(settings.get('theta', 0.5)), integrator = settings.get('integrator', 'odeint'),
+            substeps = int(settings.get('substeps', 1)), rtol = settings.get('rtol', None), atol = settings.get('atol', None),
+            stream = int(settings.get('stream', 0)), checkpoint = int(settings.get('checkpoint', 0)))
+        # events are kept only if configured, so digests of problems without events are not changed
+        detection = events.settings(settings.get('events', None) or {})
+        if detection:
+            solver['events'] = detection
         problem = dict(initial = initial, mesh = mesh, dimension = dimension, order = order, 
-            m = m, g = g, r0 = r0, dr0 = dr0)
+            m = m, g = g, r0 = r0, dr0 = dr0, solver = solver)
         return problem
         
     @staticmethod
@@ -252,7 +564,7 @@ class TaskClassicalGravitation(metaclass = MetaTask):
         
     @staticmethod
     def animate(vector: np.ndarray, n_trace: int, layout: dict = {}) -> dict:
-        """Animation plot the space/phase trajectory."""
+        """Animation plot the space/phase trajectory, frames are assembled directly from trajectory array."""
         try:
             n_frame = vector.shape[0]
                         
@@ -267,17 +579,13 @@ class TaskClassicalGravitation(metaclass = MetaTask):
                 case 2:
                     data = [go.Scatter(x = [vector[0, i, 0]], y = [vector[0, i, 1]], mode = 'markers', name = str(i + 1))
                         for i in index]
-                    frames = [go.Frame(data = [go.Scatter(x = vector[nf-n_trace:nf, i, 0], y = vector[nf-n_trace:nf, i, 1], mode = 'lines') 
-                            if nf > n_trace else go.Scatter(x = vector[0:nf, i, 0], y = vector[0:nf, i, 1], mode = 'lines')
-                            for i in index]) for nf in np.arange(n_frame)]
+                    keys, trace_type = ('x', 'y'), 'scatter'
                     layout_axis = dict(xaxis = dict(range = [vector_min[0], vector_max[0]], autorange = False),
                         yaxis = dict(range = [vector_min[1], vector_min[1]], scaleanchor = 'x', scaleratio = 1, autorange = False))                    
                 case 3:                  
                     data = [go.Scatter3d(x = [vector[0, i, 0]], y = [vector[0, i, 1]], z = [vector[0, i, 2]], mode = 'markers', name = str(i + 1))
                         for i in index]
-                    frames = [go.Frame(data = [go.Scatter3d(x = vector[nf-n_trace:nf, i, 0], y = vector[nf-n_trace:nf, i, 1], z = vector[nf-n_trace:nf, i, 2], mode = 'lines') 
-                            if nf > n_trace else go.Scatter3d(x = vector[0:nf, i, 0], y = vector[0:nf, i, 1], z = vector[nf-n_trace:nf, i, 2], mode = 'lines')
-                            for i in index]) for nf in np.arange(n_frame)]
+                    keys, trace_type = ('x', 'y', 'z'), 'scatter3d'
                     layout_axis = dict(scene = dict(xaxis = dict(range = [vector_min[0], vector_max[0]], autorange = False),
                         yaxis = dict(range = [vector_min[1], vector_min[1]], autorange = False),
                         zaxis = dict(range = [vector_min[2], vector_min[2]], autorange = False),  aspectmode = 'cube'))
@@ -287,8 +595,15 @@ class TaskClassicalGravitation(metaclass = MetaTask):
             # create layout
             layout = dict(updatemenus = [dict(type = 'buttons', buttons = [button_animate])], 
                 hovermode = 'closest') | layout_axis | layout
-            # create figure
-            figure = json.loads(go.Figure(data = data, layout = layout, frames = frames).to_json())
+            # create figure without frames
+            figure = json.loads(go.Figure(data = data, layout = layout).to_json())
+            # coordinates by body and axis converted once, non-finite values are serialized as null like plotly does
+            columns = np.moveaxis(vector if np.all(np.isfinite(vector)) else 
+                np.where(np.isfinite(vector), vector, None), 0, -1).tolist()
+            # frame nf traces window [nf - n_trace, nf) of each body
+            starts = np.maximum(np.arange(n_frame) - n_trace, 0).tolist()
+            figure['frames'] = [dict(data = [dict(mode = 'lines', **{key: column[k][start:nf] for k, key in enumerate(keys)}, 
+                type = trace_type) for column in columns]) for nf, start in enumerate(starts)]
         except Exception as error:
             print(error)
             figure = {}
@@ -305,30 +620,37 @@ class TaskClassicalGravitation(metaclass = MetaTask):
         finally:
             return figure
         
+    @classmethod
+    def reduce(cls, solution: dict) -> tuple:
+        """Reduce time samples of solution to be displayed by adaptive downsampling of space and phase trajectories."""
+        index = downsample.select([solution['r'], solution['dr']], cls.n_point, cls.tolerance)
+        return solution['t'][index], solution['r'][index, :, :], solution['dr'][index, :, :]
+        
+    @classmethod
+    def export_parameters(cls) -> dict:
+        """Parameters of figures rendered by export."""
+        return dict(n_point = cls.n_point, tolerance = cls.tolerance, n_trace = cls.n_trace)
+        
     @classmethod
     def export(cls, solution: dict, sid: str, id: str) -> dict:
         try:
-            n_slice = 25
-            n_trace = 50
-            # extract data
-            t = solution['t']
-            r = solution['r']
-            dr = solution['dr']            
-            # date reduction
-            t = t[::n_slice]
-            r = r[::n_slice, :, :]
-            dr = dr[::n_slice, :, :]
+            # extract data and date reduction
+            with metrics.phase('reduce'):
+                t, r, dr = cls.reduce(solution)
             # create labels
             labels = np.array(['t'] + [f'{x}{i}' for i in np.arange(r.shape[1]) for x in ['x', 'y', 'z'][0:r.shape[2]]]).flatten()
             # create values
             values_r = np.concatenate((np.array([t]), r.reshape(np.prod(r.shape[1::]), -1)))
             values_dr = np.concatenate((np.array([t]), dr.reshape(np.prod(dr.shape[1::]), -1)))
             # build figures
-            plots = dict(trajectory = cls.plot(r, dict(title = 'Space trajectory')),
-                velocity = cls.plot(dr, dict(title = 'Phase trajectory')))
-            animations = dict(trajectory = cls.animate(r, n_trace, dict(title = 'Space trajectory')),
-                velocity = cls.animate(dr, n_trace, dict(title = 'Phase trajectory')))
-            tables = dict(trajectory = cls.table(labels, values_r), velocity = cls.table(labels, values_dr))
+            with metrics.phase('export.plot'):
+                plots = dict(trajectory = cls.plot(r, dict(title = 'Space trajectory')),
+                    velocity = cls.plot(dr, dict(title = 'Phase trajectory')))
+            with metrics.phase('export.animate'):
+                animations = dict(trajectory = cls.animate(r, cls.n_trace, dict(title = 'Space trajectory')),
+                    velocity = cls.animate(dr, cls.n_trace, dict(title = 'Phase trajectory')))
+            with metrics.phase('export.table'):
+                tables = dict(trajectory = cls.table(labels, values_r), velocity = cls.table(labels, values_dr))
         except:
             plots = {}
             animations = {}
@@ -337,68 +659,376 @@ class TaskClassicalGravitation(metaclass = MetaTask):
             result = dict(sid = sid, id = id, plots = plots, animations = animations, tables = tables)
             return result
 
+    @classmethod
+    def export_binary(cls, solution: dict, sid: str, id: str, dtype: str = '<f8') -> bytes:
+        """Pack reduced solution with layout descriptor of figures into binary wire payload, browser assembles figures."""
+        t, r, dr = cls.reduce(solution)
+        descriptor = dict(sid = sid, id = id, order = r.shape[1], dimension = r.shape[2], n_trace = cls.n_trace,
+            titles = dict(trajectory = 'Space trajectory', velocity = 'Phase trajectory'),
+            range = dict(r = [np.min(r, (0, 1)).tolist(), np.max(r, (0, 1)).tolist()], 
+                dr = [np.min(dr, (0, 1)).tolist(), np.max(dr, (0, 1)).tolist()]))
+        return wire.pack(dict(t = t, r = r, dr = dr), descriptor, dtype)
+
+class TaskEnsembleClassicalGravitation():
+    """Ensemble of classical gravitation tasks of the same order, dimension, mesh and solver settings
+    integrated together with extra ensemble axis."""
+    def __init__(self, tasks: list) -> None:
+        self.tasks = tasks
+    
+    def solve(self) -> list:
+        """Solve tasks of ensemble."""
+        try:
+            problems = [task.problem for task in self.tasks]
+            order, dimension, mesh = problems[0]['order'], problems[0]['dimension'], problems[0]['mesh']
+            settings = problems[0].get('solver', {})
+            # assemble batched parameters
+            kernel = kernels.KernelEnsemble([problem['m'] for problem in problems], 
+                [problem['g'] for problem in problems], order, dimension)
+            r0 = np.array([problem['r0'] for problem in problems], dtype = float)
+            dr0 = np.array([problem['dr0'] for problem in problems], dtype = float)
+            integrate = integrators.build_integrator(settings.get('integrator', 'odeint'))
+            # solution shape = (time, ensemble, order, dimension)
+            with metrics.phase('integrate'):
+                r, dr = integrate(interruptible(metrics.instrument(kernel), self), r0, dr0, mesh, **settings)
+        except TaskInterrupted as error:
+            # all members of ensemble are interrupted
+            for task in self.tasks:
+                task.r, task.dr, task.status, task.interrupted = np.array([]), np.array([]), False, str(error)
+            return [task.collect() for task in self.tasks]
+        except Exception as error:
+            app.logger.error(error)
+            # fallback to solve tasks separately
+            return [task.solve() for task in self.tasks]
+        # split solution by tasks
+        results = []
+        for index, task in enumerate(self.tasks):
+            task.r = np.ascontiguousarray(r[:, index])
+            task.dr = np.ascontiguousarray(dr[:, index])
+            task.status = bool(np.all(np.isfinite(task.r)))
+            results.append(task.collect())
+        return results
+    
+    def cost(self) -> float:
+        """Estimate cost of solving ensemble by costs of its tasks."""
+        return sum(task.cost() for task in self.tasks)
+
+    def process(self) -> list:
+        """Solve ensemble at parallelized worker session."""
+        return worker_watcher(self.solve, any(getattr(task, 'profile', None) for task in self.tasks))()
+
 class TaskManager():
     """Task manager to parallelize solvers"""
-    def __init__(self, pool_size, socketio) -> None:
+    def __init__(self, pool_size, socketio, uri: str = None, pool_options: dict = None, config: dict = {}, 
+            warm: bool = False) -> None:
         self.socketio = socketio
+        self.uri = uri
         
-        self.manager = multiprocessing.Manager()
-        self.mng_dkt = self.manager.dict()
-        self.mng_lock = self.manager.Lock()
+        # bounded store of results metadata by client and task, payloads are kept in shared memory and files
+        self.results = results.ResultStore()
+        atexit.register(self.clear)
+        # queue of events emitted by workers during processing
+        self.queue = multiprocessing.SimpleQueue()
+        self.socketio.start_background_task(self.watch_queue)
         
         self.pool_size = pool_size
-        self.pool = multiprocessing.Pool(processes = self.pool_size)
+        execution = backend.options(config)
+        if execution['backend'] == 'redis':
+            # jobs are solved by standalone workers consuming Redis queue
+            self.pool = backend.RemotePool(backend.connect(execution['url']), execution['prefix'], self.queue)
+            self.flags = self.pool.flags
+            self.socketio.start_background_task(self.pool.watch)
+        else:
+            # cancellation flags of jobs checked by workers
+            self.flags = scheduler.create_flags()
+            # each worker creates its own database engine and connection pool once
+            self.pool = multiprocessing.Pool(processes = self.pool_size, 
+                initializer = init_worker, initargs = (self.queue, self.flags, uri, pool_options, warm))
+        # jobs are applied at pool by priorities and quotas of clients
+        self.scheduler = scheduler.Scheduler(self.pool, self.pool_size, self.flags, 
+            lambda channel, sid, data: self.emit(channel, data, to = sid, namespace = '/solver'), config)
+        # maximal count of tasks integrated together
+        self.ensemble_size = 16
         self.task = []
+        # solved problems by digest, tasks waiting for in-flight problems by digest and digests of solving tasks
+        self.cache = cache.SolutionCache()
+        # rendered figures by task, solution version and export parameters
+        self.renders = renders.RenderCache()
+        # solved tasks are stored by batches at writer thread
+        self.writer = writer.Writer(uri) if uri is not None else None
+        if self.writer is not None:
+            self.socketio.start_background_task(self.writer.run)
+        self.inflight = {}
+        self.pending = {}
+        self._lock = threading.Lock()
     
     def process(self, tasks: list) -> None:
         """Launch pool processing session."""
-        pool = [self.pool.apply_async(task.process, args = (self.mng_dkt, self.mng_lock,), 
-            callback = lambda result, channel = 'process', sid = task.sid, id = task.id: self.callback_process(channel, sid, id, result)) for task in tasks]   
-        pool
+        for unit in self.batch(self.dedupe(tasks)):
+            members = getattr(unit, 'tasks', [unit])
+            # solved tasks are stored by writer
+            [setattr(task, 'deferred', self.writer is not None) for task in members]
+            self.schedule(unit, 'process', members, lambda result: self.callback_process('process', result),
+                lambda reason, members = members: self.callback_process('process', 
+                    [self.interrupted(task, reason) for task in members]))
+    
+    def schedule(self, unit, method: str, tasks: list, callback, abort = None) -> str:
+        """Submit job of unit to scheduler, priority and time limit of job are taken from its tasks."""
+        priorities = [getattr(task, 'priority', None) or 0 for task in tasks]
+        timeouts = [float(task.timeout) for task in tasks if getattr(task, 'timeout', None) is not None]
+        return self.scheduler.submit(scheduler.Job(unit, method, tasks[0].sid, [task.id for task in tasks], callback, abort,
+            cost = unit.cost() if hasattr(unit, 'cost') else 0, priority = max(priorities), 
+            timeout = min(timeouts) if timeouts else None))
+    
+    def interrupted(self, task, reason: str) -> dict:
+        """Result of task dropped by scheduler."""
+        return dict(task_name = task.__class__.__name__, sid = task.sid, id = task.id, solution = dict(status = False),
+            interrupted = reason, worker = dict(pid = os.getpid(), name = 'scheduler', time = 0, ensemble = 0))
+    
+    def cancel(self, sid: str, ids: list) -> int:
+        """Cancel tasks of client, return count of cancelled jobs and tasks waiting for in-flight problems."""
+        cancelled = []
+        with self._lock:
+            for waiting in self.inflight.values():
+                cancelled += [task for task in waiting if task.sid == sid and task.id in ids]
+                waiting[:] = [task for task in waiting if not (task.sid == sid and task.id in ids)]
+        [self.callback_process('process', self.interrupted(task, 'cancelled')) for task in cancelled]
+        return self.scheduler.cancel(sid, ids) + len(cancelled)
+    
+    def dedupe(self, tasks: list) -> list:
+        """Serve tasks of solved problems from cache, join tasks of in-flight problems, return tasks to be solved."""
+        if self.uri is None or self.cache.size <= 0:
+            return tasks
+        units = []
+        for task in tasks:
+            key = cache.digest(task.problem) if type(task) is TaskClassicalGravitation else None
+            if key is None:
+                units.append(task)
+                continue
+            with self._lock:
+                if key in self.inflight:
+                    # identical problem is being solved
+                    self.inflight[key].append(task)
+                    self.cache.count('shared')
+                    continue
+            source = self.cache.get(key)
+            if source is None:
+                with database.session(self.uri) as session:
+                    source = TaskClassicalGravitation.find(session, key)
+            if source is not None and self.serve(task, key, source):
+                self.cache.count('hits')
+                continue
+            self.cache.count('misses')
+            with self._lock:
+                self.inflight[key] = []
+                self.pending[(task.sid, task.id)] = key
+            units.append(task)
+        return units
+    
+    def serve(self, task, key: str, source: str) -> bool:
+        """Copy stored solution of source task to task and report it, return False if solution is not available."""
+        try:
+            with database.session(self.uri) as session:
+                served = task.copy(session, source, key)
+                # events of stored solution are reported as well
+                reported = session.query(ModelTaskClassicalGravitation.events).filter_by(id = source).scalar() if served else None
+        except Exception as error:
+            app.logger.error(error)
+            served = False
+        if not served:
+            self.cache.invalidate(key)
+            return False
+        self.cache.put(key, source)
+        result = dict(task_name = task.__class__.__name__, sid = task.sid, id = task.id, solution = dict(status = True),
+            worker = dict(pid = os.getpid(), name = 'cache', time = 0, ensemble = 0, source = source), 
+            events = json.loads(reported) if reported else None)
+        self.callback_process('process', result)
+        return True
+    
+    def batch(self, tasks: list) -> list:
+        """Group compatible classical gravitation tasks into ensembles spread over pool workers."""
+        units = []
+        groups = {}
+        for task in tasks:
+            signature = TaskClassicalGravitation.signature(task.problem) if type(task) is TaskClassicalGravitation else None
+            if signature is None:
+                units.append(task)
+            else:
+                groups.setdefault(signature, []).append(task)
+        for group in groups.values():
+            # split group into ensembles to keep all workers busy, shared adaptive step of large ensemble
+            # is limited by its stiffest member, so size of ensemble is bounded
+            size = min(-(-len(group) // self.pool_size), self.ensemble_size)
+            for index in range(0, len(group), size):
+                members = group[index:index + size]
+                units.append(members[0] if len(members) == 1 else TaskEnsembleClassicalGravitation(members))
+        return units
+    
+    def resume(self, tasks: list) -> None:
+        """Launch pool session continuing stored tasks."""
+        [self.schedule(task, 'resume', [task], lambda result: self.callback_process('process', result),
+            lambda reason, task = task: self.callback_process('process', self.interrupted(task, reason))) for task in tasks]
     
     def postprocess(self, tasks: list) -> None:
-        """Launch pool postprocessing session."""
-        [self.pool.apply_async(task.postprocess, args = (self.mng_dkt, self.mng_lock,), 
-            callback = lambda result, channel = 'postprocess', sid = task.sid, id = task.id: self.callback_postprocess(channel, sid, id, result)) for task in tasks] 
+        """Launch pool postprocessing session, figures of rendered solution are served from render cache."""
+        for task in tasks:
+            key = self.render_key(task)
+            if key is not None and key in self.renders:
+                self.results.attach(task.sid, task.id, 'figures', renders.RenderedFigures(self.renders, key))
+                self.emit('postprocess', dict(id = task.id, sid = task.sid, worker = dict(pid = os.getpid(), 
+                    name = 'render cache', time = 0, ensemble = 0)), to = task.sid, namespace = '/solver')
+                continue
+            self.schedule(task, 'postprocess', [task], lambda result: self.callback_postprocess('postprocess', result),
+                lambda reason, task = task: self.callback_postprocess('postprocess', self.interrupted(task, reason)))
     
-    def callback_process(self, channel, sid, id, result) -> None:
-        """Callback function at processing task."""
+    def render_key(self, task) -> str | None:
+        """Key of figures of stored solution of task, None if task is not stored."""
+        if self.uri is None:
+            return None
         try:
-            # acquire lock
-            self.mng_lock.acquire()
-            data = self.mng_dkt[sid][id].copy()
-        finally:
-            # release lock
-            self.mng_lock.release()
-        # emit results to client socket
-        self.socketio.emit(channel, dict(id = id, sid = sid, worker = data['worker']), to = sid, namespace = '/solver')
+            with database.session(self.uri) as session:
+                version = session.query(ModelTaskClassicalGravitation.version).filter_by(id = task.id).scalar()
+        except Exception as error:
+            app.logger.error(error)
+            return None
+        if version is None:
+            return None
+        key = renders.key(task.id, version, task.export_parameters())
+        # figures of rewritten solution are dropped
+        self.renders.invalidate(task.id, keep = key)
+        return key
+    
+    def sweep(self, job) -> None:
+        """Launch pool session of parameter sweep job, summaries of chunks are gathered at pool result thread."""
+        chunks = job.chunks(self.ensemble_size)
+        parts = [None] * len(chunks)
+        remaining = [len(chunks)]
+        def gather(result, index):
+            parts[index] = result
+            remaining[0] -= 1
+            if remaining[0] == 0:
+                self.callback_sweep('sweep', job, parts)
+        [self.schedule(chunk, 'process', [job], lambda result, index = index: gather(result, index),
+            lambda reason, index = index: gather(None, index)) for index, chunk in enumerate(chunks)]
+    
+    def emit(self, channel: str, data: dict, to: str, namespace: str = '/solver') -> None:
+        """Emit event to client socket."""
+        with metrics.registry.phase('emit'):
+            self.socketio.emit(channel, data, to = to, namespace = namespace)
+    
+    def count(self, channel: str, result: dict) -> None:
+        """Aggregate recording of worker and status of task."""
+        metrics.registry.record(result.get('worker', None), channel)
+        # postprocessed task is solved if figures are rendered
+        solved = result['solution']['status'] if 'solution' in result else result.get('figures', None) is not None
+        status = 'interrupted' if result.get('interrupted', None) else 'solved' if solved else 'failed'
+        metrics.registry.increment('tasks_total', channel = channel, status = status)
+    
+    def metrics(self) -> dict:
+        """Get gauges of state of task manager."""
+        state = self.scheduler.state()
+        usage = self.results.usage()
+        return dict(scheduler_running = state['running'], scheduler_pending = state['pending'], scheduler_cost = state['cost'],
+            scheduler_rejected = state['rejected'], scheduler_cancelled = state['cancelled'], results_entries = len(self.results),
+            results_memory_bytes = usage['memory'], results_disk_bytes = usage['disk'],
+            **{f'solution_cache_{key}': value for key, value in self.cache.counters.items()},
+            **{f'render_cache_{key}': value for key, value in self.renders.counters.items()})
+    
+    def callback_process(self, channel, result) -> None:
+        """Callback function at processing task, solution of deferred task is reported after it is stored by writer."""
+        # ensemble returns list of results
+        for item in (result if type(result) is list else [result]):
+            if item.get('persist', False) and self.writer is not None:
+                self.writer.put(item, lambda item: self.complete(channel, item))
+            else:
+                self.complete(channel, item)
+    
+    def complete(self, channel, item) -> None:
+        """Keep result of processed task, report it and share its solution with tasks of the same problem."""
+        self.count(channel, item)
+        with metrics.registry.phase('results'):
+            self.results.put(item)
+        # emit results to client socket through event queue, so progress events reported by worker precede them
+        self.queue.put((channel, item['sid'], dict(id = item['id'], sid = item['sid'], worker = item['worker'], 
+            interrupted = item.get('interrupted', None), events = item.get('events', None))))
+        with self._lock:
+            key = self.pending.pop((item['sid'], item['id']), None)
+            waiting = self.inflight.pop(key, [])
+        if key is None:
+            return
+        if item['solution']['status']:
+            self.cache.put(key, item['id'])
+            # tasks of the same problem share solution
+            waiting = [task for task in waiting if not self.serve(task, key, item['id'])]
+        if waiting:
+            self.process(waiting)
                 
-    def callback_postprocess(self, channel, sid, id, result) -> None:
+    def callback_postprocess(self, channel, result) -> None:
         """Callback function at postprocessing task."""
-        try:
-            # acquire lock
-            self.mng_lock.acquire()
-            data = self.mng_dkt[sid][id].copy()
-        finally:
-            # release lock
-            self.mng_lock.release()
+        self.count(channel, result)
+        if result.get('figures', None) is not None:
+            # figures are attached to processed task entry of store
+            self.results.attach(result['sid'], result['id'], 'figures', result['figures'])
+            if result.get('version', None) is not None:
+                key = renders.key(result['id'], result['version'], TaskClassicalGravitation.export_parameters())
+                self.renders.invalidate(result['id'], keep = key)
+                self.renders.put(key, result['id'], result['figures'].path)
+        # emit results to client socket
+        self.emit(channel, dict(id = result['id'], sid = result['sid'], worker = result['worker'],
+            interrupted = result.get('interrupted', None)), to = result['sid'], namespace = '/solver')
+    
+    def callback_sweep(self, channel, job, parts) -> None:
+        """Callback function at finishing all chunks of parameter sweep job."""
+        data = job.aggregate(parts)
+        self.results.put(data)
         # emit results to client socket
-        self.socketio.emit(channel, dict(id = id, sid = sid, worker = data['worker']), to = sid, namespace = '/solver')
+        self.emit(channel, data, to = job.sid, namespace = '/solver')
+    
+    def figures(self, sid: str, id: str) -> dict:
+        """Read figures of postprocessed task."""
+        return self.results.get(sid, id)['figures'].load()
+    
+    def solution(self, sid: str, id: str) -> dict:
+        """Read solution of processed task."""
+        solution = self.results.get(sid, id)['solution']
+        if 'r' not in solution:
+            # solution served from cache is kept in database only
+            with database.session(self.uri) as session:
+                record = TaskClassicalGravitation(id = id).read(session)
+            return dict(r = record['r'], dr = record['dr'], status = solution['status'])
+        return {key: value.load() if hasattr(value, 'load') else value for key, value in solution.items()}
+    
+    def watch_queue(self) -> None:
+        """Emit events reported by workers to client sockets."""
+        while True:
+            try:
+                item = self.queue.get()
+            except (EOFError, OSError):
+                # queue is closed
+                break
+            if item is None:
+                break
+            channel, sid, data = item
+            self.emit(channel, data, to = sid, namespace = '/solver')
     
     def registrate_client(self, sid: str) -> None:
-        """Create client account in dict manager."""
-        try:
-            # acquire lock
-            self.mng_lock.acquire()
-            self.mng_dkt[sid] = {}
-        finally:
-            # release lock
-            self.mng_lock.release()
+        """Create client account, results are stored at first task of client."""
+        pass
+    
+    def release_client(self, sid: str) -> None:
+        """Spill results of disconnected client to disk, they are dropped by TTL of store."""
+        self.results.spill(sid)
         
     def clear(self):
-        self.mng_dkt.clear()
+        """Drop all results and rendered figures and release their payloads."""
+        self.results.clear()
+        self.renders.clear()
         
     def close(self) -> None:
         """Finishing pool session."""
         self.pool.close()
-        self.pool.join()
\ No newline at end of file
+        self.pool.join()
+        if self.writer is not None:
+            self.writer.wait()
+            self.writer.close()
+        self.queue.put(None)
+        self.clear()
@@ -0,0 +1,46 @@
+/**
+ * @brief The module decodes binary trajectory payload of `/postprocess/binary` route and assembles animation frames.
+ */
+
+const MAGIC = 'TRW'
+
+const typedArrays = {'<f8': Float64Array, '<f4': Float32Array}
+
+/**
+ * @param {ArrayBuffer} buffer binary payload
+ * @returns descriptor and typed arrays (t, r, dr) viewing the payload
+ */
+const decodeTrajectory = (buffer) => {
+    const bytes = new Uint8Array(buffer)
+    if (String.fromCharCode(...bytes.slice(0, 3)) !== MAGIC) {
+        throw new Error('invalid trajectory payload')
+    }
+    const length = new DataView(buffer).getUint32(4, true)
+    const descriptor = JSON.parse(new TextDecoder().decode(bytes.slice(8, 8 + length)))
+    const arrays = {}
+    descriptor.arrays.forEach(({name, dtype, shape, offset}) => {
+        arrays[name] = {shape, data: new typedArrays[dtype](buffer, offset, shape.reduce((a, b) => a * b, 1))}
+    })
+    return {descriptor, arrays}
+}
+
+/**
+ * @param {object} descriptor layout descriptor of payload
+ * @param {object} vector array of shape (time, order, dimension)
+ * @returns plotly frames tracing `n_trace` previous samples of each body
+ */
+const buildFrames = (descriptor, vector) => {
+    const [nFrame, order, dimension] = vector.shape
+    const keys = ['x', 'y', 'z'].slice(0, dimension)
+    const type = dimension === 3 ? 'scatter3d' : 'scatter'
+    // coordinates by body and axis
+    const columns = Array.from({length: order}, (_, i) => keys.map((_, k) =>
+        Float64Array.from({length: nFrame}, (_, n) => vector.data[(n * order + i) * dimension + k])))
+    return Array.from({length: nFrame}, (_, nf) => {
+        const start = Math.max(nf - descriptor.n_trace, 0)
+        return {data: columns.map((column) => Object.fromEntries([['mode', 'lines'],
+            ...keys.map((key, k) => [key, column[k].subarray(start, nf)]), ['type', type]]))}
+    })
+}
+
+export {decodeTrajectory, buildFrames}
@@ -0,0 +1,61 @@
+"""This module provides compact binary encoding of trajectory arrays stored in database.
+
+Blob layout: magic `TRJ`, codec byte, little-endian uint32 length of npy header, npy header
+(dtype, shape, order) and data bytes. Codecs:
+    none: raw data bytes, decoded without copy
+    zlib: zlib compressed data bytes
+    shuffle: zlib compressed data bytes transposed by byte significance, which groups
+        slowly varying exponent bytes of neighbouring samples and improves compression
+"""
+import io, os, struct, zlib
+import numpy as np
+
+_magic = b'TRJ'
+codecs = dict(none = 0, zlib = 1, shuffle = 2)
+
+def options() -> dict:
+    """Get storage options from environment variables."""
+    return dict(dtype = os.environ.get('TRAJECTORY_DTYPE', 'float64'),
+        compression = os.environ.get('TRAJECTORY_COMPRESSION', 'shuffle'),
+        chunk = int(os.environ.get('TRAJECTORY_CHUNK', 1000)))
+
+def encoding(dtype: str = 'float64', compression: str = 'shuffle', **kwargs) -> str:
+    """Label of encoding to be stored along with record."""
+    return f'{np.dtype(dtype).name}+{compression}'
+
+def encode(array: np.ndarray, dtype: str = None, compression: str = 'shuffle', level: int = 1, **kwargs) -> bytes:
+    """Encode array to binary blob."""
+    array = np.ascontiguousarray(array, dtype = dtype)
+    header = io.BytesIO()
+    np.lib.format.write_array_header_1_0(header, np.lib.format.header_data_from_array_1_0(array))
+    header = header.getvalue()
+    match compression:
+        case 'none':
+            data = array.tobytes()
+        case 'zlib':
+            data = zlib.compress(array.tobytes(), level)
+        case 'shuffle':
+            data = zlib.compress(array.view(np.uint8).reshape(-1, array.dtype.itemsize).T.tobytes(), level)
+        case _:
+            raise ValueError(f'unknown compression: {compression}')
+    return _magic + bytes([codecs[compression]]) + struct.pack('<I', len(header)) + header + data
+
+def decode(blob: bytes) -> np.ndarray:
+    """Decode binary blob to array, array decoded from uncompressed blob is read-only view of blob."""
+    blob = memoryview(blob)
+    if blob[:3] != _magic:
+        raise ValueError('invalid trajectory blob')
+    codec = blob[3]
+    (length,) = struct.unpack('<I', blob[4:8])
+    header = io.BytesIO(blob[8:8 + length])
+    np.lib.format.read_magic(header)
+    shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(header)
+    data = blob[8 + length:]
+    match codec:
+        case 0:
+            array = np.frombuffer(data, dtype = dtype)
+        case 1:
+            array = np.frombuffer(zlib.decompress(data), dtype = dtype)
+        case 2:
+            array = np.frombuffer(zlib.decompress(data), dtype = np.uint8).reshape(dtype.itemsize, -1).T.copy().view(dtype).ravel()
+    return array.reshape(shape, order = 'F' if fortran_order else 'C')
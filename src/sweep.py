@@ -0,0 +1,118 @@
+"""This module provides parameter sweep job over classical gravitation problems.
+
+Sweep is specified by base problem (the same data as accepted by `TaskClassicalGravitation.build_problem`)
+and parameter axes, each axis varies one scalar of the problem:
+    dict(parameter = 'm', body = 0, values = [1, 2, 3])
+    dict(parameter = 'dr0', body = 1, component = 0, range = [0, 0.5], num = 11)
+    dict(parameter = 'g', range = [0.5, 2])
+Grid mode samples cartesian product of axis values, random mode draws `samples` uniform samples
+of axis ranges (or choices of axis values). Samples are integrated in ensembles and only summary
+results are returned: final positions and velocities, minimal mutual separation and escape flags.
+"""
+import itertools
+import numpy as np
+
+from src.solver import TaskClassicalGravitation, interruptible, kernels, integrators
+
+# parameters allowed to vary
+parameters = ('m', 'g', 'r0', 'dr0')
+
+def axis_values(axis: dict) -> np.ndarray:
+    """Get grid values of parameter axis."""
+    if 'values' in axis:
+        return np.asarray(axis['values'], dtype = float)
+    return np.linspace(axis['range'][0], axis['range'][1], num = int(axis.get('num', 2)))
+
+def expand(problem: dict, axes: list, mode: str = 'grid', samples: int = 100, seed: int = None) -> dict:
+    """Expand base problem and parameter axes to batched parameters of shape (sample, ...)."""
+    for axis in axes:
+        if axis['parameter'] not in parameters:
+            raise ValueError(f'parameter can not be swept: {axis["parameter"]}')
+    # assemble table of samples, shape = (sample, axis)
+    match mode:
+        case 'grid':
+            table = np.array(list(itertools.product(*[axis_values(axis) for axis in axes])), dtype = float)
+        case 'random':
+            rng = np.random.default_rng(seed)
+            table = np.stack([rng.choice(axis_values(axis), samples) if 'values' in axis else
+                rng.uniform(axis['range'][0], axis['range'][1], samples) for axis in axes], axis = 1)
+        case _:
+            raise ValueError(f'unknown sweep mode: {mode}')
+    n_sample = table.shape[0]
+    # broadcast base problem
+    batch = dict(m = np.tile(np.asarray(problem['m'], dtype = float), (n_sample, 1)),
+        g = np.full(n_sample, float(problem['g'])),
+        r0 = np.tile(np.asarray(problem['r0'], dtype = float), (n_sample, 1, 1)),
+        dr0 = np.tile(np.asarray(problem['dr0'], dtype = float), (n_sample, 1, 1)))
+    # substitute swept values
+    for index, axis in enumerate(axes):
+        match axis['parameter']:
+            case 'g':
+                batch['g'][:] = table[:, index]
+            case 'm':
+                batch['m'][:, axis['body']] = table[:, index]
+            case 'r0' | 'dr0':
+                batch[axis['parameter']][:, axis['body'], axis['component']] = table[:, index]
+    batch['table'] = table
+    return batch
+
+def summarize(r: np.ndarray, dr: np.ndarray, m: np.ndarray, g: np.ndarray) -> dict:
+    """Reduce ensemble trajectories of shape (time, sample, order, dimension) to summary of each sample."""
+    # minimal mutual separation over trajectory
+    index_i, index_j = np.triu_indices(r.shape[2], k = 1)
+    separation = np.linalg.norm(r[:, :, index_j] - r[:, :, index_i], axis = -1).min(axis = (0, 2))
+    # body escapes if its energy relative to barycenter of system at final time is positive
+    r_end, dr_end = r[-1], dr[-1]
+    dr_c = np.sum(m[:, :, np.newaxis] * dr_end, axis = 1, keepdims = True) / np.sum(m, axis = 1)[:, np.newaxis, np.newaxis]
+    kinetic = 0.5 * np.sum((dr_end - dr_c)**2, axis = -1)
+    d_ij = np.linalg.norm(r_end[:, np.newaxis, :, :] - r_end[:, :, np.newaxis, :], axis = -1)
+    np.einsum('kii->ki', d_ij)[:] = np.inf
+    potential = -g[:, np.newaxis] * np.sum(m[:, np.newaxis, :] / d_ij, axis = 2)
+    escape = kinetic + potential > 0
+    return dict(r = r_end, dr = dr_end, separation = separation, escape = escape)
+
+class TaskSweepChunk():
+    """Part of sweep samples integrated together in ensemble at parallelized worker session."""
+    def __init__(self, batch: dict, mesh: np.ndarray, settings: dict) -> None:
+        self.batch = batch
+        self.mesh = mesh
+        self.settings = settings
+
+    def process(self) -> dict | None:
+        """Solve samples and return summary, None if solving is failed."""
+        try:
+            order, dimension = self.batch['r0'].shape[1:]
+            kernel = kernels.KernelEnsemble(self.batch['m'], self.batch['g'], order, dimension)
+            integrate = integrators.build_integrator(self.settings.get('integrator', 'odeint'))
+            r, dr = integrate(interruptible(kernel, self), self.batch['r0'], self.batch['dr0'], self.mesh, **self.settings)
+            return summarize(r, dr, self.batch['m'], self.batch['g'])
+        except Exception as error:
+            print(error)
+            return None
+
+    def cost(self) -> float:
+        """Estimate cost of solving samples by order² × mesh length of each sample."""
+        n_sample, order = self.batch['r0'].shape[:2]
+        return float(n_sample) * order**2 * len(self.mesh)
+
+class TaskSweepClassicalGravitation():
+    """Parameter sweep job of classical gravitation task."""
+    _valid_attr = ['data', 'sid', 'id', 'priority', 'timeout']
+    def __init__(self, **kwargs) -> None:
+        [setattr(self, key, kwargs.get(key, None)) for key in kwargs.keys() if key in self._valid_attr]
+        self.problem = TaskClassicalGravitation.build_problem(self.data['problem'])
+        self.batch = expand(self.problem, self.data['axes'], self.data.get('mode', 'grid'),
+            int(self.data.get('samples', 100)), self.data.get('seed', None))
+
+    def chunks(self, size: int) -> list:
+        """Split samples into chunks of specified size."""
+        n_sample = self.batch['table'].shape[0]
+        return [TaskSweepChunk({key: value[index:index + size] for key, value in self.batch.items() if key != 'table'},
+            self.problem['mesh'], self.problem['solver']) for index in range(0, n_sample, size)]
+
+    def aggregate(self, parts: list) -> dict:
+        """Concatenate summaries of chunks into sweep result."""
+        status = all(part is not None for part in parts)
+        summary = {key: np.concatenate([part[key] for part in parts]).tolist() for key in parts[0]} if status else {}
+        return dict(sid = self.sid, id = self.id, status = status, axes = self.data['axes'], 
+            samples = self.batch['table'].tolist(), summary = summary)
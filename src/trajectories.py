@@ -0,0 +1,116 @@
+"""This module provides local on-disk cache of stored trajectories shared by processes of host.
+
+Solution of task is kept by `t.npy`, `r.npy` and `dr.npy` files of directory addressed by task identifier
+and version of stored solution, files are written by web process when solution is stored and are read
+by postprocessing and queries as memory-mapped arrays without copying, stored solution is read from
+database on miss. Directory of the least recently used solution is removed when size of cache exceeds
+disk limit. Cache is configured by environment variables:
+    TRAJECTORY_CACHE_DISK: disk limit of cache, MB, 0 disables cache
+    TRAJECTORY_CACHE_DIR: directory of cache
+"""
+import os, hashlib, shutil, uuid, threading
+import numpy as np
+
+from src import shared
+
+keys = ('t', 'r', 'dr')
+
+def options() -> dict:
+    """Get limit and directory of trajectory cache from environment variables."""
+    return dict(disk = int(float(os.environ.get('TRAJECTORY_CACHE_DISK', 1024)) * 2**20),
+        directory = os.environ.get('TRAJECTORY_CACHE_DIR', os.path.join(shared.directory(), 'trajectories')))
+
+class TrajectoryCache():
+    """LRU cache of memory-mapped trajectories bounded by disk size."""
+    def __init__(self, disk: int = None, directory: str = None) -> None:
+        limits = options()
+        self.disk = limits['disk'] if disk is None else disk
+        self.directory = limits['directory'] if directory is None else directory
+        self._lock = threading.Lock()
+        self.counters = dict(hits = 0, misses = 0, evictions = 0)
+
+    def path(self, id: str, version: str = None) -> str:
+        """Directory of task or of version of its solution."""
+        path = os.path.join(self.directory, hashlib.sha256(id.encode()).hexdigest())
+        return path if version is None else os.path.join(path, version)
+
+    def get(self, id: str, version: str) -> dict | None:
+        """Open memory-mapped solution of task version, None if it is not cached."""
+        path = self.path(id, version)
+        try:
+            solution = {key: np.load(os.path.join(path, f'{key}.npy'), mmap_mode = 'r') for key in keys}
+            # access time orders eviction
+            os.utime(path)
+        except (FileNotFoundError, ValueError):
+            self.counters['misses'] += 1
+            return None
+        self.counters['hits'] += 1
+        return solution
+
+    def put(self, id: str, version: str, t: np.ndarray, r: np.ndarray, dr: np.ndarray) -> None:
+        """Write solution of task version, other versions of task are dropped."""
+        if self.disk <= 0 or version is None:
+            return
+        path = self.path(id, version)
+        # files are written to temporary directory and renamed, so readers never see partial solution
+        temporary = os.path.join(self.directory, f'.{uuid.uuid4().hex}')
+        os.makedirs(temporary)
+        try:
+            [np.save(os.path.join(temporary, f'{key}.npy'), np.asarray(value)) for key, value in zip(keys, (t, r, dr))]
+            os.makedirs(os.path.dirname(path), exist_ok = True)
+            os.rename(temporary, path)
+        except OSError:
+            # the same version is written by other process
+            shutil.rmtree(temporary, ignore_errors = True)
+        self.invalidate(id, keep = version)
+        self._enforce()
+
+    def invalidate(self, id: str, keep: str = None) -> None:
+        """Drop cached versions of task except specified one."""
+        root = self.path(id)
+        for version in (os.listdir(root) if os.path.isdir(root) else []):
+            if version != keep:
+                shutil.rmtree(os.path.join(root, version), ignore_errors = True)
+
+    def entries(self) -> list:
+        """List cached solutions: (access time, size, path)."""
+        items = []
+        for root in (os.listdir(self.directory) if os.path.isdir(self.directory) else []):
+            if root.startswith('.'):
+                continue
+            for version in os.listdir(os.path.join(self.directory, root)):
+                path = os.path.join(self.directory, root, version)
+                try:
+                    items.append((os.stat(path).st_mtime, sum(entry.stat().st_size for entry in os.scandir(path)), path))
+                except FileNotFoundError:
+                    continue
+        return items
+
+    def usage(self) -> int:
+        """Get bytes of cached solutions."""
+        return sum(size for _, size, _ in self.entries())
+
+    def clear(self) -> None:
+        """Drop all cached solutions."""
+        shutil.rmtree(self.directory, ignore_errors = True)
+
+    def _enforce(self) -> None:
+        """Remove the least recently used solutions while size of cache exceeds limit, the most recent is kept."""
+        with self._lock:
+            items = sorted(self.entries())
+            usage = sum(size for _, size, _ in items)
+            while usage > self.disk and len(items) > 1:
+                _, size, path = items.pop(0)
+                shutil.rmtree(path, ignore_errors = True)
+                usage -= size
+                self.counters['evictions'] += 1
+
+# cache of current process
+_cache = None
+
+def default() -> TrajectoryCache:
+    """Get trajectory cache of current process."""
+    global _cache
+    if _cache is None:
+        _cache = TrajectoryCache()
+    return _cache
@@ -0,0 +1,128 @@
+"""This module provides Barnes-Hut tree code (quadtree in 2D, octree in 3D) to approximate gravitational accelerations.
+
+Tree is built and traversed level by level with vectorized numpy operations over all bodies.
+A node of size s at distance d from the body is accepted as a point mass in its center of mass
+if s / theta + delta < d, where delta is the offset of the center of mass from the node center,
+otherwise it is opened. Leaf nodes are summed directly.
+
+Approximation error (monopole expansion) compared with direct summation, root mean square
+of relative error of acceleration vector per body over uniform and clustered distributions
+of 10^2..10^4 bodies, see `benchmarks/bench_kernels.py`:
+    theta = 0.0: exact up to round-off
+    theta = 0.3: rms < 5e-3
+    theta = 0.5: rms < 1.5e-2
+    theta = 0.8: rms < 1e-1
+Maximal error is attained by bodies with nearly balanced net force and may be an order larger.
+"""
+import numpy as np
+
+def _expand(start: np.ndarray, count: np.ndarray) -> tuple:
+    """Expand ragged ranges [start, start + count) to flat index array and group index of each element."""
+    group = np.repeat(np.arange(start.size), count)
+    offset = np.arange(group.size) - np.repeat(np.cumsum(count) - count, count)
+    return start[group] + offset, group
+
+class Tree():
+    """Spatial tree of bodies with mass and center of mass of each node."""
+    def __init__(self, r: np.ndarray, m: np.ndarray, leaf_size: int = 8, max_depth: int = 32) -> None:
+        order, dimension = r.shape
+        n_child = 2**dimension
+        # define root cell
+        r_min = r.min(axis = 0)
+        r_max = r.max(axis = 0)
+        half = max(0.5 * np.max(r_max - r_min), np.finfo(float).tiny) * (1 + 1e-12)
+
+        # node attributes gathered by level
+        centers = [0.5 * (r_min + r_max)[np.newaxis, :]]
+        halves = [np.array([half])]
+        parents = [np.array([-1])]
+        levels = [0]
+
+        # node of each body at current level
+        node = np.zeros(order, dtype = int)
+        # bodies of nodes to be split at current level
+        active = np.arange(order)
+        n_node = 1
+        level_offset = 0
+        for depth in range(max_depth):
+            if active.size == 0:
+                break
+            # count bodies of nodes at current level
+            count = np.bincount(node[active] - level_offset, minlength = centers[-1].shape[0])
+            split = count > leaf_size
+            active = active[split[node[active] - level_offset]]
+            if active.size == 0:
+                break
+            # calculate child code of each body in split nodes
+            local = node[active] - level_offset
+            code = (r[active] > centers[-1][local]).astype(int) @ (1 << np.arange(dimension))
+            key, inverse = np.unique(local * n_child + code, return_inverse = True)
+            parent_local = key // n_child
+            sign = ((key % n_child)[:, np.newaxis] >> np.arange(dimension)) & 1
+            # create child nodes, children of the same parent are contiguous
+            halves.append(0.5 * halves[-1][parent_local])
+            centers.append(centers[-1][parent_local] + (2 * sign - 1) * halves[-1][:, np.newaxis])
+            parents.append(level_offset + parent_local)
+            level_offset = n_node
+            levels.append(level_offset)
+            n_node += key.size
+            node[active] = level_offset + inverse
+
+        self.center = np.concatenate(centers)
+        self.half = np.concatenate(halves)
+        self.parent = np.concatenate(parents)
+        self.n_node = n_node
+
+        # contiguous child ranges of each node, parent indices are non-decreasing
+        self.child_count = np.bincount(self.parent[1:], minlength = n_node)
+        self.child_start = np.searchsorted(self.parent[1:], np.arange(n_node)) + 1
+        self.leaf = self.child_count == 0
+
+        # bodies of leaf nodes
+        self.body = np.argsort(node, kind = 'stable')
+        self.body_count = np.bincount(node, minlength = n_node)
+        self.body_start = np.cumsum(self.body_count) - self.body_count
+
+        # accumulate mass and center of mass bottom-up
+        self.mass = np.bincount(node, weights = m, minlength = n_node)
+        moment = np.stack([np.bincount(node, weights = m * r[:, k], minlength = n_node) for k in range(dimension)], axis = 1)
+        for start, end in reversed(list(zip(levels[1:], levels[2:] + [n_node]))):
+            np.add.at(self.mass, self.parent[start:end], self.mass[start:end])
+            np.add.at(moment, self.parent[start:end], moment[start:end])
+        self.com = moment / np.where(self.mass > 0, self.mass, 1)[:, np.newaxis]
+        # offset of center of mass from geometric center of node
+        self.offset = np.linalg.norm(self.com - self.center, axis = 1)
+
+    def accelerate(self, r: np.ndarray, m: np.ndarray, g: float, theta: float, softening: float = 0) -> np.ndarray:
+        """Calculate accelerations of bodies by tree traversal with opening angle theta and Plummer softening length."""
+        order, dimension = r.shape
+        ddr = np.zeros((order, dimension))
+        # interaction list of (body, node) pairs
+        body = np.arange(order)
+        node = np.zeros(order, dtype = int)
+        while body.size:
+            r_ij = self.com[node] - r[body]
+            d2 = np.einsum('ij,ij->i', r_ij, r_ij)
+            inside = np.all(np.abs(r[body] - self.center[node]) <= self.half[node][:, np.newaxis], axis = 1)
+            accept = ~inside & (2 * self.half[node] + theta * self.offset[node] < theta * np.sqrt(d2))
+            self._accumulate(ddr, body[accept], r_ij[accept], d2[accept] + softening**2, g * self.mass[node[accept]])
+            # sum bodies of opened leaf nodes directly
+            leaf = ~accept & self.leaf[node]
+            index, group = _expand(self.body_start[node[leaf]], self.body_count[node[leaf]])
+            source, target = self.body[index], body[leaf][group]
+            other = source != target
+            source, target = source[other], target[other]
+            r_ij = r[source] - r[target]
+            self._accumulate(ddr, target, r_ij, np.einsum('ij,ij->i', r_ij, r_ij) + softening**2, g * m[source])
+            # open internal nodes
+            opened = ~accept & ~self.leaf[node]
+            node, group = _expand(self.child_start[node[opened]], self.child_count[node[opened]])
+            body = body[opened][group]
+        return ddr
+
+    @staticmethod
+    def _accumulate(ddr: np.ndarray, body: np.ndarray, r_ij: np.ndarray, d2: np.ndarray, gm: np.ndarray) -> None:
+        """Add point mass accelerations to bodies."""
+        weight = gm * d2**-1.5
+        for k in range(ddr.shape[1]):
+            ddr[:, k] += np.bincount(body, weights = weight * r_ij[:, k], minlength = ddr.shape[0])
@@ -2,8 +2,9 @@
 Return: modified flask instance
 """
 # load app instance
-from src import app, db, models
-from flask import request
+import os
+from src import app, db, models, database, solver, wire, metrics
+from flask import request, Response
 from flask_login import login_required
 
 @app.route('/')
@@ -11,6 +12,11 @@ def index():
     """Assign enter point."""   
     return app.send_static_file('./dist/index.html')
 
+@app.route('/metrics')
+def metrics_text():
+    """Metrics route of aggregate timings and counters in Prometheus text format."""
+    return Response(metrics.registry.render(app.task_manager.metrics()), mimetype = 'text/plain; version=0.0.4')
+
 @app.route('/<path:path>')
 def route_static_file(path):
     """Route static files located in `static_url_path`"""
@@ -22,14 +28,43 @@ def postprocess():
     """Postprocessing route of specified task."""
     response = request.get_json()
     try:
-        # acquire lock
-        app.task_manager.mng_lock.acquire()
-        plots = app.task_manager.mng_dkt[response['sid']][response['id']]['plots'].copy()
-        animations = app.task_manager.mng_dkt[response['sid']][response['id']]['animations'].copy()
-        tables = app.task_manager.mng_dkt[response['sid']][response['id']]['tables'].copy()
+        # figures are read from file referenced by result index
+        figures = app.task_manager.figures(response['sid'], response['id'])
+    except Exception as error:
+        print(error)
+        figures = {}
+    return dict(plots = figures.get('plots', {}), animations = figures.get('animations', {}), 
+        tables = figures.get('tables', {}))
+
+@app.route('/postprocess/binary', methods = ['GET', 'POST'])
+@login_required
+def postprocess_binary():
+    """Binary trajectory route of specified task, figures are assembled by client."""
+    response = request.get_json()
+    try:
+        task = solver.TaskClassicalGravitation(sid = response['sid'], id = response['id'])
+        with database.session(os.environ['SQLALCHEMY_DATABASE_URI']) as session:
+            solution = task.read(session)
+        payload = task.export_binary(solution, task.sid, task.id, '<f4' if response.get('dtype', None) == 'float32' else '<f8')
+    except Exception as error:
+        print(error)
+        return Response(status = 404)
+    return Response(payload, mimetype = 'application/octet-stream')
+
+@app.route('/query', methods = ['GET', 'POST'])
+@login_required
+def query():
+    """Query route of time window and body subset of stored solution, data is decimated to point budget."""
+    response = request.get_json()
+    window = response.get('t', None) or [None, None]
+    try:
+        task = solver.TaskClassicalGravitation(id = response['id'])
+        with database.session(os.environ['SQLALCHEMY_DATABASE_URI']) as session:
+            data = task.query(session, window[0], window[1], response.get('bodies', None), response.get('max_points', 1000))
     except Exception as error:
         print(error)
-    finally:
-        # release lock
-        app.task_manager.mng_lock.release()
-    return dict(plots = plots, animations = animations, tables = tables)
\ No newline at end of file
+        return Response(status = 404)
+    if response.get('format', 'json') == 'binary':
+        return Response(wire.pack(dict(t = data['t'], r = data['r'], dr = data['dr']), dict(id = data['id'], bodies = data['bodies'])), 
+            mimetype = 'application/octet-stream')
+    return dict(id = data['id'], bodies = data['bodies'], t = data['t'].tolist(), r = data['r'].tolist(), dr = data['dr'].tolist())
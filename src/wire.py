@@ -0,0 +1,53 @@
+"""This module provides compact binary wire format of trajectories sent to browser.
+
+Payload layout: magic `TRW`, version byte, little-endian uint32 length of descriptor, descriptor
+as UTF-8 JSON padded by spaces to 8 bytes boundary and raw little-endian array data, each array
+starts at 8 bytes boundary, so browser reads it as typed array view without copy:
+    new Float64Array(buffer, offset, length)
+Descriptor lists arrays by name with dtype, shape and offset from payload start and carries
+layout parameters of figures, frames of animation are assembled by browser.
+"""
+import json, struct
+import numpy as np
+
+_magic = b'TRW'
+version = 1
+# dtypes supported by typed arrays of browser
+dtypes = ('<f8', '<f4')
+
+def _align(size: int) -> int:
+    return -size % 8
+
+def pack(arrays: dict, descriptor: dict = {}, dtype: str = '<f8') -> bytes:
+    """Pack arrays and descriptor into binary payload."""
+    if np.dtype(dtype).str not in dtypes:
+        raise ValueError(f'unsupported dtype: {dtype}')
+    arrays = {key: np.ascontiguousarray(value, dtype = dtype) for key, value in arrays.items()}
+    # offsets depend on length of descriptor holding them, so descriptor is assembled until it is stable
+    offsets = {key: 0 for key in arrays}
+    while True:
+        header = dict(descriptor, version = version, arrays = [dict(name = key, dtype = value.dtype.str,
+            shape = list(value.shape), offset = offsets[key]) for key, value in arrays.items()])
+        header = json.dumps(header, separators = (',', ':')).encode()
+        header += b' ' * _align(8 + len(header))
+        offset = 8 + len(header)
+        placed = {}
+        for key, value in arrays.items():
+            placed[key] = offset
+            offset += value.nbytes + _align(value.nbytes)
+        if placed == offsets:
+            break
+        offsets = placed
+    data = b''.join(value.tobytes() + b'\0' * _align(value.nbytes) for value in arrays.values())
+    return _magic + bytes([version]) + struct.pack('<I', len(header)) + header + data
+
+def unpack(payload: bytes) -> tuple:
+    """Unpack binary payload to descriptor and arrays, arrays are read-only views of payload."""
+    payload = memoryview(payload)
+    if payload[:3] != _magic:
+        raise ValueError('invalid wire payload')
+    (length,) = struct.unpack('<I', payload[4:8])
+    descriptor = json.loads(bytes(payload[8:8 + length]))
+    arrays = {item['name']: np.frombuffer(payload, dtype = item['dtype'], count = int(np.prod(item['shape'])),
+        offset = item['offset']).reshape(item['shape']) for item in descriptor['arrays']}
+    return descriptor, arrays
@@ -0,0 +1,163 @@
+"""This module provides write-behind batched persistence of solved tasks.
+
+Pool worker returns solved task as soon as its result is offloaded, trajectory is stored by writer
+thread of web process: results accepted through queue are gathered into batches, task records are
+written by bulk `INSERT ... ON CONFLICT DO UPDATE` (PostgreSQL and SQLite), chunks of solution are
+replaced by bulk insert, and callback of each result is called after batch is committed, so client
+is notified when solution is readable. Other dialects fall back to delete and insert.
+Batching is configured by environment variables:
+    WRITER_BATCH: maximal count of tasks per batch
+    WRITER_LINGER: time to wait for more tasks of batch, s
+"""
+import os, queue, threading
+import numpy as np
+
+from sqlalchemy.dialects import postgresql, sqlite
+
+from src import database, metrics, trajectories
+
+def options() -> dict:
+    """Get batching options of writer from environment variables."""
+    return dict(batch = int(os.environ.get('WRITER_BATCH', 64)), linger = float(os.environ.get('WRITER_LINGER', 0.005)))
+
+def upsert(connection, table, rows: list) -> None:
+    """Insert rows or update existing rows of the same primary key."""
+    if not rows:
+        return
+    keys = [column.name for column in table.primary_key.columns]
+    match connection.dialect.name:
+        case 'postgresql' | 'sqlite':
+            insert = (postgresql if connection.dialect.name == 'postgresql' else sqlite).insert
+            statement = insert(table)
+            statement = statement.on_conflict_do_update(index_elements = keys,
+                set_ = {column.name: statement.excluded[column.name] for column in table.columns if column.name not in keys})
+            connection.execute(statement, rows)
+        case _:
+            replace(connection, table, rows, keys[0])
+
+def replace(connection, table, rows: list, key: str) -> None:
+    """Delete rows of keys and insert rows."""
+    if not rows:
+        return
+    connection.execute(table.delete().where(table.c[key].in_({row[key] for row in rows})))
+    connection.execute(table.insert(), rows)
+
+def write(connection, records: list) -> None:
+    """Write task records with their chunks: [(task row, chunk rows), ...], the last record of the same task wins."""
+    from src.solver import ModelTaskClassicalGravitation, ModelTaskClassicalGravitationChunk
+    records = list({task['id']: (task, chunks) for task, chunks in records}.values())
+    upsert(connection, ModelTaskClassicalGravitation.__table__, [task for task, chunks in records])
+    # chunks of rewritten solution are replaced as a whole
+    table = ModelTaskClassicalGravitationChunk.__table__
+    connection.execute(table.delete().where(table.c.id.in_([task['id'] for task, chunks in records])))
+    rows = [row for task, chunks in records for row in chunks]
+    if rows:
+        connection.execute(table.insert(), rows)
+
+def cache(record: tuple, data: dict) -> None:
+    """Write stored solution to local trajectory cache."""
+    task, chunks = record
+    if data['solution']['r'].size:
+        trajectories.default().put(task['id'], task['version'], np.asarray(data['problem']['mesh']),
+            data['solution']['r'], data['solution']['dr'])
+
+class Writer():
+    """Writer thread storing solved tasks by batches."""
+    def __init__(self, uri: str, batch: int = None, linger: float = None) -> None:
+        limits = options()
+        self.uri = uri
+        self.batch = limits['batch'] if batch is None else batch
+        self.linger = limits['linger'] if linger is None else linger
+        self.queue = queue.Queue()
+        self.counters = dict(tasks = 0, batches = 0, failures = 0)
+        self._idle = threading.Condition()
+        self._pending = 0
+
+    def put(self, result: dict, callback = None) -> None:
+        """Enqueue solved task result, callback is called with result after it is stored."""
+        with self._idle:
+            self._pending += 1
+        self.queue.put((result, callback))
+
+    def run(self) -> None:
+        """Store enqueued results until writer is closed."""
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            items = [item]
+            # gather batch of results enqueued meanwhile
+            while len(items) < self.batch:
+                try:
+                    item = self.queue.get(timeout = self.linger)
+                except queue.Empty:
+                    break
+                if item is None:
+                    self.queue.put(None)
+                    break
+                items.append(item)
+            self.flush(items)
+
+    def flush(self, items: list) -> None:
+        """Store batch of results and call their callbacks."""
+        from src.solver import TaskClassicalGravitation
+        records, payloads = [], []
+        for result, callback in items:
+            try:
+                payloads.append(self.payload(result))
+                records.append(TaskClassicalGravitation(id = result['id']).records(payloads[-1]))
+            except Exception as error:
+                print(error)
+                payloads.append(None)
+                records.append(None)
+        try:
+            with metrics.registry.phase('write'), database.get_engine(self.uri).begin() as connection:
+                write(connection, [record for record in records if record is not None])
+            self.counters['batches'] += 1
+            metrics.registry.increment('write_batches_total')
+        except Exception as error:
+            print(error)
+            # batch is retried by tasks to isolate failed record
+            for index, record in enumerate(records):
+                try:
+                    if record is not None:
+                        with database.get_engine(self.uri).begin() as connection:
+                            write(connection, [record])
+                except Exception as error:
+                    print(error)
+                    records[index] = None
+        for (result, callback), record, payload in zip(items, records, payloads):
+            self.counters['tasks'] += 1
+            self.counters['failures'] += record is None
+            try:
+                if record is not None:
+                    cache(record, payload)
+            except Exception as error:
+                print(error)
+            # stored problem is not kept by result store
+            [value.release() for value in result.pop('problem', {}).values() if hasattr(value, 'release')]
+            result.pop('persist', None)
+            try:
+                if callback is not None:
+                    callback(result)
+            except Exception as error:
+                print(error)
+        with self._idle:
+            self._pending -= len(items)
+            self._idle.notify_all()
+
+    @staticmethod
+    def payload(result: dict) -> dict:
+        """Read problem and solution of offloaded result."""
+        problem = {key: value.load() if hasattr(value, 'load') else value for key, value in result['problem'].items()}
+        solution = {key: value.load() if hasattr(value, 'load') else value for key, value in result['solution'].items()}
+        return dict(id = result['id'], problem = problem, solution = solution, events = result.get('events', None))
+
+    def wait(self, timeout: float = None) -> bool:
+        """Wait for enqueued results to be stored."""
+        with self._idle:
+            return self._idle.wait_for(lambda: self._pending == 0, timeout)
+
+    def close(self) -> None:
+        """Store enqueued results and stop writer thread."""
+        self.queue.put(None)
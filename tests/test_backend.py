@@ -0,0 +1,41 @@
+"""Testing module of distributed execution backend."""
+
+import os, time, threading
+import pytest
+from src import app, backend, solver
+
+# in-process stand-in of server and local server if it is configured
+urls = ['memory://test'] + ([os.environ['REDIS_URL']] if os.environ.get('REDIS_URL') else [])
+
+@pytest.mark.parametrize('url', urls)
+def test_redis_backend(socketio_client, task_clsgrv_2d, url):
+    """Check that tasks are processed and postprocessed by standalone worker of Redis queue."""
+    namespace = '/solver'
+    config = dict(EXECUTION_BACKEND = 'redis', REDIS_URL = url, REDIS_PREFIX = 'test')
+    manager, default = solver.TaskManager(2, app.task_manager.socketio, app.task_manager.uri, config = config), app.task_manager
+    manager.cache.size = 0
+    worker = backend.Worker(backend.connect(url), 'test', interval = 0)
+    thread = threading.Thread(target = worker.run, daemon = True)
+    thread.start()
+    app.task_manager = manager
+    try:
+        task = task_clsgrv_2d[0] | dict(id = 'backend', problem = task_clsgrv_2d[0]['problem'] |
+            dict(physics = dict(g = 1, t = [0, 2, 201]), solver = dict(stream = 100)))
+        received = {}
+        for event in ('process', 'postprocess'):
+            socketio_client.emit(event, [task], namespace = namespace)
+            received[event] = []
+            while not any(item['name'] == event for item in received[event]):
+                time.sleep(0.2)
+                received[event] += socketio_client.get_received(namespace = namespace)
+            result = received[event][-1]['args'][0]
+            # worker thread runs at web process
+            assert result['worker']['pid'] == os.getpid() and result['interrupted'] is None
+        # progress events of worker reach client
+        assert [item['args'][0]['chunk'] for item in received['process'] if item['name'] == 'progress'] == [0, 1, 2]
+        assert manager.figures(result['sid'], 'backend')['plots']['trajectory']
+        assert worker.count == 2 and manager.scheduler.state()['running'] == 0
+    finally:
+        app.task_manager = default
+        worker.stop.set()
+        manager.close()
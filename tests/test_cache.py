@@ -0,0 +1,47 @@
+"""Testing module of content-addressed solution cache."""
+
+import time
+import numpy as np
+from src import app, cache, solver
+
+def test_digest(task_clsgrv_2d):
+    """Check that digest depends only on content of problem."""
+    data = task_clsgrv_2d[0]['problem']
+    problem = solver.TaskClassicalGravitation.build_problem(data)
+    assert cache.digest(problem) == cache.digest(problem | dict(g = float(problem['g']), m = np.array(problem['m'])))
+    assert cache.digest(problem) != cache.digest(solver.TaskClassicalGravitation.build_problem(data | 
+        dict(solver = dict(integrator = 'rk45'))))
+    assert cache.digest(solver.TaskClassicalGravitation.build_problem(data | dict(solver = dict(stream = 10)))) is None
+
+def test_eviction():
+    """Check eviction policies of cache."""
+    for policy, victim in (('lru', 'c'), ('lfu', 'b'), ('fifo', 'a')):
+        store = cache.SolutionCache(size = 3, ttl = 0, policy = policy)
+        [store.put(key, key) for key in 'abc']
+        [store.get(key) for key in 'caab']
+        store.put('d', 'd')
+        assert len(store) == 3 and store.get(victim) is None and store.counters['evictions'] == 1
+
+def test_cache_process(socketio_client, task_clsgrv_2d):
+    """Check that identical problems are solved once."""
+    namespace = '/solver'
+    # problem unique to test session
+    data = task_clsgrv_2d[0]['problem'] | dict(physics = dict(g = 1 + time.time() % 1, t = [0, 2, 201]))
+    tasks = [task_clsgrv_2d[0] | dict(id = f'cache-{index}', problem = data) for index in range(3)]
+    counters = app.task_manager.cache.counters.copy()
+    socketio_client.emit('process', tasks[:2], namespace = namespace)
+    received = []
+    while len(received) < 2:
+        time.sleep(0.2)
+        received += socketio_client.get_received(namespace = namespace)
+    socketio_client.emit('process', tasks[2:], namespace = namespace)
+    while len(received) < 3:
+        time.sleep(0.2)
+        received += socketio_client.get_received(namespace = namespace)
+    workers = {item['args'][0]['id']: item['args'][0]['worker'] for item in received}
+    assert workers['cache-0']['name'] != 'cache'
+    assert workers['cache-1']['source'] == workers['cache-2']['source'] == 'cache-0'
+    counters = {key: value - counters[key] for key, value in app.task_manager.cache.counters.items()}
+    assert counters['misses'] == 1 and counters['shared'] == 1 and counters['hits'] == 1
+    sid = received[0]['args'][0]['sid']
+    assert np.array_equal(app.task_manager.solution(sid, 'cache-2')['r'], app.task_manager.solution(sid, 'cache-0')['r'])
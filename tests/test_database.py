@@ -1,6 +1,7 @@
 """Testing module of database manager system."""
 
-import time
+import time, os
+from src import database
 
 def test_task_clsgrv_2d_process(app_client, socketio_client, task_clsgrv_2d):
     """Test session of processing the classical gravitation task in 2D configuration."""
@@ -49,4 +50,9 @@ def test_task_clsgrv_2d_postprocess(app_client, socketio_client, task_clsgrv_2d)
     responce = app_client.post('/postprocess', json = request)
     
     assert responce.status_code == 200
-    
\ No newline at end of file
+    
+def test_engine_reuse():
+    """Check that sessions of process share one engine and connection pool."""
+    uri = os.environ['SQLALCHEMY_DATABASE_URI']
+    with database.session(uri) as first, database.session(uri) as second:
+        assert first.get_bind() is second.get_bind() is database.get_engine(uri)
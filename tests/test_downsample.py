@@ -0,0 +1,32 @@
+"""Testing module of adaptive downsampling of trajectories."""
+
+import numpy as np
+from src import downsample
+
+def orbit(n: int) -> np.ndarray:
+    """Two bodies on circular orbits with sharp turn of the first body, shape = (time, order, dimension)."""
+    t = np.linspace(0, 4 * np.pi, n)
+    r = np.stack([np.stack([np.cos(t), np.sin(t)], -1), np.stack([2 * np.cos(t / 2), 2 * np.sin(t / 2)], -1)], 1)
+    r[n // 2:, 0] += np.linspace(0, 1, n - n // 2)[:, np.newaxis] * [1, 0] + [0.5, 0]
+    return r
+
+def test_tolerance():
+    """Check that deviation of dropped samples is bounded by tolerance relative to extent."""
+    r = orbit(20000)
+    keep = downsample.select([r], tolerance = 1e-3)
+    assert keep[0] == 0 and keep[-1] == r.shape[0] - 1 and keep.size < 1000
+    # deviation of every sample from its segment of kept samples
+    index = np.arange(r.shape[0])
+    segment = np.clip(np.searchsorted(keep, index, side = 'right') - 1, 0, keep.size - 2)
+    error = downsample.deviation(r, index, keep[segment], keep[segment + 1])
+    assert error.max() <= 1e-3 * np.ptp(r, axis = (0, 1)).max()
+    # sharp turn is kept
+    assert np.any(np.abs(keep - r.shape[0] // 2) <= 1)
+
+def test_budget():
+    """Check that point budget bounds count of samples independently of mesh length."""
+    for n in (1000, 100000):
+        r = orbit(n)
+        keep = downsample.select([r, np.gradient(r, axis = 0)], max_points = 200)
+        assert keep.size == 200 and np.all(np.diff(keep) > 0)
+    assert np.array_equal(downsample.select([orbit(100)], max_points = 200), np.arange(100))
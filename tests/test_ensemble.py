@@ -0,0 +1,55 @@
+"""Testing module of batched ensemble solving."""
+
+import time
+import numpy as np
+from src import app, solver
+
+def build_tasks(task: dict, count: int) -> list:
+    """Create tasks of the same size with varied masses."""
+    tasks = []
+    for index in range(count):
+        data = task['problem'] | dict(physics = dict(g = 1, t = [0, 2, 201]))
+        data['initial'] = [body | dict(m = body['m'] * (1 + 0.1 * index)) for body in data['initial']]
+        tasks.append(solver.TaskClassicalGravitation(problem = solver.TaskClassicalGravitation.build_problem(data),
+            sid = None, id = f'ensemble-{index}'))
+    return tasks
+
+def test_ensemble_equivalence(task_clsgrv_2d):
+    """Compare ensemble solution with solutions of separate tasks."""
+    tasks = build_tasks(task_clsgrv_2d[0], 5)
+    for task in tasks:
+        task.store = lambda data: None
+    results = solver.TaskEnsembleClassicalGravitation(tasks).solve()
+    for task, result in zip(build_tasks(task_clsgrv_2d[0], 5), results):
+        task.store = lambda data: None
+        reference = task.solve()
+        assert result['id'] == reference['id'] and result['solution']['status']
+        assert np.allclose(result['solution']['r'], reference['solution']['r'], rtol = 1e-5, atol = 1e-6)
+        assert np.allclose(result['solution']['dr'], reference['solution']['dr'], rtol = 1e-5, atol = 1e-6)
+
+def test_batch_grouping(task_clsgrv_2d, task_clsgrv_3d):
+    """Check that only compatible tasks are grouped into ensembles."""
+    tasks = build_tasks(task_clsgrv_2d[0], 8)
+    tree = solver.TaskClassicalGravitation.build_problem(task_clsgrv_2d[0]['problem'] | dict(solver = dict(engine = 'tree')))
+    tasks.append(solver.TaskClassicalGravitation(problem = tree, sid = None, id = 'tree'))
+    units = app.task_manager.batch(tasks)
+    ensembles = [unit for unit in units if type(unit) is solver.TaskEnsembleClassicalGravitation]
+    assert sum(len(unit.tasks) for unit in ensembles) + len(units) - len(ensembles) == len(tasks)
+    assert len(ensembles) == app.task_manager.pool_size
+    assert all(unit.id == 'tree' for unit in units if unit not in ensembles)
+
+def test_ensemble_process(socketio_client, task_clsgrv_2d, monkeypatch):
+    """Check that each task of submitted ensemble is reported by separate process event."""
+    namespace = '/solver'
+    # problems are solved again instead of being served from solution cache
+    monkeypatch.setattr(app.task_manager.cache, 'size', 0)
+    tasks = [task_clsgrv_2d[0] | dict(id = f'ensemble-{index}', problem = task_clsgrv_2d[0]['problem'] | 
+        dict(physics = dict(g = 1 + index, t = [0, 2, 201]))) for index in range(8)]
+    socketio_client.emit('process', tasks, namespace = namespace)
+    received = []
+    while len(received) < len(tasks):
+        time.sleep(0.2)
+        received += socketio_client.get_received(namespace = namespace)
+    assert all(item['name'] == 'process' for item in received)
+    assert sorted(item['args'][0]['id'] for item in received) == sorted(task['id'] for task in tasks)
+    assert all(item['args'][0]['worker']['ensemble'] == 2 for item in received)
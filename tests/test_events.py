@@ -0,0 +1,83 @@
+"""Testing module of events detected during integration."""
+
+import time
+import pytest
+import numpy as np
+from src import app, database, events, integrators, kernels, solver
+
+def head_on() -> tuple:
+    """Two bodies falling onto each other and distant third body."""
+    return np.array([[-1.0, 0], [1, 0], [0, 5]]), np.zeros((3, 2)), [1, 1, 1], np.linspace(0, 3, 301)
+
+def monitor(settings: dict, m: list) -> events.Monitor:
+    return events.Monitor(events.settings(settings), lambda m, softening: kernels.build_kernel(m, 1, len(m), 2,
+        softening = softening), m, 1)
+
+@pytest.mark.parametrize('name', ['odeint', 'leapfrog', 'rk45'])
+@pytest.mark.parametrize('policy', ['stop', 'merge', 'soften'])
+def test_collision(name, policy):
+    """Check that collision is located in time and its policy is applied."""
+    r0, dr0, m, mesh = head_on()
+    detector = monitor(dict(collision = dict(radius = 0.05, policy = policy), softening = 0.05), m)
+    r, dr = detector.integrate(integrators.build_integrator(name), r0, dr0, mesh, substeps = 4)
+    event = detector.log[0]
+    assert event['reason'] == 'collision' and event['bodies'] == [0, 1] and event['policy'] == policy
+    # bodies starting at rest at distance 2 reach distance 0.05 at t ≈ 2.19
+    assert 2.1 < event['t'] < 2.3
+    match policy:
+        case 'stop':
+            assert r.shape == (np.searchsorted(mesh, event['t']), 3, 2)
+            assert np.min(np.linalg.norm(r[:, 0] - r[:, 1], axis = -1)) >= 0.05
+        case 'merge':
+            assert r.shape == (301, 3, 2) and np.allclose(r[-1, 0], r[-1, 1])
+            # momentum is conserved by merging
+            assert np.allclose(dr[-1, 0] * 2 + dr[-1, 2], 0, atol = 1e-6)
+        case 'soften':
+            assert r.shape == (301, 3, 2) and np.all(np.isfinite(r)) and len(detector.log) == 1
+
+def test_escape_energy_budget():
+    """Check that escape, energy error and exhausted budget stop integration."""
+    r0, dr0, m, mesh = head_on()
+    detector = monitor(dict(escape = dict(distance = 3)), [1, 1])
+    r, dr = detector.integrate(integrators.lsoda, np.array([[0.0, 0], [1, 0]]), np.array([[0.0, 0], [3, 0]]), mesh)
+    assert detector.log[0]['reason'] == 'escape' and r.shape[0] == np.searchsorted(mesh, detector.log[0]['t']) + 1
+    assert np.all(np.linalg.norm(r[:-1] - np.mean(r[:-1], axis = 1, keepdims = True), axis = -1) <= 3)
+    # fixed step integrator loses energy at close approach
+    detector = monitor(dict(energy = dict(threshold = 1e-3)), m)
+    r, dr = detector.integrate(integrators.leapfrog, r0, dr0, mesh)
+    assert detector.log[0]['reason'] == 'energy' and detector.log[0]['bodies'] == [0, 1] and r.shape[0] < 301
+    detector = monitor(dict(budget = 500), m)
+    r, dr = detector.integrate(integrators.lsoda, r0, dr0, mesh)
+    assert detector.log[0]['reason'] == 'budget' and detector.calls == 501 and r.shape[0] < 301
+    with pytest.raises(ValueError):
+        events.settings(dict(escape = dict(distance = 3, policy = 'merge')))
+
+def test_process_events(socketio_client, task_clsgrv_2d):
+    """Check that event is reported by process result and solution is stored up to event."""
+    namespace = '/solver'
+    problem = task_clsgrv_2d[0]['problem'] | dict(physics = dict(g = 1, t = [0, 10, 1001]),
+        solver = dict(events = dict(collision = dict(radius = 0.1), budget = 10**6)))
+    # solution stored by previous run is not reused
+    with database.session(app.config['SQLALCHEMY_DATABASE_URI']) as session:
+        session.query(solver.ModelTaskClassicalGravitation).filter_by(id = 'events').delete()
+        session.commit()
+    socketio_client.emit('process', [task_clsgrv_2d[0] | dict(id = 'events', problem = problem)], namespace = namespace)
+    while True:
+        time.sleep(0.2)
+        received = [item for item in socketio_client.get_received(namespace = namespace) if item['name'] == 'process']
+        if received:
+            break
+    event = received[-1]['args'][0]['events'][0]
+    assert event['reason'] == 'collision' and event['policy'] == 'stop'
+    with database.session(app.config['SQLALCHEMY_DATABASE_URI']) as session:
+        data = solver.TaskClassicalGravitation(id = 'events').load(session)
+        assert data['t'][-1] < event['t'] and data['r'].shape == (data['t'].size, 3, 2)
+        assert data['digest'] == solver.cache.digest(solver.TaskClassicalGravitation.build_problem(problem))
+    # the same problem is served by stored solution with its events
+    socketio_client.emit('process', [task_clsgrv_2d[0] | dict(id = 'events-served', problem = problem)], namespace = namespace)
+    while True:
+        time.sleep(0.2)
+        received = [item for item in socketio_client.get_received(namespace = namespace) if item['name'] == 'process']
+        if received:
+            break
+    assert received[-1]['args'][0]['worker']['name'] == 'cache' and received[-1]['args'][0]['events'] == [event]
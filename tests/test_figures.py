@@ -0,0 +1,23 @@
+"""Testing module of figures export."""
+
+import numpy as np
+from src.solver import TaskClassicalGravitation
+from benchmarks.bench_animate import animate_plotly
+
+def test_animate_equal_plotly():
+    """Check that animation assembled from trajectory array equals figure built by plotly frame objects."""
+    rng = np.random.default_rng(0)
+    for dimension in (2, 3):
+        vector = rng.normal(size = (80, 3, dimension))
+        layout = dict(title = 'Space trajectory')
+        assert TaskClassicalGravitation.animate(vector, 50, layout) == animate_plotly(vector, 50, layout)
+        # non-finite values are serialized as null
+        vector[10, 1, 0] = np.nan
+        assert TaskClassicalGravitation.animate(vector, 5) == animate_plotly(vector, 5)
+
+def test_animate_3d_trace():
+    """Check that first frames of 3D animation trace all coordinates."""
+    vector = np.random.default_rng(0).normal(size = (80, 2, 3))
+    figure = TaskClassicalGravitation.animate(vector, 50)
+    assert len(figure['frames']) == 80
+    assert all(len(trace['z']) == len(trace['x']) for frame in figure['frames'] for trace in frame['data'])
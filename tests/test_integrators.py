@@ -0,0 +1,42 @@
+"""Testing module of integrators of the cauchy problem."""
+
+import pytest
+import numpy as np
+from src import integrators, kernels, solver
+
+def circular_orbit(mesh: np.ndarray) -> tuple:
+    """Analytic solution of two equal bodies on circular orbit around common center of mass."""
+    # bodies of unit mass at distance 2, g = 1: angular velocity w = sqrt(g * (m1 + m2) / d**3)
+    w = np.sqrt(2 / 8)
+    phase = w * mesh
+    r = np.stack((np.cos(phase), np.sin(phase)), axis = 1)
+    dr = w * np.stack((-np.sin(phase), np.cos(phase)), axis = 1)
+    return np.stack((r, -r), axis = 1), np.stack((dr, -dr), axis = 1)
+
+@pytest.mark.parametrize('name, options, tolerance', [
+    ('odeint', dict(), 1e-4),
+    ('leapfrog', dict(substeps = 4), 1e-3),
+    ('yoshida4', dict(), 1e-5),
+    ('rk45', dict(rtol = 1e-9, atol = 1e-12), 1e-6),
+])
+def test_integrator_circular_orbit(name, options, tolerance):
+    """Compare integrated trajectory with analytic circular orbit."""
+    mesh = np.linspace(0, 50, 1001)
+    r, dr = circular_orbit(mesh)
+    kernel = kernels.build_kernel([1, 1], 1.0, 2, 2)
+    r_num, dr_num = integrators.build_integrator(name)(kernel, r[0], dr[0], mesh, **options)
+    assert r_num.shape == r.shape and dr_num.shape == dr.shape
+    assert np.max(np.abs(r_num - r)) < tolerance
+    assert np.max(np.abs(dr_num - dr)) < tolerance
+
+def test_solve_integrator_shapes(task_clsgrv_2d):
+    """Check that every integrator fills solution arrays of shape (time, order, dimension)."""
+    data = task_clsgrv_2d[0]['problem'] | dict(physics = dict(g = 1, t = [0, 1, 101]))
+    for name in integrators.integrators:
+        problem = solver.TaskClassicalGravitation.build_problem(data | dict(solver = dict(integrator = name)))
+        task = solver.TaskClassicalGravitation(problem = problem, sid = None, id = None)
+        task.store = lambda data: None
+        result = task.solve()
+        assert result['solution']['status']
+        assert result['solution']['r'].shape == (101, 3, 2)
+        assert result['solution']['dr'].shape == (101, 3, 2)
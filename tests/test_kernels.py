@@ -0,0 +1,56 @@
+"""Testing module of force kernels."""
+
+import pytest
+import numpy as np
+from src import kernels, solver
+
+def system_equations_reference(argument: np.ndarray, t: float, *parameters) -> np.ndarray:
+    """Original dense implementation of the cauchy problem."""
+    g, order, dimension = parameters[-3], parameters[-2], parameters[-1]
+    m = parameters[:-3]
+    r = np.reshape(argument[::2], (-1, dimension))
+    dr = argument[1::2]
+    r_ij = r.reshape((1, order, dimension)) - r.reshape((order, 1, dimension))
+    [np.fill_diagonal(r_ij[:, :, i], np.nan) for i in np.arange(r_ij.shape[2])]
+    d_ij = np.sqrt(np.nansum(r_ij**2, axis = 2))
+    np.fill_diagonal(d_ij, np.nan)
+    d_ij = np.repeat(d_ij, dimension, axis = 1).reshape((order, order, dimension))
+    m_ij = np.repeat(m, order * dimension, axis = 0).reshape((order, order, dimension))
+    m_ij = np.moveaxis(m_ij, 0, 1)
+    ddr = np.nansum(g * m_ij * r_ij / d_ij**3, axis = 1)
+    vector = np.zeros(2 * order * dimension)
+    vector[0::2] = dr
+    vector[1::2] = ddr.flatten()
+    return vector
+
+@pytest.mark.parametrize('backend', list(kernels.backends.keys()))
+@pytest.mark.parametrize('order, dimension', [(2, 2), (3, 2), (3, 3), (17, 3)])
+def test_system_equations_equivalence(backend, order, dimension):
+    """Compare right-hand side of the cauchy problem with original implementation."""
+    rng = np.random.default_rng(order * dimension)
+    m = rng.uniform(0.5, 2, order)
+    argument = rng.normal(size = 2 * order * dimension)
+    parameters = tuple(m) + (0.7, order, dimension)
+
+    task = solver.TaskClassicalGravitation(problem = dict(solver = dict(backend = backend)))
+    for _ in range(2):
+        # repeated evaluation reuses kernel buffers
+        vector = task.system_equations(argument, 0.0, *parameters)
+        assert np.allclose(vector, system_equations_reference(argument, 0.0, *parameters), rtol = 1e-10, atol = 1e-12)
+        argument = argument[::-1].copy()
+
+@pytest.mark.parametrize('dimension', [2, 3])
+@pytest.mark.parametrize('theta, tolerance', [(0.0, 1e-10), (0.5, 1.5e-2)])
+def test_tree_accuracy(dimension, theta, tolerance):
+    """Compare tree code accelerations with direct summation within documented error."""
+    order = 600
+    rng = np.random.default_rng(dimension)
+    r = rng.normal(size = (order, dimension))
+    # add dense cluster to force deep tree
+    r[:order // 3] *= 0.05
+    m = rng.uniform(0.5, 2, order)
+    
+    reference = kernels.build_kernel(m, 1.0, order, dimension, engine = 'direct')(r)
+    ddr = kernels.build_kernel(m, 1.0, order, dimension, engine = 'tree', theta = theta)(r)
+    error = np.linalg.norm(ddr - reference, axis = 1) / np.linalg.norm(reference, axis = 1)
+    assert np.sqrt(np.mean(error**2)) < tolerance
@@ -0,0 +1,40 @@
+"""Testing module of phase instrumentation and metrics route."""
+
+import time
+from src import app, metrics
+
+def test_registry_render():
+    """Check that histograms and counters are rendered in Prometheus text format."""
+    registry = metrics.Registry()
+    [registry.observe('phase_seconds', value, phase = 'integrate') for value in (0.002, 0.2, 100)]
+    registry.record(dict(time = 0.5, phases = dict(rhs = 0.01), counters = dict(rhs_calls = 10)), 'process')
+    text = registry.render(dict(scheduler_running = 1))
+    assert 'slv_phs_tsk_phase_seconds_bucket{phase="integrate",le="0.005"} 1' in text
+    assert 'slv_phs_tsk_phase_seconds_bucket{phase="integrate",le="+Inf"} 3' in text
+    assert 'slv_phs_tsk_phase_seconds_count{phase="integrate"} 3' in text
+    assert 'slv_phs_tsk_task_seconds_sum{method="process"} 0.5' in text
+    assert 'slv_phs_tsk_rhs_calls_total 10' in text and 'slv_phs_tsk_scheduler_running 1' in text
+
+def test_task_phases(app_client, socketio_client, task_clsgrv_2d):
+    """Check that worker reports phases and profile of task and metrics route aggregates them."""
+    namespace = '/solver'
+    app.task_manager.cache.size = 0
+    task = task_clsgrv_2d[0] | dict(id = 'metrics', profile = True, problem = task_clsgrv_2d[0]['problem'] |
+        dict(physics = dict(g = 1, t = [0, 2, 201])))
+    workers = {}
+    for event in ('process', 'postprocess'):
+        socketio_client.emit(event, [task], namespace = namespace)
+        received = []
+        while not any(item['name'] == event for item in received):
+            time.sleep(0.2)
+            received += socketio_client.get_received(namespace = namespace)
+        workers[event] = received[-1]['args'][0]['worker']
+    assert {'integrate', 'rhs', 'offload'} <= set(workers['process']['phases'])
+    assert workers['process']['counters']['rhs_calls'] > 0 and workers['process']['counters']['serialized_bytes'] > 0
+    assert 'cumulative' in workers['process']['profile']
+    assert {'load', 'reduce', 'export.plot', 'export.animate', 'export.table'} <= set(workers['postprocess']['phases'])
+    text = app_client.get('/metrics').get_data(as_text = True)
+    assert 'slv_phs_tsk_phase_seconds_count{phase="emit"}' in text
+    assert 'slv_phs_tsk_phase_seconds_count{phase="write"}' in text
+    assert 'slv_phs_tsk_queue_wait_seconds_count{method="postprocess"}' in text
+    assert 'slv_phs_tsk_tasks_total{channel="process",status="solved"}' in text
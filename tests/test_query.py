@@ -0,0 +1,23 @@
+"""Testing module of time window query of stored solution."""
+
+import os
+import numpy as np
+from src import database, solver
+
+def test_query_window():
+    """Check that query reads time window of body subset and limits count of samples."""
+    t = np.linspace(0, 100, 5001)
+    r = np.random.default_rng(0).normal(size = (t.size, 3, 2)).cumsum(axis = 0)
+    problem = dict(g = 1, dimension = 2, order = 3, m = [1, 1, 2], r0 = r[0], dr0 = r[0], mesh = t)
+    task = solver.TaskClassicalGravitation(id = 'query')
+    task._storage['chunk'] = 500
+    task.store(dict(id = task.id, problem = problem, solution = dict(r = r, dr = 2 * r)))
+    with database.session(os.environ['SQLALCHEMY_DATABASE_URI']) as session:
+        # window of a few samples is returned completely
+        data = task.query(session, 10, 10.1, [2])
+        assert np.allclose(data['t'], t[500:506]) and np.array_equal(data['r'], r[500:506, [2]])
+        data = task.query(session, 20, 60, [0, 1], max_points = 100)
+        assert data['t'].size == 100 and data['t'][0] == 20 and data['t'][-1] == 60
+        assert data['r'].shape == (100, 2, 2) and np.array_equal(data['dr'], 2 * data['r'])
+        data = task.query(session, 200, 300)
+        assert data['t'].size == 0
@@ -0,0 +1,42 @@
+"""Testing module of render cache of postprocessed figures."""
+
+import json, time
+from src import app, renders
+
+def test_tiers(tmp_path):
+    """Check that figures are served by memory and disk tiers within size limits."""
+    source = tmp_path / 'figures.json'
+    source.write_text(json.dumps(dict(plots = dict(trajectory = list(range(1000))))))
+    nbytes = source.stat().st_size
+    cache = renders.RenderCache(memory = nbytes, disk = 2 * nbytes, directory = str(tmp_path))
+    [cache.put(key, 'task', str(source)) for key in 'abc']
+    assert 'a' not in cache and 'b' in cache and 'c' in cache
+    assert cache.get('b')['plots']['trajectory'][-1] == 999 and cache.get('b') is not None
+    cache.get('c')
+    assert cache.counters['disk_hits'] == 2 and cache.counters['memory_hits'] == 1
+    assert cache.usage()['memory'] == nbytes
+    cache.invalidate('task', keep = 'c')
+    assert 'b' not in cache and 'c' in cache
+    cache.clear()
+    assert not list((tmp_path / 'render').iterdir())
+
+def test_postprocess_cached(socketio_client, task_clsgrv_2d):
+    """Check that repeated postprocessing of stored solution is served from render cache."""
+    namespace = '/solver'
+    task = task_clsgrv_2d[0] | dict(id = 'render', problem = task_clsgrv_2d[0]['problem'] | 
+        dict(physics = dict(g = 1, t = [0, 2, 201])))
+    def wait(name: str) -> dict:
+        while True:
+            time.sleep(0.2)
+            items = [item for item in socketio_client.get_received(namespace = namespace) if item['name'] == name]
+            if items:
+                return items[0]['args'][0]
+    socketio_client.emit('process', [task], namespace = namespace)
+    wait('process')
+    events = []
+    for repeat in range(2):
+        socketio_client.emit('postprocess', [task], namespace = namespace)
+        events.append(wait('postprocess'))
+    assert events[-1]['worker']['name'] == 'render cache'
+    sid = events[-1]['sid']
+    assert app.task_manager.figures(sid, 'render')['plots']['trajectory']
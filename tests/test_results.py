@@ -0,0 +1,43 @@
+"""Testing module of bounded result store."""
+
+import os
+import numpy as np
+from src import shared, results
+
+def result(id: str, size: int = 1000) -> dict:
+    """Create offloaded result of task with trajectory of specified size."""
+    return shared.offload(dict(sid = 'sid', id = id, solution = dict(r = np.full((size, 2, 2), 1.0),
+        dr = np.full((size, 2, 2), 2.0), status = True)))
+
+def test_memory_budget(tmp_path):
+    """Check that least recently used results are spilled to disk and remain readable."""
+    nbytes = 2 * 1000 * 2 * 2 * 8
+    store = results.ResultStore(memory = 2 * nbytes, disk = 100 * nbytes, ttl = 3600, directory = str(tmp_path))
+    [store.put(result(str(index))) for index in range(3)]
+    store.get('sid', '0')
+    store.put(result('3'))
+    usage = store.usage()
+    assert usage['memory'] <= 2 * nbytes and usage['disk'] == 2 * nbytes
+    # the least recently used entry is the first one put after access of entry 0
+    assert type(store.get('sid', '1')['solution']['r']) is shared.SpilledArray
+    assert type(store.get('sid', '3')['solution']['r']) is shared.SharedArray
+    assert np.all(store.get('sid', '1')['solution']['dr'].load() == 2)
+    store.clear()
+    assert not os.listdir(tmp_path / 'spill')
+
+def test_spill_expire_evict(tmp_path):
+    """Check disconnect spill, TTL expiration and disk budget eviction."""
+    nbytes = 2 * 1000 * 2 * 2 * 8
+    store = results.ResultStore(memory = 100 * nbytes, disk = 2 * nbytes, ttl = 3600, directory = str(tmp_path))
+    [store.put(result(str(index))) for index in range(3)]
+    store.spill('sid')
+    assert store.usage()['memory'] == 0
+    # disk budget keeps the most recent entries
+    assert len(store) == 2 and ('sid', '0') not in store and store.counters['evicted'] == 1
+    store.ttl = 0
+    try:
+        store.get('sid', '2')
+    except KeyError:
+        pass
+    assert len(store) == 0 and store.counters['expired'] == 2
+    assert not os.listdir(tmp_path / 'spill')
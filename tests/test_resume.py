@@ -0,0 +1,54 @@
+"""Testing module of checkpointed, resumable and extendable integrations."""
+
+import os, time
+import numpy as np
+from src import database, solver
+
+def solution(id: str) -> dict:
+    """Read stored solution of task."""
+    with database.session(os.environ['SQLALCHEMY_DATABASE_URI']) as session:
+        return solver.TaskClassicalGravitation(id = id).load(session)
+
+def test_resume_extend(task_clsgrv_2d):
+    """Check that interrupted task is resumed and finished task is extended to the same trajectory as solved at once."""
+    data = task_clsgrv_2d[0]['problem'] | dict(physics = dict(g = 1, t = [0, 2, 201]),
+        solver = dict(integrator = 'leapfrog', substeps = 4, checkpoint = 40))
+    reference = solver.TaskClassicalGravitation(problem = solver.TaskClassicalGravitation.build_problem(data |
+        dict(physics = dict(g = 1, t = [0, 4, 401]))), sid = None, id = 'resume-reference')
+    reference.store = lambda data: None
+    reference = reference.solve()['solution']
+
+    task = solver.TaskClassicalGravitation(problem = solver.TaskClassicalGravitation.build_problem(data), sid = None, id = 'resume')
+    assert task.solve_stream()['solution']['status']
+    with database.session(os.environ['SQLALCHEMY_DATABASE_URI']) as session:
+        # interrupt task after two checkpoints
+        model = solver.ModelTaskClassicalGravitationChunk
+        assert session.query(model).filter_by(id = 'resume').count() == 6
+        session.query(model).filter(model.id == 'resume', model.chunk >= 2).delete()
+        session.commit()
+    assert solution('resume')['t'].size == 80
+    assert solver.TaskClassicalGravitation(sid = None, id = 'resume').solve_stream(resume = True)['solution']['status']
+    stored = solution('resume')
+    assert np.allclose(stored['t'], np.linspace(0, 2, 201)) and np.allclose(stored['r'], reference['r'][:201])
+    # extend finished task
+    task = solver.TaskClassicalGravitation(sid = None, id = 'resume', extend = dict(t = [4, 201]))
+    assert task.solve_stream(resume = True)['solution']['status']
+    stored = solution('resume')
+    assert np.allclose(stored['t'], np.linspace(0, 4, 401))
+    assert np.allclose(stored['r'], reference['r'], rtol = 1e-10, atol = 1e-12)
+    assert np.allclose(stored['dr'], reference['dr'], rtol = 1e-10, atol = 1e-12)
+
+def test_continue_event(socketio_client, task_clsgrv_2d):
+    """Check that stored task is continued by socket event."""
+    namespace = '/solver'
+    task = task_clsgrv_2d[0] | dict(id = 'resume-event', problem = task_clsgrv_2d[0]['problem'] |
+        dict(physics = dict(g = 1, t = [0, 1, 101])))
+    for event, data in (('process', task), ('continue', dict(task, extend = dict(t = [2, 101])))):
+        socketio_client.emit(event, [data], namespace = namespace)
+        while True:
+            time.sleep(0.2)
+            result = socketio_client.get_received(namespace = namespace)
+            if result:
+                break
+        assert result[0]['name'] == 'process'
+    assert np.allclose(solution('resume-event')['t'], np.linspace(0, 2, 201))
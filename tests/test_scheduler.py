@@ -0,0 +1,79 @@
+"""Testing module of scheduler of pool jobs."""
+
+import time
+from src import app, scheduler, solver
+
+class Pool():
+    """Pool keeping applied functions until they are finished by test."""
+    def __init__(self) -> None:
+        self.applied = []
+
+    def apply_async(self, function, callback = None, error_callback = None) -> None:
+        self.applied.append((function, callback))
+
+    def finish(self, index: int = 0) -> None:
+        function, callback = self.applied.pop(index)
+        callback(function())
+
+class Unit():
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def process(self) -> str:
+        return self.name
+
+def test_scheduler_order():
+    """Check that jobs are started by priority and load of clients within quota and overload is rejected."""
+    pool, events, results = Pool(), [], []
+    limits = dict(POOL_SIZE = 2, SCHEDULER_QUOTA = 1, SCHEDULER_QUEUE = 2, SCHEDULER_BACKLOG = 3, SCHEDULER_MAX_COST = 100)
+    jobs = scheduler.Scheduler(pool, 2, scheduler.create_flags(), lambda channel, sid, data: events.append((channel, sid, data)), limits)
+    def job(name, sid, cost = 1, priority = 0):
+        return scheduler.Job(Unit(name), 'process', sid, [name], results.append, lambda reason: results.append(reason),
+            cost = cost, priority = priority)
+    assert jobs.submit(job('a1', 'a', cost = 50)) == 'running'
+    assert jobs.submit(job('a2', 'a')) == 'queued'
+    assert jobs.submit(job('a3', 'a')) == 'queued'
+    # queue of client is full, cost exceeds limit
+    assert jobs.submit(job('a4', 'a')) == 'rejected'
+    assert jobs.submit(job('b0', 'b', cost = 1000)) == 'rejected'
+    assert results == ['queue of client is full', 'cost of job 1e+03 exceeds limit 100']
+    assert jobs.submit(job('b1', 'b')) == 'running'
+    assert jobs.submit(job('c1', 'c', priority = 1)) == 'queued'
+    assert jobs.submit(job('b2', 'b')) == 'rejected' and results[-1] == 'server is overloaded'
+    # job of the highest priority is started first, then job of client without running jobs
+    pool.finish(0)
+    assert results[-1] == 'a1' and [function.__self__.name for function, callback in pool.applied] == ['b1', 'c1']
+    pool.finish(0)
+    assert [function.__self__.name for function, callback in pool.applied] == ['c1', 'a2']
+    assert ('queued', 'a', dict(id = 'a3', sid = 'a', position = 2, cost = 1)) in events
+    # waiting job is cancelled, running job is flagged
+    assert jobs.cancel('a', ['a3', 'a2']) == 2
+    assert results[-1] == 'cancelled' and jobs.flags[pool.applied[1][0].__self__._token] == 1
+    pool.finish(1)
+    assert jobs.state() | dict(submitted = 0) == dict(running = 1, pending = 0, cost = 1, submitted = 0, rejected = 3,
+        cancelled = 2, completed = 3)
+
+def wait(socketio_client, namespace: str) -> list:
+    """Wait for events of client."""
+    while True:
+        time.sleep(0.2)
+        received = socketio_client.get_received(namespace = namespace)
+        if any(item['name'] == 'process' for item in received):
+            return received
+
+def test_cancel_timeout(socketio_client, task_clsgrv_2d):
+    """Check that running task is interrupted by cancel event and by its time limit."""
+    namespace = '/solver'
+    app.task_manager.cache.size = 0
+    problem = task_clsgrv_2d[0]['problem'] | dict(physics = dict(g = 1, t = [0, 1000, 100001]),
+        solver = dict(integrator = 'leapfrog', substeps = 64))
+    socketio_client.emit('process', [task_clsgrv_2d[0] | dict(id = 'cancel', problem = problem)], namespace = namespace)
+    time.sleep(0.5)
+    socketio_client.emit('cancel', [dict(id = 'cancel')], namespace = namespace)
+    received = wait(socketio_client, namespace)
+    assert received[-1]['args'][0]['interrupted'] == 'cancelled'
+    socketio_client.emit('process', [task_clsgrv_2d[0] | dict(id = 'timeout', problem = problem, timeout = 0.5)],
+        namespace = namespace)
+    received = wait(socketio_client, namespace)
+    assert received[-1]['args'][0]['interrupted'] == 'timeout'
+    assert app.task_manager.scheduler.state()['running'] == 0
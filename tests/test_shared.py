@@ -0,0 +1,33 @@
+"""Testing module of passing worker results by shared memory and files."""
+
+import os, time
+import numpy as np
+from src import app, shared
+
+def test_offload_release():
+    """Check that offloaded payloads are restored and released."""
+    r = np.random.default_rng(0).normal(size = (100, 3, 2))
+    result = dict(sid = 'sid', id = 'id', solution = dict(r = r, dr = np.array([]), status = True),
+        plots = dict(trajectory = dict(data = [1, 2])), problem = dict(mesh = np.arange(100)))
+    shared.offload(result)
+    assert 'problem' not in result and 'plots' not in result
+    assert type(result['solution']['r']) is shared.SharedArray
+    assert np.array_equal(result['solution']['r'].load(), r)
+    assert result['figures'].load() == dict(plots = dict(trajectory = dict(data = [1, 2])))
+    shared.release(result)
+    assert not os.path.exists(result['figures'].path)
+
+def test_task_clsgrv_2d_result(socketio_client, task_clsgrv_2d):
+    """Check that solution of processed task is returned to result index."""
+    namespace = '/solver'
+    task = task_clsgrv_2d[0] | dict(id = 'shared', problem = task_clsgrv_2d[0]['problem'] |
+        dict(physics = dict(g = 1, t = [0, 1, 101])))
+    socketio_client.emit('process', [task], namespace = namespace)
+    while True:
+        time.sleep(0.2)
+        result = socketio_client.get_received(namespace = namespace)
+        if result:
+            break
+    assert result[0]['name'] == 'process'
+    solution = app.task_manager.solution(result[0]['args'][0]['sid'], 'shared')
+    assert solution['status'] and solution['r'].shape == (101, 3, 2)
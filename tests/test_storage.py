@@ -0,0 +1,16 @@
+"""Testing module of binary trajectory storage."""
+
+import pytest
+import numpy as np
+from src import storage
+
+@pytest.mark.parametrize('compression', list(storage.codecs.keys()))
+@pytest.mark.parametrize('dtype', ['float64', 'float32'])
+def test_encode_decode(compression, dtype):
+    """Check round trip of encoded arrays."""
+    array = np.cumsum(np.random.default_rng(0).normal(size = (500, 3, 2)), axis = 0)
+    decoded = storage.decode(storage.encode(array, dtype = dtype, compression = compression))
+    assert decoded.shape == array.shape and decoded.dtype == np.dtype(dtype)
+    assert np.array_equal(decoded, array.astype(dtype))
+    # empty solution of failed or streamed task
+    assert storage.decode(storage.encode(np.array([]), compression = compression)).shape == (0,)
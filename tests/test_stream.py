@@ -0,0 +1,31 @@
+"""Testing module of streaming progressive results."""
+
+import time
+from src import app
+
+def test_task_clsgrv_2d_stream(socketio_client, task_clsgrv_2d):
+    """Check that streamed task reports every chunk by progress event and can be postprocessed."""
+    namespace = '/solver'
+    task = task_clsgrv_2d[0] | dict(id = 'stream', problem = task_clsgrv_2d[0]['problem'] | 
+        dict(physics = dict(g = 1, t = [0, 2, 201]), solver = dict(stream = 50)))
+    socketio_client.emit('process', [task], namespace = namespace)
+    received = []
+    while not any(item['name'] == 'process' for item in received):
+        time.sleep(0.2)
+        received += socketio_client.get_received(namespace = namespace)
+    progress = [item['args'][0] for item in received if item['name'] == 'progress']
+    # progress events precede process event
+    assert [item['chunk'] for item in progress] == [0, 1, 2, 3, 4]
+    assert progress[-1]['percent'] == 100
+    assert sum(len(item['t']) for item in progress) == 201
+    assert len(progress[0]['r'][0]) == 3
+
+    socketio_client.emit('postprocess', [task], namespace = namespace)
+    while True:
+        time.sleep(0.2)
+        result = socketio_client.get_received(namespace = namespace)
+        if result:
+            break
+    assert result[0]['name'] == 'postprocess'
+    sid = result[0]['args'][0]['sid']
+    assert app.task_manager.figures(sid, 'stream')['plots']['trajectory']
@@ -0,0 +1,49 @@
+"""Testing module of parameter sweep job."""
+
+import time
+import numpy as np
+from src import sweep
+
+def test_sweep_expand(task_clsgrv_2d):
+    """Check expansion of grid and random sweeps."""
+    problem = sweep.TaskClassicalGravitation.build_problem(task_clsgrv_2d[0]['problem'])
+    axes = [dict(parameter = 'm', body = 2, values = [1, 2, 3]), 
+        dict(parameter = 'dr0', body = 0, component = 1, range = [0, 0.5], num = 4)]
+    batch = sweep.expand(problem, axes)
+    assert batch['table'].shape == (12, 2)
+    assert np.array_equal(batch['m'][:, 2], batch['table'][:, 0])
+    assert np.array_equal(batch['dr0'][:, 0, 1], batch['table'][:, 1])
+    assert np.array_equal(batch['r0'][5], problem['r0'])
+    batch = sweep.expand(problem, [dict(parameter = 'g', range = [0.5, 2])], mode = 'random', samples = 7, seed = 0)
+    assert batch['g'].shape == (7,) and np.all((batch['g'] >= 0.5) & (batch['g'] <= 2))
+
+def test_sweep_summary():
+    """Check minimal separation and escape flags of analytic trajectories."""
+    mesh = np.linspace(0, 1, 11)
+    # two bodies of unit mass flying apart with high speed
+    r = np.stack([np.stack([[-1 - 10 * t, 0], [1 + 10 * t, 0]]) for t in mesh])[:, np.newaxis]
+    dr = np.tile(np.array([[-10, 0], [10, 0]], dtype = float), (mesh.size, 1, 1, 1))
+    summary = sweep.summarize(r, dr, np.ones((1, 2)), np.ones(1))
+    assert np.isclose(summary['separation'][0], 2)
+    assert summary['escape'].tolist() == [[True, True]]
+    summary = sweep.summarize(r, dr / 100, np.ones((1, 2)), np.ones(1))
+    assert summary['escape'].tolist() == [[False, False]]
+
+def test_sweep_process(socketio_client, task_clsgrv_2d):
+    """Check that sweep job returns summary of every sample."""
+    namespace = '/solver'
+    data = dict(id = 'sweep', type = task_clsgrv_2d[0]['type'], 
+        problem = task_clsgrv_2d[0]['problem'] | dict(physics = dict(g = 1, t = [0, 2, 201])),
+        axes = [dict(parameter = 'm', body = 0, range = [1, 2], num = 5), dict(parameter = 'g', values = [1, 2, 3, 4, 5, 6, 7])])
+    socketio_client.emit('sweep', data, namespace = namespace)
+    while True:
+        time.sleep(0.2)
+        result = socketio_client.get_received(namespace = namespace)
+        if result:
+            break
+    assert result[0]['name'] == 'sweep'
+    result = result[0]['args'][0]
+    assert result['status'] and result['id'] == 'sweep'
+    assert len(result['samples']) == 35
+    assert np.array(result['summary']['r']).shape == (35, 3, 2)
+    assert np.array(result['summary']['escape']).shape == (35, 3)
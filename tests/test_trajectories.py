@@ -0,0 +1,47 @@
+"""Testing module of local trajectory cache."""
+
+import os
+import numpy as np
+from src import database, solver, trajectories
+
+def solution(size: int, scale: float = 1) -> tuple:
+    """Solution of three bodies."""
+    r = scale * np.random.default_rng(0).normal(size = (size, 3, 2))
+    return np.linspace(0, 1, size), r, 2 * r
+
+def test_trajectories_lru(tmp_path):
+    """Check that cached solution is memory-mapped, new version replaces old one and the least recently used is evicted."""
+    cache = trajectories.TrajectoryCache(disk = 2**20, directory = str(tmp_path))
+    cache.put('a', 'v1', *solution(1001))
+    assert cache.get('a', 'v2') is None and cache.counters['misses'] == 1
+    data = cache.get('a', 'v1')
+    assert isinstance(data['r'], np.memmap) and np.allclose(data['r'], solution(1001)[1])
+    cache.put('a', 'v2', *solution(1001, 2))
+    assert cache.get('a', 'v1') is None and np.allclose(cache.get('a', 'v2')['dr'], 2 * solution(1001, 2)[1])
+    # each solution takes about 100 kB, disk limit keeps about ten of them
+    for index in range(20):
+        cache.put(f'b{index}', 'v1', *solution(1001))
+    assert cache.usage() <= 2**20 and cache.counters['evictions'] > 0
+    assert cache.get('a', 'v2') is None and cache.get('b19', 'v1') is not None
+
+def test_trajectories_read(tmp_path):
+    """Check that stored solution is read from cache and read from database on miss."""
+    uri = os.environ['SQLALCHEMY_DATABASE_URI']
+    solver.Base.metadata.create_all(database.get_engine(uri))
+    trajectories._cache = trajectories.TrajectoryCache(directory = str(tmp_path))
+    try:
+        t, r, dr = solution(301)
+        problem = dict(g = 1, dimension = 2, order = 3, m = [1, 1, 2], r0 = r[0], dr0 = dr[0], mesh = t, solver = {})
+        task = solver.TaskClassicalGravitation(id = 'trajectories-read')
+        task.store(dict(id = task.id, problem = problem, solution = dict(r = r, dr = dr, status = True)))
+        with database.session(uri) as session:
+            data = task.read(session)
+        assert isinstance(data['r'], np.memmap) and np.allclose(data['r'], r) and np.allclose(data['t'], t)
+        trajectories.default().clear()
+        with database.session(uri) as session:
+            data = task.read(session)
+            assert not isinstance(data['r'], np.memmap) and np.allclose(data['dr'], dr)
+            # solution read from database is cached
+            assert isinstance(task.read(session)['dr'], np.memmap)
+    finally:
+        trajectories._cache = None
@@ -0,0 +1,26 @@
+"""Testing module of binary wire format of trajectories."""
+
+import numpy as np
+from src import wire
+from src.solver import TaskClassicalGravitation
+
+def test_pack_unpack():
+    """Check that arrays are restored from aligned offsets of payload."""
+    rng = np.random.default_rng(0)
+    arrays = dict(t = np.linspace(0, 1, 7), r = rng.normal(size = (7, 3, 2)), dr = rng.normal(size = (7, 3, 2)))
+    for dtype in wire.dtypes:
+        payload = wire.pack(arrays, dict(label = 'test'), dtype)
+        descriptor, restored = wire.unpack(payload)
+        assert descriptor['label'] == 'test' and descriptor['version'] == wire.version
+        assert all(item['offset'] % 8 == 0 for item in descriptor['arrays'])
+        for key, value in arrays.items():
+            assert np.array_equal(restored[key], value.astype(dtype))
+
+def test_export_binary():
+    """Check that binary export holds reduced solution once."""
+    t = np.linspace(0, 10, 1001)
+    r = np.random.default_rng(0).normal(size = (1001, 3, 3))
+    descriptor, arrays = wire.unpack(TaskClassicalGravitation.export_binary(dict(t = t, r = r, dr = 2 * r), 'sid', 'id'))
+    assert descriptor['n_trace'] == TaskClassicalGravitation.n_trace and descriptor['dimension'] == 3
+    t_reduced, r_reduced, dr_reduced = TaskClassicalGravitation.reduce(dict(t = t, r = r, dr = 2 * r))
+    assert np.array_equal(arrays['r'], r_reduced) and np.array_equal(arrays['t'], t_reduced)
@@ -0,0 +1,37 @@
+"""Testing module of write-behind batched persistence."""
+
+import os, threading
+import numpy as np
+import pytest
+from src import database, solver, writer
+
+def result(id: str, scale: float, size: int = 301) -> dict:
+    """Solved task result as passed to writer."""
+    t = np.linspace(0, 1, size)
+    r = scale * np.random.default_rng(0).normal(size = (size, 3, 2))
+    problem = dict(g = 1, dimension = 2, order = 3, m = [1, 1, 2], r0 = r[0], dr0 = r[0], mesh = t, solver = {})
+    return dict(sid = None, id = id, problem = problem, persist = True, solution = dict(r = r, dr = 2 * r, status = True))
+
+@pytest.mark.parametrize('uri', ['sqlite', 'default'])
+def test_writer_upsert(uri, tmp_path):
+    """Check that batches are stored by upsert, rewritten task replaces its record and chunks."""
+    uri = f'sqlite:///{tmp_path}/writer.db' if uri == 'sqlite' else os.environ['SQLALCHEMY_DATABASE_URI']
+    solver.Base.metadata.create_all(database.get_engine(uri))
+    store = writer.Writer(uri, batch = 8, linger = 0.05)
+    thread = threading.Thread(target = store.run)
+    thread.start()
+    stored = []
+    [store.put(result(f'writer-{index}', 1), stored.append) for index in range(10)]
+    # the same task is solved again
+    store.put(result('writer-0', 3, size = 151), stored.append)
+    assert store.wait(30)
+    store.close()
+    thread.join()
+    assert len(stored) == 11 and all('problem' not in item and 'persist' not in item for item in stored)
+    assert store.counters['tasks'] == 11 and store.counters['failures'] == 0 and store.counters['batches'] < 11
+    with database.session(uri) as session:
+        for id, scale, size in (('writer-0', 3, 151), ('writer-9', 1, 301)):
+            data = solver.TaskClassicalGravitation(id = id).load(session)
+            reference = result(id, scale, size)['solution']
+            assert np.allclose(data['t'], np.linspace(0, 1, size)) and np.allclose(data['r'], reference['r'])
+            assert np.allclose(data['m'], [1, 1, 2]) and data['version'] is not None
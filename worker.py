@@ -0,0 +1,25 @@
+"""This module serve to run standalone workers of distributed execution backend."""
+
+import argparse, multiprocessing, os, dotenv
+
+def main():
+    """Launch worker processes consuming jobs of Redis queue."""
+    dotenv.load_dotenv()
+    from src import backend, database
+    execution = backend.options()
+    parser = argparse.ArgumentParser(description = 'Run workers solving tasks of Redis queue.')
+    parser.add_argument('--redis', default = execution['url'], help = 'URL of Redis server')
+    parser.add_argument('--prefix', default = execution['prefix'], help = 'prefix of keys of queue')
+    parser.add_argument('--processes', type = int, default = os.cpu_count(), help = 'count of worker processes')
+    parser.add_argument('--database', default = os.environ.get('SQLALCHEMY_DATABASE_URI', None), help = 'URI of database')
+    arguments = parser.parse_args()
+    processes = [multiprocessing.Process(target = backend.serve, args = (arguments.redis, arguments.prefix,
+        arguments.database, database.options())) for _ in range(arguments.processes)]
+    [process.start() for process in processes]
+    try:
+        [process.join() for process in processes]
+    except KeyboardInterrupt:
+        [process.terminate() for process in processes]
+
+if __name__ == '__main__':
+    main()